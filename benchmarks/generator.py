@@ -0,0 +1,173 @@
+"""
+Deterministic generator of synthetic libraries.
+
+Libraries look like real ones: few authors wrote most of the books (Zipf distribution),
+titles are Cyrillic and Latin, years are spread over centuries with most books being recent.
+The same seed and count always give the same books.
+
+    python -m benchmarks.generator 100000 books.json
+"""
+import itertools
+import json
+import random
+import sys
+import typing
+from argparse import ArgumentParser
+from pathlib import Path
+
+from src.application.book import dto
+from src.domain.book.vo import BookStatus
+
+DEFAULT_SEED = 42
+
+# Exponent of Zipf distribution of authors: the bigger, the more books popular authors have.
+AUTHOR_SKEW = 1.1
+
+# Share of Cyrillic titles and authors.
+CYRILLIC_SHARE = 0.6
+
+# Share of books that are taken from library.
+TAKEN_SHARE = 0.15
+
+_CYRILLIC_FIRST = (
+    "Александр", "Алексей", "Анна", "Борис", "Валентин", "Вера", "Владимир", "Галина", "Дмитрий", "Евгений",
+    "Екатерина", "Иван", "Ирина", "Константин", "Лев", "Мария", "Михаил", "Надежда", "Николай", "Ольга",
+    "Павел", "Сергей", "Татьяна", "Федор", "Юрий",
+)
+_CYRILLIC_LAST = (
+    "Ахматова", "Булгаков", "Бунин", "Гоголь", "Горький", "Грибоедов", "Достоевский", "Есенин", "Зощенко",
+    "Куприн", "Лермонтов", "Набоков", "Островский", "Пастернак", "Платонов", "Пушкин", "Салтыков", "Толстой",
+    "Тургенев", "Тютчев", "Фет", "Цветаева", "Чехов", "Шолохов", "Шукшин",
+)
+_LATIN_FIRST = (
+    "Agatha", "Albert", "Arthur", "Charles", "Charlotte", "Edgar", "Emily", "Ernest", "George", "Harper",
+    "Henry", "Isaac", "Jane", "John", "Joseph", "Kurt", "Margaret", "Mark", "Mary", "Oscar",
+    "Ray", "Thomas", "Ursula", "Virginia", "William",
+)
+_LATIN_LAST = (
+    "Asimov", "Austen", "Bradbury", "Bronte", "Camus", "Christie", "Conrad", "Dickens", "Doyle", "Faulkner",
+    "Hemingway", "Huxley", "Joyce", "Kafka", "Le Guin", "Lee", "Mitchell", "Orwell", "Poe", "Shelley",
+    "Steinbeck", "Tolkien", "Twain", "Vonnegut", "Wilde",
+)
+
+_CYRILLIC_WORDS = (
+    "война", "мир", "преступление", "наказание", "отцы", "дети", "мертвые", "души", "тихий", "дон",
+    "белая", "гвардия", "мастер", "маргарита", "герой", "нашего", "времени", "вишневый", "сад", "горе",
+    "от", "ума", "капитанская", "дочка", "идиот", "братья", "бесы", "степь", "обломов", "гроза",
+    "записки", "охотника", "повести", "рассказы", "стихи", "дорога", "дом", "ночь", "зима", "река",
+)
+_LATIN_WORDS = (
+    "the", "old", "man", "and", "sea", "pride", "prejudice", "brave", "new", "world",
+    "great", "expectations", "animal", "farm", "house", "of", "dark", "night", "winter", "river",
+    "foundation", "empire", "stranger", "castle", "trial", "heart", "darkness", "song", "fire", "ice",
+    "little", "women", "lost", "time", "island", "journey", "letters", "stories", "poems", "road",
+)
+
+
+class _Script(typing.NamedTuple):
+    first_names: tuple[str, ...]
+    last_names: tuple[str, ...]
+    words: tuple[str, ...]
+    volume: str
+
+
+_CYRILLIC = _Script(_CYRILLIC_FIRST, _CYRILLIC_LAST, _CYRILLIC_WORDS, "том")
+_LATIN = _Script(_LATIN_FIRST, _LATIN_LAST, _LATIN_WORDS, "vol.")
+
+
+def _author_name(script: _Script, index: int) -> str:
+    first = script.first_names[index % len(script.first_names)]
+    rest = index // len(script.first_names)
+    last = script.last_names[rest % len(script.last_names)]
+    rest //= len(script.last_names)
+    if not rest:
+        return f"{first} {last}"
+
+    # Pool of names is exhausted, initials make next names unique
+    initial = script.last_names[rest % len(script.last_names)][0]
+    return f"{first} {initial}. {last} {rest}"
+
+
+def author_count(count: int) -> int:
+    """
+    Returns count of authors for library of count books, author has 20 books on average.
+    """
+    return max(count // 20, 10)
+
+
+def _year(rnd: random.Random) -> int:
+    if rnd.random() < 0.7:
+        # Most of books are recent
+        return int(rnd.triangular(1950, 2025, 2024))
+
+    return rnd.randint(1700, 1949)
+
+
+def generate_books(count: int, seed: int = DEFAULT_SEED) -> typing.Iterator[dto.NewBook]:
+    """
+    Yields count books without duplicates (title, author and year in any case).
+    """
+    rnd = random.Random(seed)
+    authors = []
+    for i in range(author_count(count)):
+        script = _CYRILLIC if rnd.random() < CYRILLIC_SHARE else _LATIN
+        authors.append((_author_name(script, i), script))
+
+    # Author of rank r is chosen with weight 1 / r^s
+    cum_weights = list(itertools.accumulate(1 / rank ** AUTHOR_SKEW for rank in range(1, len(authors) + 1)))
+
+    seen: set[tuple[str, str, int]] = set()
+    for author, script in rnd.choices(authors, cum_weights=cum_weights, k=count):
+        words = rnd.sample(script.words, rnd.randint(1, 4))
+        title = " ".join(words).capitalize()
+        year = _year(rnd)
+
+        volume = 1
+        key = (title.lower(), author.lower(), year)
+        while key in seen:
+            volume += 1
+            key = (f"{title} {script.volume} {volume}".lower(), author.lower(), year)
+
+        seen.add(key)
+        if volume > 1:
+            title = f"{title} {script.volume} {volume}"
+
+        status = BookStatus.TAKEN if rnd.random() < TAKEN_SHARE else BookStatus.AVAILABLE
+        yield dto.NewBook(title=title, author=author, year=year, status=status)
+
+
+def library_json(count: int, seed: int = DEFAULT_SEED) -> dict:
+    """
+    Returns library in format of JSON storage, ids go from 1.
+    """
+    books = [
+        {
+            "id": book_id,
+            "title": book.title,
+            "author": book.author,
+            "year": book.year,
+            "status": book.status is BookStatus.AVAILABLE,
+        }
+        for book_id, book in enumerate(generate_books(count, seed), start=1)
+    ]
+    return {"last_id": len(books), "books": books}
+
+
+def write_library(path: str | Path, count: int, seed: int = DEFAULT_SEED):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(library_json(count, seed), f, ensure_ascii=False)
+
+
+def main():
+    parser = ArgumentParser(description="Generate synthetic library in format of JSON storage")
+    parser.add_argument("count", type=int, help="Count of books")
+    parser.add_argument("path", type=str, help="Path to JSON file")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of generator")
+    args = parser.parse_args()
+
+    write_library(args.path, args.count, args.seed)
+    print(f"Written {args.count} books to {args.path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
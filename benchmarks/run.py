@@ -0,0 +1,358 @@
+"""
+Benchmarks of storages on synthetic libraries.
+
+Every backend gets the same generated library. Times are seconds per operation:
+`first` is the first run (cold caches and lazy indexes), `min`, `median` and `mean`
+are taken over all runs. Results are written to JSON file to compare them between changes.
+
+    python -m benchmarks.run --sizes 10000 100000 --backends json sqlite
+"""
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+from argparse import ArgumentParser
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.generator import DEFAULT_SEED, generate_books
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists
+from src.application.book.interfaces import BookRepository
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.binary import BinaryStorage
+from src.infrastructure.db.json import (
+    FileJsonJournal,
+    FileJsonProvider,
+    FlushPolicy,
+    JsonStorage,
+    JsonStreamStorage,
+    ParallelPolicy,
+    ShardedJsonStorage,
+)
+from src.infrastructure.db.json.columnar import ColumnarSchema
+from src.infrastructure.db.json.schema import Schema
+from src.infrastructure.db.json.sharded import PARTITION_HASH, PARTITION_ID
+from src.infrastructure.db.sqlite import SqliteStorage
+
+DEFAULT_SIZES = (10_000, 100_000)
+DEFAULT_REPEAT = 5
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PAGE_SIZE = 20
+
+# Operations done by one run of lookup and insert benchmarks.
+LOOKUPS = 1000
+INSERTS = 10
+
+# Filters of searches: substring common in Cyrillic titles, the most popular author and a range of years.
+TITLE_QUERY = "война"
+# Needle shorter than trigram: every backend checks all titles
+SCAN_QUERY = "ой"
+YEAR_FROM, YEAR_TO = 1900, 1999
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    # File of library, backends with the same file share prepared library
+    file: str
+    open: typing.Callable[[Path], BookRepository]
+    writable: bool = True
+    lookups: int = LOOKUPS  # Lookups by id in one run
+    schema: type | None = None  # Parsed by Schema.from_json benchmark
+    # Converts copy of prepared library before benchmark, e.g. splits it into shards
+    setup: typing.Callable[[Path], None] | None = None
+
+
+def _journal(path: Path) -> FileJsonJournal:
+    return FileJsonJournal(path.with_name(path.name + ".journal"))
+
+
+def _sharded(partition: str) -> typing.Callable[[Path], ShardedJsonStorage]:
+    return lambda path: ShardedJsonStorage(path, partition=partition)
+
+
+def _split(partition: str) -> typing.Callable[[Path], None]:
+    return lambda path: ShardedJsonStorage(path, partition=partition).close()
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (
+        Backend("json", "books.json", lambda path: JsonStorage(FileJsonProvider(path)), schema=Schema),
+        Backend(
+            "columnar",
+            "books.json",
+            lambda path: JsonStorage(FileJsonProvider(path), columnar=True),
+            schema=ColumnarSchema,
+        ),
+        # Pool of processes is used for every full scan of titles, its workers default to count of cores
+        Backend(
+            "parallel",
+            "books.json",
+            lambda path: JsonStorage(FileJsonProvider(path), parallel=ParallelPolicy(min_books=0)),
+        ),
+        Backend("json-journal", "books.json", lambda path: JsonStorage(FileJsonProvider(path), journal=_journal(path))),
+        # Inserts of one run are written at once
+        Backend(
+            "json-flush",
+            "books.json",
+            lambda path: JsonStorage(FileJsonProvider(path), flush=FlushPolicy(max_pending=INSERTS, max_delay=1.0)),
+        ),
+        Backend("sharded-id", "books.json", _sharded(PARTITION_ID), setup=_split(PARTITION_ID)),
+        Backend("sharded-hash", "books.json", _sharded(PARTITION_HASH), setup=_split(PARTITION_HASH)),
+        Backend(
+            "stream",
+            "books.json",
+            lambda path: JsonStreamStorage(FileJsonProvider(path)),
+            writable=False,
+            # Every lookup reads file
+            lookups=10,
+        ),
+        Backend("binary", "books.bin", BinaryStorage),
+        Backend("binary-journal", "books.bin", lambda path: BinaryStorage(path, journal=_journal(path))),
+        Backend("sqlite", "books.sqlite", SqliteStorage),
+    )
+}
+
+
+def _close(repo: BookRepository):
+    close = getattr(repo, "close", None)
+    if close is not None:
+        close()
+
+
+def measure(fn: typing.Callable[[], typing.Any], repeat: int, ops: int = 1) -> dict:
+    """
+    Runs fn repeat times. Times are divided by ops, the count of operations done by fn.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) / ops)
+
+    return {
+        "ops": ops,
+        "first": times[0],
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+    }
+
+
+def prepare(workdir: Path, backends: list[Backend], books: list[dto.NewBook]):
+    """
+    Saves books to files of backends with one batch write.
+    """
+    for file in dict.fromkeys(backend.file for backend in backends):
+        backend = next(backend for backend in BACKENDS.values() if backend.file == file and backend.writable)
+        repo = backend.open(workdir / file)
+        repo.save_books(books)
+        _close(repo)
+
+
+def _copy_library(src: Path, dst: Path, file: str):
+    dst.mkdir()
+    for path in src.glob(file + "*"):
+        shutil.copy(path, dst / path.name)
+
+
+def bench_backend(backend: Backend, path: Path, books: list[dto.NewBook], repeat: int, seed: int) -> dict[str, dict]:
+    size = len(books)
+    rnd = random.Random(seed)
+    results = {}
+
+    results["load"] = measure(lambda: _close(backend.open(path)), repeat)
+    if backend.schema is not None:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        results["from_json"] = measure(lambda: backend.schema.from_json(data), repeat)
+        del data
+
+    repo = backend.open(path)
+    # Books of the most popular author are spread over the whole library
+    author = Counter(book.author for book in books).most_common(1)[0][0] if books else ""
+    ids = [rnd.randint(1, size) for _ in range(backend.lookups)]
+
+    def lookup():
+        for book_id in ids:
+            repo.get_book_by_id(book_id)
+
+    def search(filters: dto.BookFilter, pagination: Pagination, count_total: bool = True):
+        return lambda: repo.find_books_page(filters, pagination, count_total)
+
+    first_page = Pagination(offset=0, limit=PAGE_SIZE)
+    years = dto.BookFilter(year_from=YEAR_FROM, year_to=YEAR_TO)
+
+    results["get_by_id"] = measure(lookup, repeat, ops=len(ids))
+    results["search_title"] = measure(search(dto.BookFilter(title=TITLE_QUERY), first_page), repeat)
+    results["search_author"] = measure(search(dto.BookFilter(author=author.lower()), first_page), repeat)
+    results["search_year"] = measure(search(years, first_page), repeat)
+    results["search_combined"] = measure(
+        search(dto.BookFilter(title=TITLE_QUERY, year_from=YEAR_FROM, year_to=YEAR_TO), first_page),
+        repeat,
+    )
+    results["count"] = measure(lambda: repo.get_book_count(years), repeat)
+    results["scan_title"] = measure(lambda: repo.get_book_count(dto.BookFilter(title=SCAN_QUERY)), repeat)
+    results["page_deep_offset"] = measure(
+        search(dto.BookFilter(), Pagination(offset=max(size - PAGE_SIZE, 0), limit=PAGE_SIZE), False),
+        repeat,
+    )
+    results["page_deep_cursor"] = measure(
+        search(dto.BookFilter(), Pagination(after_id=max(size - PAGE_SIZE, 0), limit=PAGE_SIZE), False),
+        repeat,
+    )
+
+    if backend.writable:
+        counter = iter(range(repeat * (INSERTS + 1)))
+
+        def insert():
+            for _ in range(INSERTS):
+                repo.save_book(dto.NewBook(
+                    title=f"Benchmark {next(counter)}",
+                    author=author,
+                    year=2024,
+                    status=BookStatus.AVAILABLE,
+                ))
+
+        def insert_duplicate():
+            for book in books[:INSERTS]:
+                try:
+                    repo.save_book(book)
+                except BookAlreadyExists:
+                    pass
+
+        def scan_after_insert():
+            # Changed books cost refresh of search structures on the next scan
+            repo.save_book(dto.NewBook(title=f"Benchmark scan {next(counter)}", author=author, year=2024,
+                                       status=BookStatus.AVAILABLE))
+            repo.get_book_count(dto.BookFilter(title=SCAN_QUERY))
+
+        results["insert"] = measure(insert, repeat, ops=INSERTS)
+        results["insert_duplicate"] = measure(insert_duplicate, repeat, ops=INSERTS)
+        results["scan_after_insert"] = measure(scan_after_insert, repeat)
+
+    _close(repo)
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return out.stdout.strip()
+
+
+def _meta(seed: int, repeat: int) -> dict:
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+
+def _load_baseline(path: str) -> dict[tuple[str, int, str], float]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    return {(row["backend"], row["size"], row["operation"]): row["median"] for row in data["results"]}
+
+
+def _print_row(row: dict, baseline: dict[tuple[str, int, str], float]):
+    line = f"{row['backend']:>14} {row['size']:>10} {row['operation']:>17} {row['median'] * 1000:>12.3f} ms"
+    old = baseline.get((row["backend"], row["size"], row["operation"]))
+    if old:
+        line += f"  x{row['median'] / old:.2f}"
+
+    print(line, flush=True)
+
+
+def run(sizes: list[int], backends: list[Backend], repeat: int, seed: int, baseline: dict) -> list[dict]:
+    rows = []
+    for size in sizes:
+        books = list(generate_books(size, seed))
+        with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+            base = Path(tmp) / "base"
+            base.mkdir()
+            prepare(base, backends, books)
+
+            for backend in backends:
+                # Inserts change library, so every backend works on its copy
+                workdir = Path(tmp) / backend.name
+                _copy_library(base, workdir, backend.file)
+                if backend.setup is not None:
+                    backend.setup(workdir / backend.file)
+
+                results = bench_backend(backend, workdir / backend.file, books, repeat, seed)
+                for operation, stats in results.items():
+                    row = {"backend": backend.name, "size": size, "operation": operation, **stats}
+                    _print_row(row, baseline)
+                    rows.append(row)
+
+    return rows
+
+
+def main():
+    parser = ArgumentParser(description="Benchmarks of storages on synthetic libraries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Sizes of libraries")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=list(BACKENDS),
+        default=list(BACKENDS),
+        help="Backends to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs of every operation")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of generator")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Path to results file")
+    parser.add_argument("--baseline", type=str, default=None, help="Results file to compare medians with")
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be positive")
+
+    baseline = _load_baseline(args.baseline) if args.baseline else {}
+    meta = _meta(args.seed, args.repeat)
+    rows = run(args.sizes, [BACKENDS[name] for name in args.backends], args.repeat, args.seed, baseline)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / (datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": rows}, f, indent=2)
+
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-from dataclasses import dataclass
-from typing import TypeAlias
+from dataclasses import dataclass, field
+from typing import Any, TypeAlias
 
 from src.application.common.dto import DTO
 from src.application.common.pagination import PaginatedItemsDTO
 from src.domain.book import entity
 from src.domain.book.vo import BookStatus
+from src.domain.common.exceptions import AppError
 
 
 @dataclass(frozen=True)
@@ -19,17 +20,60 @@ class NewBook(CreateBook):
     status: BookStatus
 
 
+@dataclass(frozen=True)
+class RawBook(DTO):
+    """
+    Book read from import file, fields aren't validated.
+    Line that can't be parsed gives book without fields.
+    """
+    line: int
+    title: Any = None
+    author: Any = None
+    year: Any = None
+
+
+@dataclass
+class ImportReport(DTO):
+    inserted: int = 0
+    # Numbers of lines of import file
+    duplicate_lines: list[int] = field(default_factory=list)
+    invalid_lines: list[int] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult(DTO):
+    done: list[int] = field(default_factory=list)  # IDs of changed books
+    # Reasons why books weren't changed: not found, already taken or in library
+    failed: dict[int, AppError] = field(default_factory=dict)
+
+
 @dataclass(frozen=True)
 class BookFilter(DTO):
     title: str | None = None
     author: str | None = None
     year: int | None = None
+    # Inclusive range of years
+    year_from: int | None = None
+    year_to: int | None = None
 
     @property
     def is_empty(self) -> bool:
         return (self.title is None and
                 self.author is None and
-                self.year is None)
+                self.year is None and
+                self.year_from is None and
+                self.year_to is None)
+
+    @property
+    def is_restrictive(self) -> bool:
+        """
+        False if filters accept every book: empty or blank strings and year 0 don't filter.
+        """
+        return bool((self.title and self.title.strip()) or
+                    (self.author and self.author.strip()) or
+                    self.year or
+                    self.year_from is not None or
+                    self.year_to is not None)
 
 
 Books: TypeAlias = PaginatedItemsDTO[entity.Book]
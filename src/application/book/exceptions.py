@@ -18,3 +18,10 @@ class BookNotFound(DomainError):
     @property
     def title(self) -> str:
         return "A book not found"
+
+
+@dataclass(eq=False)
+class UnrestrictedFilter(ApplicationError):
+    @property
+    def title(self) -> str:
+        return "Filters accept every book"
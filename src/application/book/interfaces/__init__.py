@@ -1,5 +1,9 @@
+from .async_repository import AsyncBookRepository
+from .maintenance import StorageMaintenance
 from .repository import BookRepository
 
 __all__ = (
+    'AsyncBookRepository',
     'BookRepository',
-)
\ No newline at end of file
+    'StorageMaintenance',
+)
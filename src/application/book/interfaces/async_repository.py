@@ -0,0 +1,79 @@
+from abc import abstractmethod
+from typing import AsyncIterator, Protocol
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists
+from src.application.common.pagination import Page, Pagination
+from src.domain.book.entity import Book
+
+
+class AsyncBookRepository(Protocol):
+    """
+    Asynchronous variant of BookRepository, methods have the same semantic.
+    """
+
+    @abstractmethod
+    async def save_book(self, book: dto.NewBook) -> int:
+        """
+        :raise BookAlreadyExists: If book with same data already exists:
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_book_count(self, filters: dto.BookFilter) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_books(self, filters: dto.BookFilter) -> AsyncIterator[Book]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_book(self, book: Book):
+        """
+        :raise BookNotFound: If book with given ID not exists
+        :raise BookAlreadyExists: If book with same data, but different ID already exists.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_books(self, books: list[Book]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_book(self, book_id: int):
+        """
+        :raise BookNotFound: If book with given ID not exists
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_books(self, book_ids: list[int]) -> list[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_book_by_id(self, book_id: int) -> Book:
+        """
+        :raise BookNotFound: If book with given ID not exists
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_books(self, book_ids: list[int]) -> list[Book]:
+        raise NotImplementedError
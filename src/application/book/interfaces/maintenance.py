@@ -0,0 +1,11 @@
+from abc import abstractmethod
+from typing import Protocol
+
+
+class StorageMaintenance(Protocol):
+    @abstractmethod
+    def compact(self):
+        """
+        Folds accumulated changes (e.g. journal) into fresh storage snapshot.
+        """
+        raise NotImplementedError
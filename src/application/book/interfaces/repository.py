@@ -1,10 +1,15 @@
+import dataclasses
 from abc import abstractmethod
-from typing import Protocol
+from typing import Iterator, Protocol
 
 from src.application.book import dto
-from src.application.common.pagination import Pagination
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.common.pagination import Page, Pagination
 from src.domain.book.entity import Book
 
+# Count of books read by one query of default iter_books.
+ITER_BATCH_SIZE = 1000
+
 
 class BookRepository(Protocol):
     @abstractmethod
@@ -19,10 +24,27 @@ class BookRepository(Protocol):
         """
         raise NotImplementedError
 
+    def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        """
+        Saves books in given order, duplicates are skipped.
+        Default implementation saves books one by one, storages override it with one persist.
+
+        :return: For every book ID of saved book or error with ID of existing duplicate.
+        """
+        results = []
+        for book in books:
+            try:
+                results.append(self.save_book(book))
+            except BookAlreadyExists as err:
+                results.append(err)
+
+        return results
+
     @abstractmethod
     def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
         """
-        Finds books based on filters and paginate result
+        Finds books based on filters and paginate result.
+        Keyset pagination returns books ordered by id right after (or before) cursor.
         """
         raise NotImplementedError
 
@@ -34,6 +56,48 @@ class BookRepository(Protocol):
         """
         raise NotImplementedError
 
+    def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        """
+        Finds page of books and total count of accepted books together.
+        Default implementation runs two queries, storages override it with one pass.
+
+        :param count_total: If false, total may be skipped (None).
+            Whether next page exists is known anyway.
+        """
+        limit = pagination.limit
+        probe = pagination
+        if limit:
+            # One more book tells that next page exists
+            probe = dataclasses.replace(pagination, limit=limit + 1)
+
+        books = self.find_books(filters, probe)
+        has_more = bool(limit) and len(books) > limit
+        if has_more:
+            # Page before cursor ends at cursor, extra book is the first
+            books = books[1:] if pagination.before_id is not None else books[:limit]
+
+        total = self.get_book_count(filters) if count_total else None
+        return Page(items=books, total=total, has_more=has_more)
+
+    def iter_books(self, filters: dto.BookFilter) -> Iterator[Book]:
+        """
+        Iterates books accepted by filters without loading all of them at once.
+        Default implementation reads keyset pages in ascending order of ids.
+        """
+        last_id = 0  # Ids start from 1
+        while True:
+            books = self.find_books(filters, Pagination(after_id=last_id, limit=ITER_BATCH_SIZE))
+            yield from books
+            if len(books) < ITER_BATCH_SIZE:
+                return
+
+            last_id = books[-1].id
+
     @abstractmethod
     def update_book(self, book: Book):
         """
@@ -44,6 +108,15 @@ class BookRepository(Protocol):
         """
         raise NotImplementedError
 
+    def update_books(self, books: list[Book]):
+        """
+        Full updates books with one persist.
+        Default implementation updates books one by one.
+        :raise BookNotFound: If book with given ID not exists, books before it are updated.
+        """
+        for book in books:
+            self.update_book(book)
+
     @abstractmethod
     def delete_book(self, book_id: int):
         """
@@ -53,6 +126,23 @@ class BookRepository(Protocol):
 
         raise NotImplementedError
 
+    def delete_books(self, book_ids: list[int]) -> list[int]:
+        """
+        Deletes books with one persist. Missing books are skipped.
+        Default implementation deletes books one by one.
+        :return: IDs of deleted books.
+        """
+        deleted = []
+        for book_id in book_ids:
+            try:
+                self.delete_book(book_id)
+            except BookNotFound:
+                continue
+
+            deleted.append(book_id)
+
+        return deleted
+
     @abstractmethod
     def get_book_by_id(self, book_id: int) -> Book:
         """
@@ -60,3 +150,16 @@ class BookRepository(Protocol):
         :raise BookNotFound: If book with given ID not exists
         """
         raise NotImplementedError
+
+    def get_books(self, book_ids: list[int]) -> list[Book]:
+        """
+        Gets books by IDs in given order. Missing books are skipped.
+        """
+        books = []
+        for book_id in book_ids:
+            try:
+                books.append(self.get_book_by_id(book_id))
+            except BookNotFound:
+                continue
+
+        return books
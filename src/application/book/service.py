@@ -1,7 +1,11 @@
+import typing
+
 from src.application.book import dto
-from src.application.book.interfaces import BookRepository
-from src.application.common.pagination import Pagination, PaginationResult
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound, UnrestrictedFilter
+from src.application.book.interfaces import AsyncBookRepository, BookRepository
+from src.application.common.pagination import Page, Pagination, PaginationResult, encode_cursor
 from src.domain.book.entity import Book
+from src.domain.book.exceptions import BookAlreadyInLibrary, BookAlreadyTaken
 from src.domain.book.vo import BookStatus
 
 
@@ -12,42 +16,307 @@ class Service:
         self._repo = _repo
 
     def create_book(self, book: dto.CreateBook) -> Book:
-        new_book = dto.NewBook(
-            title=book.title.strip(),
-            author=book.author.strip(),
-            year=book.year,
-            status=BookStatus.AVAILABLE,
-        )
+        new_book = _new_book(book)
 
         book_id = self._repo.save_book(new_book)
 
-        return Book(
-            id=book_id,
-            title=new_book.title,
-            author=new_book.author,
-            year=new_book.year,
-            status=new_book.status,
-        )
+        return _created_book(book_id, new_book)
+
+    def import_books(self, rows: typing.Iterable[dto.RawBook]) -> dto.ImportReport:
+        """
+        Validates books and saves them with one persist of storage.
+        Duplicates inside of rows are skipped before storage is touched.
+        """
+        batch = _ImportBatch.collect(rows)
+        return batch.report(self._repo.save_books(batch.books))
+
+    def export_books(self, filters: dto.BookFilter) -> typing.Iterator[Book]:
+        """
+        Iterates all books accepted by filters, they aren't loaded at once.
+        """
+        return self._repo.iter_books(filters)
 
     def delete_book(self, book_id: int):
         self._repo.delete_book(book_id)
 
+    def delete_books(self, target: list[int] | dto.BookFilter) -> dto.BatchResult:
+        """
+        Deletes books given by IDs or accepted by filters with one persist.
+        :raise UnrestrictedFilter: If filters accept every book.
+        """
+        _check_target(target)
+        if isinstance(target, dto.BookFilter):
+            book_ids = [book.id for book in self._repo.iter_books(target)]
+        else:
+            book_ids = list(dict.fromkeys(target))
+
+        return _deleted_result(book_ids, self._repo.delete_books(book_ids))
+
     def update_status(self, book_id: int, status: BookStatus):
         book = self._repo.get_book_by_id(book_id)
-        match status:
-            case BookStatus.AVAILABLE:
-                book.return_to_library()
-            case BookStatus.TAKEN:
-                book.take_from_library()
-
+        _change_status(book, status)
         self._repo.update_book(book)
 
-    def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> dto.Books:
-        books = self._repo.find_books(filters, pagination)
-        total_count = self._repo.get_book_count(filters)
+    def update_statuses(self, target: list[int] | dto.BookFilter, status: BookStatus) -> dto.BatchResult:
+        """
+        Changes status of books given by IDs or accepted by filters with one persist.
+        :raise UnrestrictedFilter: If filters accept every book.
+        """
+        _check_target(target)
+        result = dto.BatchResult()
+        if isinstance(target, dto.BookFilter):
+            books = list(self._repo.iter_books(target))
+        else:
+            book_ids = list(dict.fromkeys(target))
+            books = self._repo.get_books(book_ids)
+            _mark_missing(result, book_ids, books)
+
+        changed = _change_statuses(result, books, status)
+        self._repo.update_books(changed)
+        return result
+
+    def find_books(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> dto.Books:
+        """
+        :param count_total: If false, total may be skipped and only
+            existence of next page is reported.
+        """
+        page = self._repo.find_books_page(filters, pagination, count_total)
+        return _books_result(pagination, page)
+
+
+class AsyncService:
+    """
+    AsyncService is Service over asynchronous repository, methods have the same semantic.
+    """
+    _repo: AsyncBookRepository
+
+    def __init__(self, _repo: AsyncBookRepository):
+        self._repo = _repo
+
+    async def create_book(self, book: dto.CreateBook) -> Book:
+        new_book = _new_book(book)
+
+        book_id = await self._repo.save_book(new_book)
+
+        return _created_book(book_id, new_book)
+
+    async def import_books(self, rows: typing.Iterable[dto.RawBook]) -> dto.ImportReport:
+        batch = _ImportBatch.collect(rows)
+        return batch.report(await self._repo.save_books(batch.books))
+
+    def export_books(self, filters: dto.BookFilter) -> typing.AsyncIterator[Book]:
+        return self._repo.iter_books(filters)
+
+    async def delete_book(self, book_id: int):
+        await self._repo.delete_book(book_id)
+
+    async def delete_books(self, target: list[int] | dto.BookFilter) -> dto.BatchResult:
+        _check_target(target)
+        if isinstance(target, dto.BookFilter):
+            book_ids = [book.id async for book in self._repo.iter_books(target)]
+        else:
+            book_ids = list(dict.fromkeys(target))
+
+        return _deleted_result(book_ids, await self._repo.delete_books(book_ids))
+
+    async def update_status(self, book_id: int, status: BookStatus):
+        book = await self._repo.get_book_by_id(book_id)
+        _change_status(book, status)
+        await self._repo.update_book(book)
+
+    async def update_statuses(self, target: list[int] | dto.BookFilter, status: BookStatus) -> dto.BatchResult:
+        _check_target(target)
+        result = dto.BatchResult()
+        if isinstance(target, dto.BookFilter):
+            books = [book async for book in self._repo.iter_books(target)]
+        else:
+            book_ids = list(dict.fromkeys(target))
+            books = await self._repo.get_books(book_ids)
+            _mark_missing(result, book_ids, books)
+
+        changed = _change_statuses(result, books, status)
+        await self._repo.update_books(changed)
+        return result
+
+    async def find_books(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> dto.Books:
+        page = await self._repo.find_books_page(filters, pagination, count_total)
+        return _books_result(pagination, page)
+
+
+class _ImportBatch:
+    """
+    Valid books of import without duplicates inside of batch, with lines they were read from.
+    """
+
+    def __init__(self):
+        self.books: list[dto.NewBook] = []
+        self.lines: list[int] = []
+        self.invalid_lines: list[int] = []
+        self.duplicate_lines: list[int] = []
+
+    @classmethod
+    def collect(cls, rows: typing.Iterable[dto.RawBook]) -> "_ImportBatch":
+        batch = cls()
+        seen: set[tuple[str, str, int]] = set()
+        for row in rows:
+            book = _parse_raw_book(row)
+            if book is None:
+                batch.invalid_lines.append(row.line)
+                continue
+
+            new_book = _new_book(book)
+            # Case of letters doesn't matter for duplicates, like in storage
+            key = (new_book.title.lower(), new_book.author.lower(), new_book.year)
+            if key in seen:
+                batch.duplicate_lines.append(row.line)
+                continue
 
-        return dto.Books(
-            data=books,
-            pagination=PaginationResult.from_pagination(pagination, total_count)
+            seen.add(key)
+            batch.books.append(new_book)
+            batch.lines.append(row.line)
+
+        return batch
+
+    def report(self, results: list[int | BookAlreadyExists]) -> dto.ImportReport:
+        """
+        :param results: Results of save_books for books of batch.
+        """
+        report = dto.ImportReport(
+            duplicate_lines=list(self.duplicate_lines),
+            invalid_lines=list(self.invalid_lines),
+        )
+        for line, result in zip(self.lines, results):
+            if isinstance(result, BookAlreadyExists):
+                report.duplicate_lines.append(line)
+            else:
+                report.inserted += 1
+
+        report.duplicate_lines.sort()
+        return report
+
+
+def _created_book(book_id: int, new_book: dto.NewBook) -> Book:
+    return Book(
+        id=book_id,
+        title=new_book.title,
+        author=new_book.author,
+        year=new_book.year,
+        status=new_book.status,
+    )
+
+
+def _books_result(pagination: Pagination, page: Page[Book]) -> dto.Books:
+    books = page.items
+
+    if pagination.before_id is not None:
+        # Page ends at cursor, so books after page exist
+        has_next, has_prev = bool(books), page.has_more
+    else:
+        has_next = page.has_more
+        has_prev = pagination.after_id is not None or bool(pagination.offset)
+
+    next_cursor = encode_cursor(books[-1].id) if has_next and books else None
+    prev_cursor = encode_cursor(books[0].id, backward=True) if has_prev and books else None
+
+    return dto.Books(
+        data=books,
+        pagination=PaginationResult.from_pagination(
+            pagination,
+            page.total,
+            has_next,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
         )
+    )
+
+
+def _check_target(target: list[int] | dto.BookFilter):
+    # Batch change by filters that accept every book is a mistake, not a way to clear library
+    if isinstance(target, dto.BookFilter) and not target.is_restrictive:
+        raise UnrestrictedFilter()
+
+
+def _deleted_result(book_ids: list[int], deleted_ids: list[int]) -> dto.BatchResult:
+    result = dto.BatchResult(done=deleted_ids)
+    deleted = set(deleted_ids)
+    for book_id in book_ids:
+        if book_id not in deleted:
+            result.failed[book_id] = BookNotFound()
+
+    return result
+
+
+def _mark_missing(result: dto.BatchResult, book_ids: list[int], books: list[Book]):
+    found = {book.id for book in books}
+    for book_id in book_ids:
+        if book_id not in found:
+            result.failed[book_id] = BookNotFound()
+
+
+def _change_statuses(result: dto.BatchResult, books: list[Book], status: BookStatus) -> list[Book]:
+    """
+    Changes status of books, failures are put to result.
+    :return: Changed books.
+    """
+    changed = []
+    for book in books:
+        try:
+            _change_status(book, status)
+        except (BookAlreadyTaken, BookAlreadyInLibrary) as err:
+            result.failed[book.id] = err
+            continue
+
+        changed.append(book)
+
+    result.done = [book.id for book in changed]
+    return changed
+
+
+def _change_status(book: Book, status: BookStatus):
+    match status:
+        case BookStatus.AVAILABLE:
+            book.return_to_library()
+        case BookStatus.TAKEN:
+            book.take_from_library()
+
+
+def _new_book(book: dto.CreateBook) -> dto.NewBook:
+    return dto.NewBook(
+        title=book.title.strip(),
+        author=book.author.strip(),
+        year=book.year,
+        status=BookStatus.AVAILABLE,
+    )
+
+
+def _parse_raw_book(row: dto.RawBook) -> dto.CreateBook | None:
+    """
+    Returns None if fields of book are missing or invalid.
+    """
+    if not isinstance(row.title, str) or not isinstance(row.author, str):
+        return None
+
+    if not row.title.strip() or not row.author.strip():
+        return None
+
+    year = row.year
+    if isinstance(year, str):
+        try:
+            year = int(year.strip())
+        except ValueError:
+            return None
+
+    if not isinstance(year, int) or isinstance(year, bool):
+        return None
 
+    return dto.CreateBook(title=row.title, author=row.author, year=year)
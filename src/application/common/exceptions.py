@@ -19,6 +19,18 @@ class RepoError(UnexpectedError):
     pass
 
 
+class ReadOnlyRepoError(RepoError):
+    @property
+    def title(self) -> str:
+        return "Storage is opened in read-only mode"
+
+
+class InvalidCursorError(ApplicationError):
+    @property
+    def title(self) -> str:
+        return "Invalid pagination cursor"
+
+
 @dataclass(eq=False)
 class MappingError(ApplicationError):
     _text: str
@@ -1,26 +1,100 @@
+import base64
+import binascii
 from dataclasses import dataclass
 from typing import Generic, TypeVar
 
 from src.application.common.dto import DTO
+from src.application.common.exceptions import InvalidCursorError
 
 Item = TypeVar("Item")
 
+_CURSOR_AFTER = "a"
+_CURSOR_BEFORE = "b"
+
 
 @dataclass(frozen=True)
 class Pagination:
     offset: int | None = None
     limit: int | None = None
 
+    # Keyset pagination, offset is ignored.
+    # Page starts right after item with id after_id
+    # or ends right before item with id before_id.
+    after_id: int | None = None
+    before_id: int | None = None
+
+    @property
+    def is_keyset(self) -> bool:
+        return self.after_id is not None or self.before_id is not None
+
+    @classmethod
+    def from_cursor(cls, cursor: str, limit: int | None = None) -> "Pagination":
+        """
+        :raise InvalidCursorError: If cursor wasn't made by encode_cursor
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+            direction, item_id = raw[:1], int(raw[1:])
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursorError()
+
+        if direction == _CURSOR_AFTER:
+            return cls(limit=limit, after_id=item_id)
+
+        if direction == _CURSOR_BEFORE:
+            return cls(limit=limit, before_id=item_id)
+
+        raise InvalidCursorError()
+
+
+def encode_cursor(item_id: int, backward: bool = False) -> str:
+    """
+    Makes opaque cursor of page that starts after item (or ends before it if backward).
+    """
+    direction = _CURSOR_BEFORE if backward else _CURSOR_AFTER
+    return base64.urlsafe_b64encode(f"{direction}{item_id}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+@dataclass(frozen=True)
+class Page(Generic[Item]):
+    """
+    Page of items found by repository.
+    Total is None if it wasn't counted, has_more is always known.
+    For page before cursor (before_id) has_more tells that items precede the page.
+    """
+    items: list[Item]
+    total: int | None
+    has_more: bool
+
 
 @dataclass(frozen=True)
 class PaginationResult(DTO):
     offset: int | None
     limit: int | None
-    total: int
+    total: int | None  # None if total wasn't counted
+    has_more: bool | None = None  # Next page exists
+
+    # Opaque cursors of neighbour pages for keyset pagination
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
     @classmethod
-    def from_pagination(cls, pagination: Pagination, total: int) -> "PaginationResult":
-        return cls(offset=pagination.offset, limit=pagination.limit, total=total)
+    def from_pagination(
+        cls,
+        pagination: Pagination,
+        total: int | None,
+        has_more: bool | None = None,
+        next_cursor: str | None = None,
+        prev_cursor: str | None = None,
+    ) -> "PaginationResult":
+        return cls(
+            offset=pagination.offset,
+            limit=pagination.limit,
+            total=total,
+            has_more=has_more,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        )
 
     @property
     def next_page(self) -> bool:
@@ -29,10 +103,19 @@ class PaginationResult(DTO):
         if self.limit is None:
             return False
 
+        if self.has_more is not None:
+            return self.has_more
+
+        if self.total is None:
+            return False
+
         return offset + self.limit < self.total
 
     @property
     def prev_page(self) -> bool:
+        if self.prev_cursor is not None:
+            return True
+
         return self.offset is not None and self.offset > 0
 
 @dataclass(frozen=True)
@@ -3,11 +3,46 @@ from pathlib import Path
 
 from src.domain.common.exceptions import AppError
 
+BACKEND_JSON = "json"
+BACKEND_SQLITE = "sqlite"
+BACKEND_BINARY = "binary"
+
+
+@dataclass
+class JournalConfig:
+    max_records: int | None
+    max_size: int | None
+
+
+@dataclass
+class FlushConfig:
+    max_pending: int
+    max_delay: float | None
+
+
+@dataclass
+class ShardsConfig:
+    partition: str
+    count: int
+    size: int
+
+
+@dataclass
+class ParallelConfig:
+    min_books: int
+    workers: int | None
+
 
 @dataclass
 class Config:
     storage_path: Path
     page_size: int | None
+    journal: JournalConfig | None = None
+    backend: str = BACKEND_JSON
+    flush: FlushConfig | None = None
+    shards: ShardsConfig | None = None
+    columnar: bool = False
+    parallel: ParallelConfig | None = None
 
 
 class ConfigFormatError(AppError):
@@ -23,3 +58,23 @@ class ConfigMissingField(AppError):
     @property
     def title(self) -> str:
         return f"Config missing required field: {self.field!r}"
+
+
+@dataclass(eq=False)
+class ConfigInvalidField(AppError):
+    field: str
+    value: str
+
+    @property
+    def title(self) -> str:
+        return f"Config field {self.field!r} has invalid value: {self.value!r}"
+
+
+@dataclass(eq=False)
+class ConfigConflictingFields(AppError):
+    field: str
+    other: str
+
+    @property
+    def title(self) -> str:
+        return f"Config field {self.field!r} can't be used with {self.other!r}"
@@ -1,7 +1,26 @@
 from configparser import ConfigParser
 from pathlib import Path
 
-from src.config.config import Config, ConfigFormatError, ConfigMissingField
+from src.config.config import (
+    BACKEND_BINARY,
+    BACKEND_JSON,
+    BACKEND_SQLITE,
+    Config,
+    ConfigConflictingFields,
+    ConfigFormatError,
+    ConfigInvalidField,
+    ConfigMissingField,
+    FlushConfig,
+    JournalConfig,
+    ParallelConfig,
+    ShardsConfig,
+)
+
+DEFAULT_JOURNAL_MAX_RECORDS = 1000
+DEFAULT_SHARDS_COUNT = 16
+DEFAULT_SHARDS_SIZE = 10_000
+
+SHARDS_PARTITIONS = ("id", "hash")
 
 
 def load_config(path: str) -> Config:
@@ -20,11 +39,76 @@ def load_config(path: str) -> Config:
     if not storage_path:
         raise ConfigMissingField("storage.path")
 
+    backend = main.get("storage.backend", BACKEND_JSON)
+    if backend not in (BACKEND_JSON, BACKEND_SQLITE, BACKEND_BINARY):
+        raise ConfigInvalidField("storage.backend", backend)
+
     page_size = main.getint("page_size")
     if page_size == 0:
         page_size = 10
 
+    journal = None
+    # Without journal every write of binary snapshot rewrites the whole file
+    if main.getboolean("storage.journal", fallback=backend == BACKEND_BINARY):
+        journal = JournalConfig(
+            max_records=main.getint("storage.journal.max_records", fallback=DEFAULT_JOURNAL_MAX_RECORDS),
+            max_size=main.getint("storage.journal.max_size"),
+        )
+
+    flush = None
+    max_pending = main.getint("storage.flush.max_pending")
+    max_delay = main.getfloat("storage.flush.max_delay")
+    if max_pending is not None and max_pending > 1 and max_delay is None:
+        # Pending changes hold lock of storage until flush, other processes would wait for exit
+        raise ConfigMissingField("storage.flush.max_delay")
+
+    if max_pending is not None or max_delay is not None:
+        flush = FlushConfig(
+            max_pending=max_pending or 1,
+            max_delay=max_delay,
+        )
+
+    shards = None
+    partition = main.get("storage.shards.partition")
+    if partition:
+        if partition not in SHARDS_PARTITIONS:
+            raise ConfigInvalidField("storage.shards.partition", partition)
+
+        shards = ShardsConfig(
+            partition=partition,
+            count=main.getint("storage.shards.count", fallback=DEFAULT_SHARDS_COUNT),
+            size=main.getint("storage.shards.size", fallback=DEFAULT_SHARDS_SIZE),
+        )
+
+    parallel = None
+    min_books = main.getint("storage.parallel.min_books")
+    if min_books is not None:
+        parallel = ParallelConfig(
+            min_books=min_books,
+            workers=main.getint("storage.parallel.workers"),
+        )
+
+    columnar = main.getboolean("storage.columnar", fallback=False)
+    if shards is not None:
+        # Sharded storage writes every change to its shards at once and keeps books as objects
+        conflicts = (
+            ("storage.backend", backend != BACKEND_JSON),
+            ("storage.journal", journal is not None),
+            ("storage.flush.*", flush is not None),
+            ("storage.columnar", columnar),
+            ("storage.parallel.*", parallel is not None),
+        )
+        for field, conflict in conflicts:
+            if conflict:
+                raise ConfigConflictingFields("storage.shards.partition", field)
+
     return Config(
         storage_path=Path(storage_path),
         page_size=page_size,
+        journal=journal,
+        backend=backend,
+        flush=flush,
+        shards=shards,
+        columnar=columnar,
+        parallel=parallel,
     )
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import itertools
+import typing
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists
+from src.application.book.interfaces import AsyncBookRepository, BookRepository
+from src.application.book.interfaces.repository import ITER_BATCH_SIZE
+from src.application.common.pagination import Page, Pagination
+from src.domain.book.entity import Book
+
+# Threads of default executor. Searches of JsonStorage run in parallel,
+# so pool is sized for concurrent requests, not for CPU.
+ASYNC_STORAGE_WORKERS = 8
+
+T = typing.TypeVar("T")
+
+
+class AsyncStorage(AsyncBookRepository):
+    """
+    AsyncStorage runs blocking storage in thread pool, so event loop isn't
+    blocked by file I/O and long scans. Storage must be thread-safe
+    (JsonStorage and SqliteStorage are).
+    """
+
+    def __init__(self, repo: BookRepository, executor: Executor | None = None):
+        """
+        :param executor: Pool for calls of storage. By default, own thread pool is created.
+        """
+        self._repo = repo
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(ASYNC_STORAGE_WORKERS, thread_name_prefix="storage")
+
+    def close(self):
+        """
+        Stops own thread pool. Storage isn't closed.
+        """
+        if self._own_executor:
+            self._executor.shutdown()
+
+    async def _run(self, func: typing.Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def save_book(self, book: dto.NewBook) -> int:
+        return await self._run(self._repo.save_book, book)
+
+    async def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        return await self._run(self._repo.save_books, books)
+
+    async def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
+        return await self._run(self._repo.find_books, filters, pagination)
+
+    async def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        return await self._run(self._repo.find_books_page, filters, pagination, count_total)
+
+    async def get_book_count(self, filters: dto.BookFilter) -> int:
+        return await self._run(self._repo.get_book_count, filters)
+
+    async def iter_books(self, filters: dto.BookFilter) -> typing.AsyncIterator[Book]:
+        """
+        Books are read from iterator of storage in batches, one call of pool per batch.
+        """
+        books = await self._run(self._repo.iter_books, filters)
+        while True:
+            batch = await self._run(list, itertools.islice(books, ITER_BATCH_SIZE))
+            for book in batch:
+                yield book
+
+            if len(batch) < ITER_BATCH_SIZE:
+                return
+
+    async def update_book(self, book: Book):
+        await self._run(self._repo.update_book, book)
+
+    async def update_books(self, books: list[Book]):
+        await self._run(self._repo.update_books, books)
+
+    async def delete_book(self, book_id: int):
+        await self._run(self._repo.delete_book, book_id)
+
+    async def delete_books(self, book_ids: list[int]) -> list[int]:
+        return await self._run(self._repo.delete_books, book_ids)
+
+    async def get_book_by_id(self, book_id: int) -> Book:
+        return await self._run(self._repo.get_book_by_id, book_id)
+
+    async def get_books(self, book_ids: list[int]) -> list[Book]:
+        return await self._run(self._repo.get_books, book_ids)
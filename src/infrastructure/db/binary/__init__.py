@@ -0,0 +1,8 @@
+from .format import SnapshotReader, write_snapshot
+from .storage import BinaryStorage
+
+__all__ = (
+    'BinaryStorage',
+    'SnapshotReader',
+    'write_snapshot',
+)
@@ -0,0 +1,232 @@
+"""
+Binary snapshot format.
+
+All numbers are little-endian. File consists of four sections:
+
+    header     - fixed size, see _HEADER
+    records    - fixed-width records ordered by id, see _RECORD
+    directory  - uint32 array indexed by book id: record index + 1 (0 - no book)
+    heap       - UTF-8 strings of titles and authors, records point into it
+
+Fixed-width records and directory allow to decode one book by id
+without touching the rest of file, so file is opened with mmap and
+startup doesn't depend on library size.
+"""
+import bisect
+import mmap
+import struct
+import typing
+from pathlib import Path
+
+from src.application.common.exceptions import MappingError
+from src.infrastructure.db.files import atomic_write
+from src.infrastructure.db.json.schema import BookSchema
+
+MAGIC = b"BOOKSNAP"
+VERSION = 1
+
+# magic, version, record size, count, last_id, journal_seq,
+# records offset, directory offset, directory length, heap offset
+_HEADER = struct.Struct("<8sII7q")
+
+# id, year, title offset, author offset, title length, author length, status
+_RECORD = struct.Struct("<qqQQIIB3x")
+
+# Prefix of _RECORD
+_RECORD_ID = struct.Struct("<q")
+
+_DIRECTORY_ITEM = struct.Struct("<I")
+
+
+class SnapshotReader:
+    """
+    SnapshotReader gives random access to books of binary snapshot.
+    Pages of file are shared between processes via OS page cache.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._file = None
+        self._mmap = None
+
+        self.count = 0
+        self.last_id = 0
+        self.journal_seq = 0
+
+        self._records_offset = 0
+        self._directory_offset = 0
+        self._directory_len = 0
+        self._heap_offset = 0
+
+        self._open()
+
+    def _open(self):
+        if not self._path.exists() or self._path.stat().st_size == 0:
+            return
+
+        self._file = open(self._path, mode="rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _HEADER.size:
+            raise MappingError("Binary snapshot is truncated")
+
+        (
+            magic,
+            version,
+            record_size,
+            self.count,
+            self.last_id,
+            self.journal_seq,
+            self._records_offset,
+            self._directory_offset,
+            self._directory_len,
+            self._heap_offset,
+        ) = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC:
+            raise MappingError("Invalid type of binary snapshot")
+
+        if version != VERSION or record_size != _RECORD.size:
+            raise MappingError(f"Unsupported version of binary snapshot: {version}")
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+        self._mmap = None
+        self._file = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, book_id: int) -> bool:
+        return self._record_index(book_id) is not None
+
+    def _record_index(self, book_id: int) -> int | None:
+        if book_id < 0 or book_id >= self._directory_len:
+            return None
+
+        (index,) = _DIRECTORY_ITEM.unpack_from(
+            self._mmap,
+            self._directory_offset + book_id * _DIRECTORY_ITEM.size,
+        )
+        if index == 0:
+            return None
+
+        return index - 1
+
+    def _decode(self, index: int) -> BookSchema:
+        offset = self._records_offset + index * _RECORD.size
+        (
+            book_id,
+            year,
+            title_offset,
+            author_offset,
+            title_len,
+            author_len,
+            status,
+        ) = _RECORD.unpack_from(self._mmap, offset)
+
+        return BookSchema(
+            id=book_id,
+            title=self._string(title_offset, title_len),
+            author=self._string(author_offset, author_len),
+            year=year,
+            status=bool(status),
+        )
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._heap_offset + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def get(self, book_id: int) -> BookSchema | None:
+        """
+        Decodes only one record. O(1).
+        """
+        index = self._record_index(book_id)
+        if index is None:
+            return None
+
+        return self._decode(index)
+
+    def __iter__(self) -> typing.Iterator[BookSchema]:
+        """
+        Iterates records in id order.
+        """
+        for index in range(self.count):
+            yield self._decode(index)
+
+    def _id_at(self, index: int) -> int:
+        (book_id,) = _RECORD_ID.unpack_from(self._mmap, self._records_offset + index * _RECORD.size)
+        return book_id
+
+    def iter_from(self, after_id: int) -> typing.Iterator[BookSchema]:
+        """
+        Iterates records with id greater than after_id.
+        First record is found by bisect over ids of records.
+        """
+        start = bisect.bisect_right(range(self.count), after_id, key=self._id_at)
+        for index in range(start, self.count):
+            yield self._decode(index)
+
+
+def write_snapshot(
+    path: str | Path,
+    books: typing.Iterable[BookSchema],
+    last_id: int,
+    journal_seq: int = 0,
+):
+    """
+    Writes binary snapshot. Books must be ordered by id.
+    File is atomically replaced, so readers that have old file mapped are not affected.
+    """
+    path = Path(path)
+
+    records = bytearray()
+    heap = bytearray()
+    ids = []
+    for book in books:
+        title = book.title.encode("utf-8")
+        author = book.author.encode("utf-8")
+
+        records += _RECORD.pack(
+            book.id,
+            book.year,
+            len(heap),
+            len(heap) + len(title),
+            len(title),
+            len(author),
+            1 if book.status else 0,
+        )
+        heap += title
+        heap += author
+        ids.append(book.id)
+
+    directory_len = max(last_id, max(ids, default=0)) + 1
+    directory = bytearray(directory_len * _DIRECTORY_ITEM.size)
+    for index, book_id in enumerate(ids):
+        _DIRECTORY_ITEM.pack_into(directory, book_id * _DIRECTORY_ITEM.size, index + 1)
+
+    records_offset = _HEADER.size
+    directory_offset = records_offset + len(records)
+    heap_offset = directory_offset + len(directory)
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        _RECORD.size,
+        len(ids),
+        last_id,
+        journal_seq,
+        records_offset,
+        directory_offset,
+        directory_len,
+        heap_offset,
+    )
+
+    with atomic_write(path, mode="wb") as f:
+        f.write(header)
+        f.write(records)
+        f.write(directory)
+        f.write(heap)
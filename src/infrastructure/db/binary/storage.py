@@ -0,0 +1,434 @@
+import itertools
+import threading
+import typing
+from pathlib import Path
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.book.interfaces.repository import ITER_BATCH_SIZE, BookRepository
+from src.application.common.exceptions import MappingError
+from src.application.common.pagination import Page, Pagination
+from src.domain.book.entity import Book
+from src.infrastructure.db.dedup import DedupIndex
+from src.infrastructure.db.files import file_version, read_side_file, write_side_file
+from src.infrastructure.db.json.filter import FilterFactory
+from src.infrastructure.db.json.journal import (
+    CompactionPolicy,
+    Overlay,
+    _RecordJson,
+    delete_record,
+    insert_record,
+    parse_record,
+    update_record,
+)
+from src.infrastructure.db.json.schema import BookSchema
+from src.infrastructure.db.json.storage import Journal, convert_book_status_to_bool
+from src.infrastructure.db.json.utils import paginate_page
+from src.infrastructure.db.rwlock import ReadWriteLock
+from .format import SnapshotReader, write_snapshot
+
+
+class BinaryStorage(BookRepository):
+    """
+    BinaryStorage reads books from memory-mapped binary snapshot.
+
+    Changes are kept in small in-memory overlay on top of snapshot and
+    persisted with journal. Compaction writes new snapshot with overlay applied.
+    Without journal every change writes new snapshot, so write costs O(N).
+
+    Dedup index is saved next to snapshot (<path>.dedup) by compaction,
+    so the first write after start doesn't hash every book.
+
+    Storage is safe to use from several threads. Writers are serialized,
+    readers share lock that is exclusive only while overlay is changed
+    or snapshot is swapped, so old mapping isn't closed under reader.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        journal: Journal | None = None,
+        compaction: CompactionPolicy | None = None,
+    ):
+        self._path = Path(path)
+        self._index_path = self._path.with_name(self._path.name + ".dedup")
+        self._journal = journal
+        self._compaction = compaction or CompactionPolicy()
+        # Serializes writers
+        self._lock = threading.RLock()
+        # Shared by readers, exclusive while overlay or snapshot is changed
+        self._rw = ReadWriteLock()
+
+        self._snapshot_version = file_version(self._path)
+        self._snapshot = SnapshotReader(self._path)
+        self._overlay = Overlay()
+
+        # Dedup index is loaded or built only on first write (digest -> book_id).
+        self._hashes: DedupIndex | None = None
+
+        self._journal_seq = self._snapshot.journal_seq
+        self._journal_records = 0
+        if self._journal is not None:
+            self._replay_journal()
+
+        self._last_id = max(self._snapshot.last_id, self._overlay.last_id)
+
+    def close(self):
+        with self._rw.write():
+            self._snapshot.close()
+
+    def _replay_journal(self):
+        for raw_record in self._journal.read_records():
+            record = parse_record(raw_record)
+            if record.seq <= self._snapshot.journal_seq:
+                continue
+
+            self._overlay.apply(record)
+            self._journal_seq = record.seq
+            self._journal_records += 1
+
+    def acquire_new_id(self) -> int:
+        with self._lock:
+            self._last_id += 1
+            return self._last_id
+
+    def _get(self, book_id: int) -> BookSchema | None:
+        if book_id in self._overlay:
+            return self._overlay.get(book_id)
+
+        return self._snapshot.get(book_id)
+
+    def _iter_books(self, after_id: int | None = None) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books in id order with overlay applied.
+        With after_id snapshot is read from the first book after it.
+        """
+        if after_id is None:
+            return self._overlay.merge(self._snapshot)
+
+        books = self._overlay.merge(self._snapshot.iter_from(after_id))
+        # Overlay yields its skipped changes at the end
+        return (book for book in books if book.id > after_id)
+
+    def _count(self) -> int:
+        count = len(self._snapshot)
+        for book_id, book in self._overlay.changes.items():
+            in_snapshot = book_id in self._snapshot
+            if in_snapshot and book is None:
+                count -= 1
+            elif not in_snapshot and book is not None:
+                count += 1
+
+        return count
+
+    def _dedup_index(self) -> DedupIndex:
+        if self._hashes is None:
+            self._hashes = self._load_dedup_index()
+
+        if self._hashes is None:
+            self._hashes = DedupIndex.build(
+                ((book.digest, book.id) for book in self._iter_books()),
+                size_hint=self._count(),
+            )
+
+        return self._hashes
+
+    def _load_dedup_index(self) -> DedupIndex | None:
+        """
+        Loads index saved for current snapshot and applies overlay to it.
+        Returns None if index is missing, stale or broken.
+        """
+        raw_index = read_side_file(self._index_path, self._snapshot_version)
+        if raw_index is None:
+            return None
+
+        try:
+            hashes = DedupIndex.from_bytes(raw_index)
+        except MappingError:
+            return None
+
+        # Old digests are removed first: changed book may take digest of other changed book
+        for book_id in self._overlay.changes:
+            book = self._snapshot.get(book_id)
+            if book is not None:
+                hashes.remove(book.digest)
+
+        for book_id, book in self._overlay.changes.items():
+            if book is not None:
+                hashes.put(book.digest, book_id)
+
+        return hashes
+
+    def _commit(self, *records: _RecordJson):
+        if self._journal is None:
+            self.compact()
+            return
+
+        for record in records:
+            self._journal_seq += 1
+            record["seq"] = self._journal_seq
+
+        self._journal.append(list(records))
+        self._journal_records += len(records)
+
+        if self._compaction.should_compact(self._journal_records, self._journal.size()):
+            self.compact()
+
+    def compact(self):
+        """
+        Writes new snapshot with overlay applied and truncates journal.
+        """
+        with self._lock:
+            # Readers aren't blocked while snapshot is written, only writers change overlay
+            write_snapshot(self._path, self._iter_books(), self._last_id, self._journal_seq)
+
+            with self._rw.write():
+                self._snapshot.close()
+                self._snapshot_version = file_version(self._path)
+                self._snapshot = SnapshotReader(self._path)
+                self._overlay.clear()
+
+            if self._hashes is not None:
+                write_side_file(self._index_path, self._path, self._hashes.to_bytes())
+
+            if self._journal is not None:
+                self._journal.truncate()
+                self._journal_records = 0
+
+    def save_book(self, book: dto.NewBook) -> int:
+        """
+        Save book to storage.
+        Duplicates of books will raise error.
+
+        :param book: Object of new book
+        :return: ID of saved book
+        :raise BookAlreadyExists: If book with same title+author+year already exists:
+        """
+        with self._lock:
+            book_id = self.acquire_new_id()
+            book_model = BookSchema(
+                id=book_id,
+                title=book.title,
+                author=book.author,
+                year=book.year,
+                status=convert_book_status_to_bool(book.status)
+            )
+
+            hashes = self._dedup_index()
+            existing_book = hashes.get(book_model.digest)
+            if existing_book is not None:
+                raise BookAlreadyExists(existing_book)
+
+            with self._rw.write():
+                self._overlay.put(book_model)
+
+            hashes.put(book_model.digest, book_id)
+            self._commit(insert_record(book_model, self._last_id))
+            return book_id
+
+    def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        """
+        Saves books with one append to journal (or one write of snapshot).
+        Duplicates are skipped.
+
+        :return: For every book ID of saved book or error with ID of existing duplicate.
+        """
+        results = []
+        records = []
+        with self._lock:
+            hashes = self._dedup_index()
+            for book in books:
+                book_model = BookSchema(
+                    id=self._last_id + 1,
+                    title=book.title,
+                    author=book.author,
+                    year=book.year,
+                    status=convert_book_status_to_bool(book.status)
+                )
+
+                existing_book = hashes.get(book_model.digest)
+                if existing_book is not None:
+                    results.append(BookAlreadyExists(existing_book))
+                    continue
+
+                self._last_id += 1
+                with self._rw.write():
+                    self._overlay.put(book_model)
+                hashes.put(book_model.digest, book_model.id)
+                records.append(insert_record(book_model, self._last_id))
+                results.append(book_model.id)
+
+            if records:
+                self._commit(*records)
+
+        return results
+
+    def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
+        """
+        Find book by filters. Filters field will union (logical AND).
+        And paginate result.
+        """
+        return self.find_books_page(filters, pagination, count_total=False).items
+
+    def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        """
+        Finds page of books and counts total in the same pass over snapshot.
+        Keyset page after cursor starts from record found by bisect,
+        so total is counted separately.
+        """
+        with self._rw.read():
+            books_iter = self._iter_books(pagination.after_id)
+            if not filters.is_empty:
+                books_iter = filter(FilterFactory.from_dto(filters), books_iter)
+
+            if pagination.is_keyset:
+                return paginate_page(
+                    pagination,
+                    books_iter,
+                    BookSchema.to_entity,
+                    total=self._count_books(filters) if count_total else None,
+                    count_total=False,
+                )
+
+            return paginate_page(
+                pagination,
+                books_iter,
+                BookSchema.to_entity,
+                total=self._count() if filters.is_empty else None,
+                count_total=count_total,
+            )
+
+    def _count_books(self, filters: dto.BookFilter) -> int:
+        if filters.is_empty:
+            return self._count()
+
+        filter_func = FilterFactory.from_dto(filters)
+        count = 0
+        for _ in filter(filter_func, self._iter_books()):
+            count += 1
+
+        return count
+
+    def get_book_count(self, filters: dto.BookFilter) -> int:
+        """
+        Count books by filters. Filters field will union (logical AND).
+        :return: Count of accepted books.
+        """
+        with self._rw.read():
+            return self._count_books(filters)
+
+    def iter_books(self, filters: dto.BookFilter) -> typing.Iterator[Book]:
+        """
+        Iterates books in id order. Books are read by batches after the last
+        yielded id, so lock isn't held between batches and writers aren't blocked.
+        """
+        filter_func = None if filters.is_empty else FilterFactory.from_dto(filters)
+        after_id = None
+        while True:
+            with self._rw.read():
+                batch = list(itertools.islice(self._iter_books(after_id), ITER_BATCH_SIZE))
+
+            if not batch:
+                return
+
+            after_id = batch[-1].id
+            for book in batch:
+                if filter_func is None or filter_func(book):
+                    yield book.to_entity()
+
+    def _delete(self, book_id: int) -> bool:
+        book = self._get(book_id)
+        if book is None:
+            return False
+
+        with self._rw.write():
+            self._overlay.delete(book_id)
+
+        if self._hashes is not None:
+            self._hashes.remove(book.digest)
+
+        return True
+
+    def delete_book(self, book_id: int):
+        with self._lock:
+            if not self._delete(book_id):
+                raise BookNotFound()
+
+            self._commit(delete_record(book_id))
+
+    def delete_books(self, book_ids: list[int]) -> list[int]:
+        """
+        Deletes books with one append to journal (or one write of snapshot).
+        Missing books are skipped.
+        :return: IDs of deleted books.
+        """
+        with self._lock:
+            deleted = [book_id for book_id in book_ids if self._delete(book_id)]
+            if deleted:
+                self._commit(*map(delete_record, deleted))
+
+        return deleted
+
+    def _update(self, book: Book) -> _RecordJson:
+        book_prev = self._get(book.id)
+        if book_prev is None:
+            raise BookNotFound()
+
+        book_obj = BookSchema(
+            id=book.id,
+            title=book.title,
+            author=book.author,
+            year=book.year,
+            status=convert_book_status_to_bool(book.status),
+        )
+
+        hashes = self._dedup_index()
+        existing_book_id = hashes.get(book_obj.digest)
+        if existing_book_id is not None and existing_book_id != book.id:
+            raise BookAlreadyExists(existing_book_id)
+
+        with self._rw.write():
+            self._overlay.put(book_obj)
+
+        hashes.remove(book_prev.digest)
+        hashes.put(book_obj.digest, book.id)
+        return update_record(book_obj)
+
+    def update_book(self, book: Book):
+        """
+        Full updates book in storage.
+        :param book: Updated book object
+        """
+        with self._lock:
+            self._commit(self._update(book))
+
+    def update_books(self, books: list[Book]):
+        """
+        Full updates books with one append to journal (or one write of snapshot).
+        :raise BookNotFound: If book with given ID not exists, books before it are updated.
+        """
+        records = []
+        with self._lock:
+            try:
+                for book in books:
+                    records.append(self._update(book))
+            finally:
+                if records:
+                    self._commit(*records)
+
+    def get_book_by_id(self, book_id: int) -> Book:
+        """
+        Get book by ID. Decodes only one record of snapshot.
+        """
+        with self._rw.read():
+            book = self._get(book_id)
+
+        if book is None:
+            raise BookNotFound()
+
+        return book.to_entity()
@@ -0,0 +1,173 @@
+import hashlib
+import struct
+import typing
+
+from src.application.common.exceptions import MappingError
+
+# Index keeps only prefix of digest, collision of 128 bits is improbable.
+DIGEST_SIZE = 16
+
+_INDEX_MAGIC = b"BOOKDEDU"
+_INDEX_VERSION = 1
+
+# magic, version, count
+_INDEX_HEADER = struct.Struct("<8sIq")
+
+# digest, book id + 1 (0 - empty slot)
+_SLOT = struct.Struct(f"<{DIGEST_SIZE}sq")
+
+_MIN_CAPACITY = 8
+
+
+def book_digest(title: str, author: str, year: int) -> bytes:
+    """
+    Calculates dedup digest of book. It needs to exclude same books (Title+Author+Year).
+    Digest doesn't depend on letter case.
+    """
+    h = hashlib.sha1(usedforsecurity=False)
+    h.update(title.lower().encode())
+    h.update(author.lower().encode())
+    h.update(str(year).encode())
+    return h.digest()
+
+
+def book_hash(title: str, author: str, year: int) -> str:
+    """
+    Calculates dedup key of book as hex string.
+    """
+    return book_digest(title, author, year).hex()
+
+
+class DedupIndex:
+    """
+    DedupIndex maps dedup digest of book to book id.
+
+    It is open addressing table with linear probing in one bytearray:
+    every slot keeps 16 bytes of digest and id. Table is serialized as is,
+    so loading of saved index doesn't hash anything.
+    """
+
+    def __init__(self, capacity: int = _MIN_CAPACITY):
+        self._capacity = _round_capacity(capacity)
+        self._table = bytearray(self._capacity * _SLOT.size)
+        self._count = 0
+
+    @classmethod
+    def build(cls, items: typing.Iterable[tuple[bytes, int]], size_hint: int = 0) -> "DedupIndex":
+        """
+        Builds index from pairs (digest, book_id).
+        """
+        index = cls(size_hint * 2)
+        for digest, book_id in items:
+            index.put(digest, book_id)
+
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _home(self, key: bytes) -> int:
+        return int.from_bytes(key[:8], "little") & (self._capacity - 1)
+
+    def _slot(self, i: int) -> tuple[bytes, int]:
+        return _SLOT.unpack_from(self._table, i * _SLOT.size)
+
+    def _find(self, key: bytes) -> tuple[int, int]:
+        """
+        Returns position of key (or empty slot where it must be placed)
+        and stored value of slot.
+        """
+        mask = self._capacity - 1
+        i = self._home(key)
+        while True:
+            slot_key, value = self._slot(i)
+            if value == 0 or slot_key == key:
+                return i, value
+
+            i = (i + 1) & mask
+
+    def get(self, digest: bytes) -> int | None:
+        _, value = self._find(digest[:DIGEST_SIZE])
+        if value == 0:
+            return None
+
+        return value - 1
+
+    def put(self, digest: bytes, book_id: int):
+        key = digest[:DIGEST_SIZE]
+        i, value = self._find(key)
+        if value == 0:
+            if (self._count + 1) * 2 > self._capacity:
+                self._resize(self._capacity * 2)
+                i, _ = self._find(key)
+
+            self._count += 1
+
+        _SLOT.pack_into(self._table, i * _SLOT.size, key, book_id + 1)
+
+    def remove(self, digest: bytes):
+        key = digest[:DIGEST_SIZE]
+        i, value = self._find(key)
+        if value == 0:
+            return
+
+        # Backward shift deletion: moves following slots of probe sequence
+        # into the hole, so lookups don't need tombstones.
+        mask = self._capacity - 1
+        j = i
+        while True:
+            j = (j + 1) & mask
+            slot_key, slot_value = self._slot(j)
+            if slot_value == 0:
+                break
+
+            home = self._home(slot_key)
+            # Slot can be moved if hole lies between home of slot and slot itself
+            if (j - home) & mask >= (j - i) & mask:
+                _SLOT.pack_into(self._table, i * _SLOT.size, slot_key, slot_value)
+                i = j
+
+        _SLOT.pack_into(self._table, i * _SLOT.size, b"", 0)
+        self._count -= 1
+
+    def _resize(self, capacity: int):
+        old_table = self._table
+        self._capacity = capacity
+        self._table = bytearray(capacity * _SLOT.size)
+
+        for slot_key, value in _SLOT.iter_unpack(old_table):
+            if value != 0:
+                i, _ = self._find(slot_key)
+                _SLOT.pack_into(self._table, i * _SLOT.size, slot_key, value)
+
+    def to_bytes(self) -> bytes:
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, self._count)
+        return header + self._table
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DedupIndex":
+        if len(data) < _INDEX_HEADER.size:
+            raise MappingError("Dedup index is truncated")
+
+        magic, version, count = _INDEX_HEADER.unpack_from(data, 0)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+            raise MappingError("Invalid type of dedup index")
+
+        table = data[_INDEX_HEADER.size:]
+        capacity, rest = divmod(len(table), _SLOT.size)
+        if rest or capacity < _MIN_CAPACITY or capacity & (capacity - 1) or count * 2 > capacity:
+            raise MappingError("Invalid size of dedup index")
+
+        index = cls.__new__(cls)
+        index._capacity = capacity
+        index._table = bytearray(table)
+        index._count = count
+        return index
+
+
+def _round_capacity(capacity: int) -> int:
+    result = _MIN_CAPACITY
+    while result < capacity:
+        result *= 2
+
+    return result
@@ -0,0 +1,116 @@
+import os
+import struct
+import typing
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Version of file that doesn't exist
+MISSING_VERSION = (0, 0, 0)
+
+# mtime, size and inode of data file the side file was saved for
+_SIDE_VERSION = struct.Struct("<qqq")
+
+
+@contextmanager
+def atomic_write(path: str | Path, mode: str = "w", encoding: str | None = None) -> typing.Iterator[typing.IO]:
+    """
+    Opens temporary file next to path for writing. On success file is
+    fsynced and atomically renamed to path, so a crash can't leave
+    target file truncated: there is either old or new content.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode=mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(path: Path):
+    """
+    Persists rename in directory entry. Not supported on Windows.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def file_lock(path: str | Path) -> typing.Iterator[None]:
+    """
+    Exclusive advisory lock between processes.
+    Lock is taken on separate file, because data files are replaced on write.
+    On platforms without fcntl lock is no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(path, mode="a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def file_version(path: str | Path) -> tuple[int, int, int]:
+    """
+    Returns token that changes when file is modified or replaced.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return MISSING_VERSION
+
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def read_side_file(path: str | Path, version: typing.Hashable) -> bytes | None:
+    """
+    Reads file derived from data file, e.g. dedup index.
+    Returns None if it's missing or was saved for other version of data file.
+    """
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+
+    if len(data) < _SIDE_VERSION.size:
+        return None
+
+    if _SIDE_VERSION.unpack_from(data, 0) != version:
+        # Data file was changed after side file was saved
+        return None
+
+    return data[_SIDE_VERSION.size:]
+
+
+def write_side_file(path: str | Path, data_path: str | Path, data: bytes):
+    """
+    Writes file derived from data file stamped with current version of data file.
+    """
+    with atomic_write(path, mode="wb") as f:
+        f.write(_SIDE_VERSION.pack(*file_version(data_path)))
+        f.write(data)
@@ -1,8 +1,20 @@
-from .storage import JsonStorage, IOProvider
-from .provider import FileJsonProvider
+from .storage import JsonStorage, IOProvider, Journal, FlushPolicy
+from .journal import CompactionPolicy
+from .parallel import ParallelPolicy
+from .stream import JsonStreamStorage, StreamProvider
+from .provider import FileJsonProvider, FileJsonJournal
+from .sharded import ShardedJsonStorage
 
 __all__ = (
     'JsonStorage',
     'IOProvider',
+    'Journal',
+    'FlushPolicy',
+    'CompactionPolicy',
+    'ParallelPolicy',
+    'JsonStreamStorage',
+    'StreamProvider',
     'FileJsonProvider',
+    'FileJsonJournal',
+    'ShardedJsonStorage',
 )
@@ -0,0 +1,91 @@
+import bisect
+import heapq
+import typing
+from array import array
+
+from .trigram import TrigramIndex
+
+
+class AuthorDictionary:
+    """
+    AuthorDictionary keeps every distinct author once.
+
+    Author is encoded by code (index in dictionary), lowercase form
+    is computed once per author. Postings map author code to sorted keys
+    of books (ids or rows), so author filter is evaluated once per
+    distinct author instead of once per book.
+    """
+
+    def __init__(self):
+        self._names: list[str] = []
+        self._lower: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._postings: list[array] = []
+        # Trigrams of lowercase names, built on first match
+        self._trigrams: TrigramIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str) -> int:
+        """
+        Returns code of author. New author is added to dictionary.
+        """
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self._names)
+            self._codes[name] = code
+            self._names.append(name)
+            self._lower.append(name.lower())
+            self._postings.append(array("q"))
+            if self._trigrams is not None:
+                self._trigrams.add(code, self._lower[code])
+
+        return code
+
+    def name(self, code: int) -> str:
+        """
+        Returns shared string of author.
+        """
+        return self._names[code]
+
+    def add(self, code: int, key: int):
+        postings = self._postings[code]
+        if not postings or postings[-1] < key:
+            # Common case: keys are added in ascending order
+            postings.append(key)
+        else:
+            bisect.insort(postings, key)
+
+    def remove(self, code: int, key: int):
+        postings = self._postings[code]
+        i = bisect.bisect_left(postings, key)
+        if i < len(postings) and postings[i] == key:
+            del postings[i]
+
+    def match(self, needle: str) -> list[int]:
+        """
+        Returns codes of authors which contain needle (case-insensitive).
+        """
+        needle = needle.lower()
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex.build(enumerate(self._lower))
+
+        codes = self._trigrams.candidates(needle)
+        if codes is None:
+            return [code for code, lower in enumerate(self._lower) if needle in lower]
+
+        return [code for code in codes if needle in self._lower[code]]
+
+    def count(self, codes: typing.Iterable[int]) -> int:
+        return sum(len(self._postings[code]) for code in codes)
+
+    def keys(self, codes: typing.Iterable[int]) -> typing.Iterator[int]:
+        """
+        Iterates keys of books of given authors in ascending order.
+        """
+        postings = [self._postings[code] for code in codes]
+        if len(postings) == 1:
+            return iter(postings[0])
+
+        return heapq.merge(*postings)
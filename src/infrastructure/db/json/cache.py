@@ -0,0 +1,96 @@
+import bisect
+import threading
+import typing
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.application.book import dto
+from src.application.common.pagination import Pagination
+
+# Count of different searches kept in cache.
+MATCH_CACHE_SIZE = 16
+
+
+@dataclass(frozen=True)
+class Matches:
+    """
+    Ids of books accepted by filters in storage order.
+    """
+    ids: array
+    ordered: bool  # Ids are ascending, so cursor is found by bisect
+
+    @classmethod
+    def collect(cls, ids: typing.Iterable[int]) -> "Matches":
+        ids = array("q", ids)
+        ordered = all(ids[i] < ids[i + 1] for i in range(len(ids) - 1))
+        return cls(ids=ids, ordered=ordered)
+
+    def page(self, pagination: Pagination) -> tuple[array, bool] | None:
+        """
+        Slices ids of page. Returns ids and has_more.
+        None means that page can't be sliced (cursor of unordered ids).
+        """
+        ids = self.ids
+        limit = pagination.limit
+        if not pagination.is_keyset:
+            start = pagination.offset or 0
+            end = start + limit if limit else len(ids)
+            return ids[start:end], end < len(ids)
+
+        if not self.ordered:
+            return None
+
+        if pagination.before_id is not None:
+            end = bisect.bisect_left(ids, pagination.before_id)
+            start = max(0, end - limit) if limit else 0
+            return ids[start:end], start > 0
+
+        start = bisect.bisect_right(ids, pagination.after_id)
+        end = start + limit if limit else len(ids)
+        return ids[start:end], end < len(ids)
+
+
+class MatchCache:
+    """
+    MatchCache keeps ids of books found by recent searches, key is frozen BookFilter.
+    Next pages of the same search are sliced from ids instead of matching books again.
+
+    Cache is valid for one generation of schema: any mutation drops it.
+    Cache is shared by concurrent searches, ids are collected outside of its lock.
+    """
+
+    def __init__(self, max_entries: int = MATCH_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[dto.BookFilter, Matches] = OrderedDict()
+        self._generation: int | None = None
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+    def _check(self, generation: int):
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, generation: int, filters: dto.BookFilter) -> Matches | None:
+        with self._lock:
+            self._check(generation)
+            matches = self._entries.get(filters)
+            if matches is not None:
+                self._entries.move_to_end(filters)
+
+            return matches
+
+    def put(self, generation: int, filters: dto.BookFilter, ids: typing.Iterable[int]) -> Matches:
+        matches = Matches.collect(ids)
+        with self._lock:
+            self._check(generation)
+            self._entries[filters] = matches
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        return matches
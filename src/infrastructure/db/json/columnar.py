@@ -0,0 +1,549 @@
+import bisect
+import operator
+import typing
+from array import array
+from collections.abc import Mapping
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.common.exceptions import MappingError
+from src.infrastructure.db.dedup import DedupIndex, book_digest
+from .authors import AuthorDictionary
+from .schema import BookSchema, _SchemaJson, _parse_journal_seq
+from .vectorized import VECTORIZED_MIN_BOOKS, is_available, year_rows
+from .years import year_bounds
+
+# Deleted rows are dropped when they are more than half of rows.
+_VACUUM_MIN_ROWS = 1024
+
+# Title is checked by rows of author instead of search over heap
+# when rows of author are less than this part of table.
+_ROW_CHECK_RATIO = 16
+
+# First window of rows for search of page before cursor, it doubles after each miss.
+_REVERSE_WINDOW = 64
+
+
+class _StringColumn:
+    """
+    Strings of column are stored one after another in UTF-8 heap.
+    Every string is segment of heap, segment starts are monotonic,
+    so owner of any heap position is found with bisect.
+
+    Changed string is appended to the end, old segment becomes garbage.
+    Until the first change segment of row is row itself and mapping isn't stored.
+    """
+
+    def __init__(self):
+        self.heap = bytearray()
+        self._starts = array("q")  # segment -> start in heap
+        self._owners: array | None = None  # segment -> row, -1 for garbage
+        self._segments: array | None = None  # row -> segment
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _end(self, segment: int) -> int:
+        if segment + 1 < len(self._starts):
+            return self._starts[segment + 1]
+
+        return len(self.heap)
+
+    def set(self, row: int, value: str):
+        """
+        Sets value of row. Row equal to count of rows appends new row.
+        """
+        segment = len(self._starts)
+        self._starts.append(len(self.heap))
+        self.heap += value.encode("utf-8")
+
+        if row == self._rows:
+            self._rows += 1
+            if self._segments is not None:
+                self._owners.append(row)
+                self._segments.append(segment)
+
+            return
+
+        if self._segments is None:
+            self._owners = array("q", range(segment))
+            self._segments = array("q", range(self._rows))
+
+        self._owners.append(row)
+        self._owners[self._segments[row]] = -1
+        self._segments[row] = segment
+
+    def _segment(self, row: int) -> int:
+        return row if self._segments is None else self._segments[row]
+
+    def get(self, row: int) -> str:
+        segment = self._segment(row)
+        return self.heap[self._starts[segment]:self._end(segment)].decode("utf-8")
+
+    def find(self, needle: str) -> list[int]:
+        """
+        Returns sorted rows which value contains needle.
+        Heap is searched with bytes.find, so Python code runs only on hits.
+        """
+        raw = needle.encode("utf-8")
+        rows = []
+        pos = self.heap.find(raw)
+        while pos != -1:
+            segment = bisect.bisect_right(self._starts, pos) - 1
+            end = self._end(segment)
+            row = segment if self._owners is None else self._owners[segment]
+            if row >= 0 and pos + len(raw) <= end:
+                rows.append(row)
+                # Other hits in the same value don't matter
+                pos = self.heap.find(raw, end)
+            else:
+                pos = self.heap.find(raw, pos + 1)
+
+        rows.sort()
+        return rows
+
+
+class _BooksView(Mapping):
+    """
+    Read-only view of ColumnarSchema as dict of books.
+    BookSchema objects are created on access.
+    """
+
+    def __init__(self, schema: "ColumnarSchema"):
+        self._schema = schema
+
+    def __getitem__(self, book_id: int) -> BookSchema:
+        row = self._schema._row(book_id)
+        if row is None:
+            raise KeyError(book_id)
+
+        return self._schema._book(row)
+
+    def __contains__(self, book_id: object) -> bool:
+        return isinstance(book_id, int) and self._schema._row(book_id) is not None
+
+    def __iter__(self) -> typing.Iterator[int]:
+        ids = self._schema._ids
+        for row in self._schema._alive_rows():
+            yield ids[row]
+
+    def __len__(self) -> int:
+        return self._schema.count(dto.BookFilter())
+
+    def values(self) -> typing.Iterator[BookSchema]:
+        schema = self._schema
+        return map(schema._book, schema._alive_rows())
+
+
+class ColumnarSchema:
+    """
+    ColumnarSchema has same API as Schema, but keeps books in columns
+    instead of objects: ids and years in arrays, status in bitset,
+    titles in string heap. Lowercase titles have own heap, so title filter
+    is evaluated by bytes search. Authors are encoded by codes of
+    author dictionary, author filter uses its postings (author -> rows).
+
+    Rows are kept in insertion order like dict of Schema.
+    Deleted rows are marked in bitset and dropped by vacuum.
+    """
+
+    def __init__(self, last_id: int = 0, journal_seq: int = 0):
+        self.last_id = last_id
+        self.journal_seq = journal_seq
+        # Same as Schema.generation
+        self.generation = 0
+
+        self._ids = array("q")
+        self._years = array("q")
+        self._status = bytearray()
+        self._deleted = bytearray()
+        self._deleted_count = 0
+
+        self._titles = _StringColumn()
+        self._titles_norm = _StringColumn()
+        self._authors = AuthorDictionary()
+        self._author_codes = array("i")
+
+        # Ids are usually appended in ascending order, then row is found by bisect.
+        # Otherwise, positions are kept in dict.
+        self._positions: dict[int, int] | None = None
+        self._hashes: DedupIndex | None = None
+
+        self.books = _BooksView(self)
+
+    @staticmethod
+    def _get_bit(bits: bytearray, row: int) -> bool:
+        return bool(bits[row >> 3] & (1 << (row & 7)))
+
+    @staticmethod
+    def _set_bit(bits: bytearray, row: int, value: bool):
+        if row >> 3 >= len(bits):
+            bits.append(0)
+
+        if value:
+            bits[row >> 3] |= 1 << (row & 7)
+        else:
+            bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+    def _row(self, book_id: int) -> int | None:
+        if self._positions is not None:
+            row = self._positions.get(book_id)
+        else:
+            row = bisect.bisect_left(self._ids, book_id)
+            if row == len(self._ids) or self._ids[row] != book_id:
+                return None
+
+        if row is None or self._get_bit(self._deleted, row):
+            return None
+
+        return row
+
+    def _alive_rows(self, lo: int = 0, hi: int | None = None) -> typing.Iterator[int]:
+        rows = range(lo, len(self._ids) if hi is None else hi)
+        if not self._deleted_count:
+            return iter(rows)
+
+        deleted = self._deleted
+        return (row for row in rows if not deleted[row >> 3] & (1 << (row & 7)))
+
+    def _book(self, row: int) -> BookSchema:
+        return BookSchema(
+            id=self._ids[row],
+            title=self._titles.get(row),
+            author=self._authors.name(self._author_codes[row]),
+            year=self._years[row],
+            status=self._get_bit(self._status, row),
+        )
+
+    def _digest(self, row: int) -> bytes:
+        author = self._authors.name(self._author_codes[row])
+        return book_digest(self._titles.get(row), author, self._years[row])
+
+    def _append(self, book: BookSchema):
+        row = len(self._ids)
+        if self._positions is None and row and self._ids[row - 1] >= book.id:
+            self._positions = {book_id: i for i, book_id in enumerate(self._ids)}
+
+        self._ids.append(book.id)
+        self._years.append(book.year)
+        self._set_bit(self._status, row, book.status)
+        self._set_bit(self._deleted, row, False)
+        self._titles.set(row, book.title)
+        self._titles_norm.set(row, book.title.lower())
+
+        code = self._authors.intern(book.author)
+        self._author_codes.append(code)
+        self._authors.add(code, row)
+
+        if self._positions is not None:
+            self._positions[book.id] = row
+
+    @property
+    def dedup_index(self) -> DedupIndex:
+        if self._hashes is None:
+            self._hashes = DedupIndex.build(
+                ((self._digest(row), self._ids[row]) for row in self._alive_rows()),
+                size_hint=len(self._ids) - self._deleted_count,
+            )
+
+        return self._hashes
+
+    def attach_dedup_index(self, index: DedupIndex):
+        """
+        Uses saved index instead of hashing all books.
+        Index must be built for the same books.
+        """
+        self._hashes = index
+
+    def next_id(self) -> int:
+        self.last_id += 1
+        return self.last_id
+
+    def find_duplicate(self, book: BookSchema) -> int | None:
+        """
+        Returns id of other book with same title+author+year.
+        """
+        existing_book_id = self.dedup_index.get(book.digest)
+        if existing_book_id == book.id:
+            return None
+
+        return existing_book_id
+
+    def insert(self, book: BookSchema):
+        hashes = self.dedup_index
+        existing_book = hashes.get(book.digest)
+        if existing_book is not None:
+            raise BookAlreadyExists(existing_book)
+
+        if self._row(book.id) is not None:
+            # Same as replace of dict item in Schema
+            self.delete(book.id)
+
+        self._append(book)
+        hashes.put(book.digest, book.id)
+        self.generation += 1
+
+    def update(self, book: BookSchema):
+        row = self._row(book.id)
+        if row is None:
+            raise BookNotFound()
+
+        hashes = self.dedup_index
+        existing_book_id = hashes.get(book.digest)
+        if existing_book_id is not None and existing_book_id != book.id:
+            raise BookAlreadyExists(existing_book_id)
+
+        prev_digest = self._digest(row)
+        self._years[row] = book.year
+        self._set_bit(self._status, row, book.status)
+        if self._titles.get(row) != book.title:
+            self._titles.set(row, book.title)
+            self._titles_norm.set(row, book.title.lower())
+
+        code = self._authors.intern(book.author)
+        if self._author_codes[row] != code:
+            self._authors.remove(self._author_codes[row], row)
+            self._author_codes[row] = code
+            self._authors.add(code, row)
+
+        if prev_digest != book.digest:
+            hashes.remove(prev_digest)
+            hashes.put(book.digest, book.id)
+
+        self.generation += 1
+
+    def delete(self, book_id: int):
+        row = self._row(book_id)
+        if row is None:
+            raise BookNotFound()
+
+        self.dedup_index.remove(self._digest(row))
+        self._drop_row(row)
+
+        if len(self._ids) >= _VACUUM_MIN_ROWS and self._deleted_count * 2 > len(self._ids):
+            self._vacuum()
+
+        self.generation += 1
+
+    def _drop_row(self, row: int):
+        # Strings of row stay in heaps until vacuum, search skips deleted rows
+        self._set_bit(self._deleted, row, True)
+        self._deleted_count += 1
+        self._authors.remove(self._author_codes[row], row)
+
+    def _vacuum(self):
+        """
+        Rebuilds columns without deleted rows and garbage of heaps.
+        """
+        fresh = ColumnarSchema(self.last_id, self.journal_seq)
+        for row in self._alive_rows():
+            fresh._append(self._book(row))
+
+        hashes, generation = self._hashes, self.generation
+        self.__dict__.update(fresh.__dict__)
+        self.books = _BooksView(self)
+        self._hashes = hashes
+        self.generation = generation
+
+    def _match_rows(self, filters: dto.BookFilter, lo: int = 0, hi: int | None = None) -> typing.Iterable[int]:
+        """
+        Returns rows accepted by filters in row order.
+        Same semantic as FilterFactory: case-insensitive substring for title
+        and author, exact year and range of years.
+        Only rows in [lo, hi) are returned.
+        """
+        if hi is None:
+            hi = len(self._ids)
+
+        rows: typing.Iterable[int] | None = None
+        if filters.author:
+            rows = _slice_sorted(list(self._authors.keys(self._authors.match(filters.author))), lo, hi)
+
+        if filters.title:
+            needle = filters.title.lower()
+            if rows is not None and len(rows) * _ROW_CHECK_RATIO < len(self._ids):
+                # Few rows of author: checking them is cheaper than search over whole heap
+                titles = self._titles_norm
+                rows = [row for row in rows if needle in titles.get(row)]
+            else:
+                found = _slice_sorted(self._titles_norm.find(needle), lo, hi)
+                if rows is None:
+                    rows = found
+                else:
+                    found_set = set(found)
+                    rows = [row for row in rows if row in found_set]
+
+        bounds = year_bounds(filters)
+        if bounds is not None:
+            years = self._years
+            year_from, year_to = bounds
+            if year_from is not None and year_from == year_to:
+                accept = year_from.__eq__
+            else:
+                year_from = year_from if year_from is not None else -2 ** 63
+                year_to = year_to if year_to is not None else 2 ** 63 - 1
+                accept = lambda year: year_from <= year <= year_to
+
+            if rows is None and is_available() and hi - lo >= VECTORIZED_MIN_BOOKS:
+                # Column of years is compared by NumPy without copy
+                rows = year_rows(years, lo, hi, *bounds)
+            elif rows is None:
+                rows = (row for row in range(lo, hi) if accept(years[row]))
+            else:
+                rows = [row for row in rows if accept(years[row])]
+
+        if rows is None:
+            return self._alive_rows(lo, hi)
+
+        if not self._deleted_count:
+            return rows
+
+        deleted = self._deleted
+        return (row for row in rows if not deleted[row >> 3] & (1 << (row & 7)))
+
+    def select(self, filters: dto.BookFilter) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books accepted by filters in storage order.
+        """
+        return map(self._book, self._match_rows(filters))
+
+    def select_keyset(
+        self,
+        filters: dto.BookFilter,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        reverse: bool = False,
+    ) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books accepted by filters with ids between cursors (exclusive)
+        in ascending order of ids, or in descending if reverse.
+        """
+        if self._positions is not None:
+            # Rows aren't ordered by id, cursor can't be found by bisect
+            books = [
+                book for book in self.select(filters)
+                if (after_id is None or book.id > after_id) and (before_id is None or book.id < before_id)
+            ]
+            books.sort(key=operator.attrgetter("id"), reverse=reverse)
+            return iter(books)
+
+        lo = 0 if after_id is None else bisect.bisect_right(self._ids, after_id)
+        hi = len(self._ids) if before_id is None else bisect.bisect_left(self._ids, before_id)
+        if not reverse:
+            return map(self._book, self._match_rows(filters, lo, hi))
+
+        return map(self._book, self._match_rows_reversed(filters, lo, hi))
+
+    def _match_rows_reversed(self, filters: dto.BookFilter, lo: int, hi: int) -> typing.Iterator[int]:
+        """
+        Returns rows accepted by filters in reversed order.
+        Rows are matched by growing windows from end, so short page reads few rows.
+        """
+        window = _REVERSE_WINDOW
+        while hi > lo:
+            start = max(lo, hi - window)
+            yield from reversed(list(self._match_rows(filters, start, hi)))
+            hi = start
+            window *= 2
+
+    def count(self, filters: dto.BookFilter) -> int:
+        """
+        Counts books accepted by filters.
+        """
+        if filters.is_empty:
+            return len(self._ids) - self._deleted_count
+
+        count = 0
+        for _ in self._match_rows(filters):
+            count += 1
+
+        return count
+
+    def to_json(self) -> _SchemaJson:
+        return _SchemaJson(
+            last_id=self.last_id,
+            books=[book.to_json() for book in self.books.values()],
+        )
+
+    @classmethod
+    def read(cls, provider: typing.Any) -> "ColumnarSchema":
+        """
+        Reads schema from IOProvider.
+        Provider with stream access is parsed incrementally,
+        so list of books is never materialized as objects.
+        """
+        # Stream module depends on storage, import it lazy
+        from .stream import StreamProvider, iter_schema_json
+
+        if not isinstance(provider, StreamProvider):
+            return cls.from_json(provider.read_json())
+
+        schema = cls()
+        header = {}
+        with provider.open_stream() as fp:
+            index = 0
+            for key, value in iter_schema_json(fp):
+                if key != "book":
+                    header[key] = value
+                    continue
+
+                schema._load_book(BookSchema.from_json(value, index=index))
+                index += 1
+
+        if index == 0 and not header:
+            # Common case for empty file
+            return schema
+
+        schema._load_header(header)
+        return schema
+
+    def _load_book(self, book: BookSchema):
+        row = self._row(book.id)
+        if row is not None:
+            # Later book with same id wins, same as in dict
+            self._drop_row(row)
+
+        self._append(book)
+
+    def _load_header(self, data: dict):
+        last_id = data.get("last_id")
+        if last_id is None:
+            raise MappingError("The field `last_id` is missing")
+
+        if not isinstance(last_id, int):
+            raise MappingError("The field `last_id` must be an integer")
+
+        self.last_id = last_id
+        self.journal_seq = _parse_journal_seq(data)
+
+    @classmethod
+    def from_json(cls, data: typing.Any) -> "ColumnarSchema":
+        schema = cls()
+        if data is None:
+            # Common case for empty file
+            return schema
+
+        if not isinstance(data, dict):
+            raise MappingError("Invalid type of schema ")
+
+        schema._load_header(data)
+
+        books_raw: list[typing.Any] = data.get("books", [])
+        if not isinstance(books_raw, list):
+            raise MappingError("The field `books` must be a list")
+
+        for i, book_raw in enumerate(books_raw):
+            schema._load_book(BookSchema.from_json(book_raw, index=i))
+
+        return schema
+
+
+def _slice_sorted(rows: list[int], lo: int, hi: int) -> list[int]:
+    """
+    Returns part of sorted rows in [lo, hi).
+    """
+    if lo == 0 and (not rows or rows[-1] < hi):
+        return rows
+
+    return rows[bisect.bisect_left(rows, lo):bisect.bisect_left(rows, hi)]
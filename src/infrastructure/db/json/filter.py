@@ -1,8 +1,10 @@
 from abc import abstractmethod
-from typing import Protocol, Iterable
+from typing import Protocol, Iterable, TYPE_CHECKING
 
 from src.application.book.dto import BookFilter
-from src.infrastructure.db.json.schema import BookSchema
+
+if TYPE_CHECKING:
+    from src.infrastructure.db.json.schema import BookSchema
 
 
 class Filter(Protocol):
@@ -14,7 +16,7 @@ class Filter(Protocol):
     """
 
     @abstractmethod
-    def __call__(self, book: BookSchema) -> bool:
+    def __call__(self, book: "BookSchema") -> bool:
         raise NotImplementedError
 
 
@@ -25,30 +27,47 @@ class FilterFactory:
 
     @staticmethod
     def title(title: str) -> Filter:
-        return lambda book: title.lower() in book.title.lower()
+        title = title.lower()
+        return lambda book: title in book.title.lower()
 
     @staticmethod
     def author(author: str) -> Filter:
-        return lambda book: author.lower() in book.author.lower()
+        author = author.lower()
+        return lambda book: author in book.author.lower()
 
     @staticmethod
     def year(year: int) -> Filter:
         return lambda book: year == book.year
 
+    @staticmethod
+    def year_range(year_from: int | None, year_to: int | None) -> Filter:
+        if year_to is None:
+            return lambda book: year_from <= book.year
+
+        if year_from is None:
+            return lambda book: book.year <= year_to
+
+        return lambda book: year_from <= book.year <= year_to
+
     @staticmethod
     def and_(filters: Iterable[Filter]) -> Filter:
         return lambda book: all(f(book) for f in filters)
 
     @classmethod
     def _yield_filters(cls, filters: BookFilter) -> Iterable[Filter]:
-        if filters.title:
-            yield cls.title(filters.title)
+        # Cheap checks go first, so substring search runs only for books left.
+        # Schema orders filters by statistics instead, see planner.
+        if filters.year:
+            yield cls.year(filters.year)
+
+        if filters.year_from is not None or filters.year_to is not None:
+            yield cls.year_range(filters.year_from, filters.year_to)
 
         if filters.author:
             yield cls.author(filters.author)
 
-        if filters.year:
-            yield cls.year(filters.year)
+        if filters.title:
+            yield cls.title(filters.title)
 
     @classmethod
     def from_dto(cls, filters: BookFilter) -> Filter:
@@ -0,0 +1,179 @@
+import typing
+from dataclasses import dataclass
+from typing import TypedDict, Literal
+
+from src.application.common.exceptions import MappingError
+from .schema import BookSchema, Schema, _BookJson
+
+OP_INSERT = "insert"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
+
+class _RecordJson(TypedDict, total=False):
+    """
+    _RecordJson is representation how one mutation will in journal.
+    """
+    seq: int
+    op: Literal["insert", "update", "delete"]
+    book: _BookJson
+    id: int
+    last_id: int
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    """
+    CompactionPolicy describes when journal must be folded to snapshot.
+    None value disables the threshold.
+    """
+    max_records: int | None = None
+    max_bytes: int | None = None
+
+    def should_compact(self, records: int, size: int) -> bool:
+        if self.max_records is not None and records >= self.max_records:
+            return True
+
+        if self.max_bytes is not None and size >= self.max_bytes:
+            return True
+
+        return False
+
+
+def insert_record(book: BookSchema, last_id: int) -> _RecordJson:
+    return _RecordJson(op=OP_INSERT, book=book.to_json(), last_id=last_id)
+
+
+def update_record(book: BookSchema) -> _RecordJson:
+    return _RecordJson(op=OP_UPDATE, book=book.to_json())
+
+
+def delete_record(book_id: int) -> _RecordJson:
+    return _RecordJson(op=OP_DELETE, id=book_id)
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    """
+    JournalRecord is runtime representation of journal record.
+    """
+    seq: int
+    op: str
+    book: BookSchema | None = None
+    book_id: int | None = None
+    last_id: int = 0
+
+
+def parse_record(record: typing.Any) -> JournalRecord:
+    if not isinstance(record, dict):
+        raise MappingError("Invalid type of journal record")
+
+    seq = record.get("seq")
+    if not isinstance(seq, int):
+        raise MappingError("The field `seq` of journal record must be an integer")
+
+    match record.get("op"):
+        case "insert":
+            book = BookSchema.from_json(record.get("book"))
+            return JournalRecord(
+                seq=seq,
+                op=OP_INSERT,
+                book=book,
+                book_id=book.id,
+                last_id=int(record.get("last_id", 0)),
+            )
+        case "update":
+            book = BookSchema.from_json(record.get("book"))
+            return JournalRecord(seq=seq, op=OP_UPDATE, book=book, book_id=book.id)
+        case "delete":
+            book_id = record.get("id")
+            if not isinstance(book_id, int):
+                raise MappingError("The field `id` of journal record must be an integer")
+
+            return JournalRecord(seq=seq, op=OP_DELETE, book_id=book_id)
+        case op:
+            raise MappingError(f"Unknown journal operation {op!r}")
+
+
+def apply_record(schema: Schema, record: JournalRecord):
+    """
+    Applies one journal record to schema.
+    Records applied in same order as they were written,
+    so insert/update/delete checks give same results as at write time.
+    """
+    match record.op:
+        case "insert":
+            schema.insert(record.book)
+            schema.last_id = max(schema.last_id, record.last_id)
+        case "update":
+            schema.update(record.book)
+        case "delete":
+            schema.delete(record.book_id)
+
+
+class Overlay:
+    """
+    Overlay keeps journal changes on top of snapshot
+    when snapshot isn't materialized to Schema.
+    """
+
+    def __init__(self):
+        # book id -> changed book. None means deleted book.
+        self.changes: dict[int, BookSchema | None] = {}
+        self.last_id = 0
+
+    @classmethod
+    def from_records(cls, records: typing.Iterable[JournalRecord], after_seq: int) -> "Overlay":
+        overlay = cls()
+        for record in records:
+            if record.seq > after_seq:
+                overlay.apply(record)
+
+        return overlay
+
+    def apply(self, record: JournalRecord):
+        """
+        Applies journal record without checks: they were made when record was written.
+        """
+        if record.op == OP_DELETE:
+            self.delete(record.book_id)
+        else:
+            self.put(record.book)
+
+        self.last_id = max(self.last_id, record.last_id)
+
+    def put(self, book: BookSchema):
+        self.changes[book.id] = book
+
+    def delete(self, book_id: int):
+        self.changes[book_id] = None
+
+    def __contains__(self, book_id: int) -> bool:
+        return book_id in self.changes
+
+    def get(self, book_id: int) -> BookSchema | None:
+        return self.changes.get(book_id)
+
+    def clear(self):
+        self.changes.clear()
+
+    def merge(self, books: typing.Iterable[BookSchema]) -> typing.Iterator[BookSchema]:
+        """
+        Applies overlay to snapshot books ordered by id.
+        Result has same order as Schema after journal replay.
+        """
+        seen = set()
+        for book in books:
+            if book.id in self.changes:
+                seen.add(book.id)
+                book = self.changes[book.id]
+                if book is None:
+                    continue
+
+            yield book
+
+        # New books always have ids greater than books in snapshot
+        for book_id in sorted(self.changes.keys() - seen):
+            book = self.changes[book_id]
+            if book is not None:
+                yield book
@@ -0,0 +1,221 @@
+"""
+Parallel scan of Schema for substring search of title.
+
+Lowercase titles of books are copied to shared memory: offsets of titles
+followed by buffer of their UTF-8 bytes. Workers attach to it by name,
+so books aren't pickled, and only name, needle and bounds of chunk are sent per call.
+Workers are started by forkserver (or spawn), not forked from process
+that may already run threads (flush timer, executors).
+Pool is started once, titles are copied again by the first scan after books changed.
+"""
+import bisect
+import dataclasses
+import itertools
+import multiprocessing
+import os
+import threading
+import typing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+
+from src.application.book import dto
+from .filter import FilterFactory
+
+if typing.TYPE_CHECKING:
+    from .schema import BookSchema, Schema
+
+# Library is split into this count of chunks per worker:
+# first page of search is ready after one small chunk, and slow chunks are balanced.
+CHUNKS_PER_WORKER = 4
+
+_OFFSET_SIZE = array("q").itemsize
+
+# Titles attached by worker: name of shared memory and its mapping.
+_attached: tuple[str, SharedMemory] | None = None
+
+
+def _context() -> multiprocessing.context.BaseContext:
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Runs in worker. Titles stay attached until scan of other snapshot.
+    """
+    global _attached
+    if _attached is not None:
+        if _attached[0] == name:
+            return _attached[1]
+
+        _attached[1].close()
+        _attached = None
+
+    memory = SharedMemory(name)
+    _attached = (name, memory)
+    return memory
+
+
+def _scan_chunk(name: str, size: int, needle: bytes, lo: int, hi: int, count_only: bool) -> list[int] | int:
+    """
+    Runs in worker. Returns positions of books of chunk which title contains needle, or their count.
+    """
+    memory = _attach(name)
+    offsets = array("q")
+    offsets.frombytes(memory.buf[lo * _OFFSET_SIZE:(hi + 1) * _OFFSET_SIZE])
+    base = (size + 1) * _OFFSET_SIZE + offsets[0]
+    titles = bytes(memory.buf[base:base + offsets[-1] - offsets[0]])
+    start = offsets[0]
+
+    found = []
+    pos = titles.find(needle)
+    while pos != -1:
+        i = bisect.bisect_right(offsets, start + pos) - 1
+        end = offsets[i + 1] - start
+        if pos + len(needle) <= end:
+            found.append(lo + i)
+            # One match per title is enough
+            pos = titles.find(needle, end)
+        else:
+            # Match spans two titles
+            pos = titles.find(needle, pos + 1)
+
+    return len(found) if count_only else found
+
+
+class _Titles:
+    """
+    Lowercase titles of snapshot of books in shared memory.
+    """
+
+    def __init__(self, schema: "Schema"):
+        self.ids = array("q")
+        offsets = array("q", (0,))
+        chunks = []
+        total = 0
+        for book in schema.books.values():
+            title = book.title.lower().encode("utf-8")
+            chunks.append(title)
+            total += len(title)
+            offsets.append(total)
+            self.ids.append(book.id)
+
+        header = offsets.tobytes()
+        # Zero size memory can't be created
+        self.memory = SharedMemory(create=True, size=max(len(header) + total, 1))
+        self.memory.buf[:len(header)] = header
+        self.memory.buf[len(header):len(header) + total] = b"".join(chunks)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+@dataclass(frozen=True)
+class ParallelPolicy:
+    """
+    ParallelPolicy describes when substring search is split between processes.
+    """
+    min_books: int
+    workers: int | None = None  # os.cpu_count() by default
+
+
+class ParallelScanner:
+    """
+    ParallelScanner matches titles of chunks of library in pool of processes.
+    Results of chunks are merged in order of chunks, so books go in storage order
+    and pages are the same as with serial scan. Other filters are checked
+    by caller process for books with matched title.
+    """
+
+    def __init__(self, policy: ParallelPolicy):
+        self._policy = policy
+        self._workers = policy.workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        # Titles of books of schema at generation
+        self._titles: _Titles | None = None
+        self._schema: "Schema | None" = None
+        self._generation: int | None = None
+        self._lock = threading.Lock()
+
+    def accepts(self, size: int) -> bool:
+        return self._workers > 1 and size >= self._policy.min_books
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+            self._drop_titles()
+
+    def _drop_titles(self):
+        if self._titles is not None:
+            self._titles.close()
+
+        self._titles = None
+        self._schema = None
+        self._generation = None
+
+    def _start(self, schema: "Schema") -> tuple[ProcessPoolExecutor, _Titles]:
+        """
+        Returns pool and titles of schema. Titles are copied only by scans,
+        so mutations between scans cost one copy, not one per mutation.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self._workers, mp_context=_context())
+
+            if self._titles is None or self._schema is not schema or self._generation != schema.generation:
+                self._drop_titles()
+                self._titles = _Titles(schema)
+                self._schema = schema
+                self._generation = schema.generation
+
+            return self._executor, self._titles
+
+    def _map(self, schema: "Schema", title: str, count_only: bool) -> tuple[_Titles, typing.Iterator[list[int] | int]]:
+        executor, titles = self._start(schema)
+        size = len(titles)
+        chunks = max(min(self._workers * CHUNKS_PER_WORKER, size), 1)
+        bounds = [size * i // chunks for i in range(chunks + 1)]
+        # All chunks are submitted at once, results are taken in order of chunks
+        results = executor.map(
+            _scan_chunk,
+            itertools.repeat(titles.name),
+            itertools.repeat(size),
+            itertools.repeat(title.lower().encode("utf-8")),
+            bounds[:-1],
+            bounds[1:],
+            itertools.repeat(count_only),
+        )
+        return titles, results
+
+    def scan(self, schema: "Schema", filters: dto.BookFilter) -> typing.Iterator["BookSchema"]:
+        """
+        Iterates books accepted by filters with title in storage order.
+        Chunks left unread are cancelled when iterator is dropped.
+        """
+        titles, results = self._map(schema, filters.title, count_only=False)
+        books = map(schema.books.__getitem__, map(titles.ids.__getitem__, itertools.chain.from_iterable(results)))
+        rest = dataclasses.replace(filters, title=None)
+        if rest.is_empty:
+            return books
+
+        return filter(FilterFactory.from_dto(rest), books)
+
+    def count(self, schema: "Schema", filters: dto.BookFilter) -> int:
+        rest = dataclasses.replace(filters, title=None)
+        if rest.is_empty:
+            return sum(self._map(schema, filters.title, count_only=True)[1])
+
+        return sum(1 for _ in self.scan(schema, filters))
@@ -0,0 +1,92 @@
+"""
+Query planner of Schema.
+
+Every filter of search is either access path (index gives sorted ids of books)
+or predicate (check of one book). Planner takes ids from the most selective
+access path, other filters are checked as predicates: cheap predicates that
+reject more books go first.
+"""
+import typing
+from dataclasses import dataclass
+
+from .filter import Filter
+
+if typing.TYPE_CHECKING:
+    from .schema import BookSchema
+
+# Relative cost of predicate for one book.
+COST_YEAR = 1.0
+COST_AUTHOR = 1.0  # Interned author is looked up in set of matched authors
+COST_TITLE = 4.0  # Title is lowercased and searched for substring
+
+# Share of books expected to pass title predicate without trigram index.
+TITLE_SELECTIVITY = 0.1
+
+# Access path is used when it gives at most this share of books.
+# Otherwise, scan of all books in storage order is cheaper than lookups by id.
+MAX_ACCESS_SHARE = 0.25
+
+
+@dataclass(frozen=True)
+class Predicate:
+    check: Filter
+    cost: float
+    selectivity: float  # Expected share of accepted books
+
+    @property
+    def rank(self) -> float:
+        """
+        Rejected share per unit of cost. Predicates are checked by descending rank.
+        """
+        return (1 - self.selectivity) / self.cost
+
+
+@dataclass(frozen=True)
+class AccessPath:
+    name: str
+    estimate: int  # Expected count of ids
+    ids: typing.Callable[[], list[int]]  # Sorted ids, built only for chosen path
+
+    # Check that replaces path when path isn't chosen.
+    # None if ids must be verified by predicate anyway.
+    predicate: Predicate | None = None
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    access: str | None  # Name of chosen access path, None means scan of all books
+    ids: list[int] | None
+    predicates: tuple[Filter, ...]
+
+    def apply(self, books: typing.Iterable["BookSchema"]) -> typing.Iterator["BookSchema"]:
+        """
+        Filters candidates by predicates of plan.
+        """
+        books = iter(books)
+        for check in self.predicates:
+            books = filter(check, books)
+
+        return books
+
+
+def make_plan(total: int, paths: list[AccessPath], predicates: list[Predicate]) -> QueryPlan:
+    """
+    :param total: Count of books in storage.
+    :param paths: Available access paths.
+    :param predicates: Filters without access path.
+    """
+    chosen = min(paths, key=lambda path: path.estimate, default=None)
+    if chosen is not None and chosen.estimate > total * MAX_ACCESS_SHARE:
+        chosen = None
+
+    predicates = list(predicates)
+    for path in paths:
+        if path is not chosen and path.predicate is not None:
+            predicates.append(path.predicate)
+
+    predicates.sort(key=lambda predicate: predicate.rank, reverse=True)
+    return QueryPlan(
+        access=chosen.name if chosen is not None else None,
+        ids=chosen.ids() if chosen is not None else None,
+        predicates=tuple(predicate.check for predicate in predicates),
+    )
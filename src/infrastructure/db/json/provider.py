@@ -1,14 +1,19 @@
+import io
 import json
+import os
 import typing
 from json import JSONDecodeError
 from pathlib import Path
 
-from src.infrastructure.db.json import IOProvider
+from src.infrastructure.db.files import atomic_write, file_lock, file_version, read_side_file, write_side_file
+from src.infrastructure.db.json import IOProvider, Journal
+from src.infrastructure.db.json.stream import StreamProvider
 
 
-class FileJsonProvider(IOProvider):
+class FileJsonProvider(IOProvider, StreamProvider):
     def __init__(self, path: str | Path):
         self._path = Path(path)
+        self._index_path = self._path.with_name(self._path.name + ".dedup")
 
     def read_json(self) -> typing.Any:
         if not self._path.exists():
@@ -25,6 +30,103 @@ class FileJsonProvider(IOProvider):
 
                 raise err
 
+    def open_stream(self) -> typing.TextIO:
+        if not self._path.exists():
+            return io.StringIO()
+
+        return open(self._path, mode="r", encoding="utf-8")
+
     def write_json(self, data: typing.Any) -> None:
-        with self._path.open(mode="w+", encoding="utf-8") as f:
+        with atomic_write(self._path, mode="w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False)
+
+    def lock(self) -> typing.ContextManager:
+        return file_lock(self._path.with_name(self._path.name + ".lock"))
+
+    def version(self) -> typing.Hashable:
+        return file_version(self._path)
+
+    def read_dedup_index(self, version: typing.Hashable) -> bytes | None:
+        return read_side_file(self._index_path, version)
+
+    def write_dedup_index(self, data: bytes):
+        write_side_file(self._index_path, self._path, data)
+
+
+class FileJsonJournal(Journal):
+    """
+    Journal in JSON Lines format: one record per line.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+
+    def read_records(self) -> typing.Iterable[typing.Any]:
+        if not self._path.exists():
+            return []
+
+        records = []
+        with open(self._path, mode="rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn write of the last record
+                    # or record is being written by other process.
+                    break
+
+                try:
+                    records.append(json.loads(line))
+                except JSONDecodeError:
+                    break
+
+        return records
+
+    def append(self, records: list[typing.Any]):
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n"
+            for record in records
+        )
+        self._drop_torn_tail()
+        with self._path.open(mode="a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _drop_torn_tail(self):
+        """
+        Drops incomplete last record, otherwise next append will be glued to it.
+        Writer holds lock of storage, so nobody else writes now.
+        """
+        if not self._path.exists():
+            return
+
+        with open(self._path, mode="r+b") as f:
+            pos = f.seek(0, os.SEEK_END)
+            if pos == 0:
+                return
+
+            f.seek(pos - 1)
+            if f.read(1) == b"\n":
+                return
+
+            while pos > 0:
+                step = min(pos, 4096)
+                pos -= step
+                f.seek(pos)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(pos + newline + 1)
+                    return
+
+            f.truncate(0)
+
+    def truncate(self):
+        self._path.unlink(missing_ok=True)
+
+    def size(self) -> int:
+        try:
+            return self._path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def version(self) -> typing.Hashable:
+        return file_version(self._path)
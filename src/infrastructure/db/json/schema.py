@@ -1,12 +1,36 @@
-import hashlib
+import bisect
+import threading
 import typing
+from array import array
 from dataclasses import dataclass, field
-from typing import TypedDict
+from typing import TypedDict, NotRequired
 
+from src.application.book import dto
 from src.application.book.exceptions import BookAlreadyExists, BookNotFound
 from src.application.common.exceptions import MappingError
 from src.domain.book.entity import Book
 from src.domain.book.vo import BookStatus
+from src.infrastructure.db.dedup import DedupIndex, book_digest
+from .authors import AuthorDictionary
+from .filter import FilterFactory
+from .parallel import ParallelScanner
+from .planner import (
+    COST_AUTHOR,
+    COST_TITLE,
+    COST_YEAR,
+    TITLE_SELECTIVITY,
+    AccessPath,
+    Predicate,
+    QueryPlan,
+    make_plan,
+)
+from .trigram import MIN_NEEDLE, TrigramIndex
+from .vectorized import VECTORIZED_AFTER_SEARCHES, VECTORIZED_MIN_BOOKS, VectorIndex, is_available
+from .years import YearIndex, year_bounds
+
+# Trigram index costs several scans of library to build, so it is built only when
+# searches by title repeat. It is built in background, searches scan titles until it is ready.
+TITLE_INDEX_AFTER_SEARCHES = 2
 
 
 class _BookJson(TypedDict):
@@ -27,6 +51,9 @@ class _SchemaJson(TypedDict):
     last_id: int
     books: list[_BookJson]
 
+    # Sequence number of last journal record folded into this snapshot.
+    journal_seq: NotRequired[int]
+
 
 @dataclass
 class BookSchema:
@@ -40,6 +67,9 @@ class BookSchema:
 
     status: bool  # Status reports is book available for take.
 
+    # Memoized dedup digest, book fields aren't changed after creation.
+    _digest: bytes | None = field(default=None, init=False, repr=False, compare=False)
+
     def _status_convert(self) -> BookStatus:
         return BookStatus.AVAILABLE if self.status else BookStatus.TAKEN
 
@@ -61,16 +91,41 @@ class BookSchema:
             status=self.status,
         )
 
+    @classmethod
+    def from_json(cls, data: typing.Any, index: int | None = None) -> "BookSchema":
+        where = f" for book with index {index}" if index is not None else ""
+        if not isinstance(data, dict):
+            raise MappingError(f"The object `book` must be a dict{where}")
+
+        try:
+            return cls(
+                id=int(data["id"]),
+                title=str(data["title"]),
+                author=str(data["author"]),
+                year=int(data["year"]),
+                status=bool(data["status"]),
+            )
+        except KeyError as err:
+            key = err.args[0]
+            raise MappingError(f"Missing field {key!r}{where}")
+
     @property
-    def hash(self):
+    def digest(self) -> bytes:
         """
-        Calculates hash for book. It needs to exclude same books (Title+Author+Year)
+        Calculates dedup digest for book. It needs to exclude same books (Title+Author+Year).
+        Digest is calculated once.
         """
-        h = hashlib.sha1(usedforsecurity=False)
-        h.update(self.title.lower().encode())
-        h.update(self.author.lower().encode())
-        h.update(str(self.year).encode())
-        return h.hexdigest()
+        if self._digest is None:
+            self._digest = book_digest(self.title, self.author, self.year)
+
+        return self._digest
+
+    @property
+    def hash(self) -> str:
+        """
+        Dedup digest as hex string.
+        """
+        return self.digest.hex()
 
 
 @dataclass
@@ -80,35 +135,253 @@ class Schema:
 
     Books are stored as dict where key is book id for fast search by ID.
 
-    Hashes also stored like dict (hash -> book_id). For fast create/delete/update operations.
+    Hashes are stored in compact index (digest -> book_id). For fast create/delete/update operations.
+    Index is built on first use or attached from saved copy.
+
+    Authors are interned in dictionary with postings (author -> book ids),
+    so author filter doesn't lowercase author of every book.
+    Title filter uses trigram index, it is built when searches by title repeat.
+    Year filters use sorted (year, id) index, it is built on first search by year.
+    Sorted ids are built on first keyset pagination, page is found by bisect.
+
+    Search is planned by statistics (year histogram, count of books of author,
+    available indexes): the most selective index gives candidates,
+    other filters are checked in order of cost and selectivity.
+    With NumPy big libraries filter by year and author with masks over arrays (see VectorIndex).
+    Full scans by title of big libraries are split between processes by attached ParallelScanner.
     """
 
     last_id: int = field(default=0)  # Like auto-increment
 
     books: dict[int, BookSchema] = field(default_factory=dict)
 
-    _hashes: dict[str, int] = field(init=False)
+    # Sequence number of last journal record folded into snapshot.
+    journal_seq: int = field(default=0)
+
+    # Incremented by every mutation of books, cached search results are checked by it.
+    generation: int = field(default=0, init=False, repr=False, compare=False)
+
+    _hashes: DedupIndex | None = field(default=None, init=False, repr=False, compare=False)
+
+    _authors: AuthorDictionary = field(init=False, repr=False, compare=False)
+    _titles: TrigramIndex | None = field(default=None, init=False, repr=False, compare=False)
+    _title_build: threading.Thread | None = field(default=None, init=False, repr=False, compare=False)
+    # Changes of titles (id, lowercase title, added) made while index is built
+    _title_changes: list[tuple[int, str, bool]] | None = field(default=None, init=False, repr=False, compare=False)
+    _title_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _title_searches: int = field(default=0, init=False, repr=False, compare=False)
+    _years: YearIndex | None = field(default=None, init=False, repr=False, compare=False)
+    _year_counts: dict[int, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _vector: VectorIndex | None = field(default=None, init=False, repr=False, compare=False)
+    _vector_searches: int = field(default=0, init=False, repr=False, compare=False)
+    _ids: array | None = field(default=None, init=False, repr=False, compare=False)
+    _scanner: ParallelScanner | None = field(default=None, init=False, repr=False, compare=False)
+
+    # Order of books dict matches order of ids, so postings give books in storage order.
+    _ordered: bool = field(default=True, init=False, repr=False, compare=False)
+    _max_id: int = field(default=0, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self._hashes = {
-            book.hash: book.id
+        self._authors = AuthorDictionary()
+        for book in self.books.values():
+            self._index_book(book)
+            self._track_order(book.id)
+
+    def _index_book(self, book: BookSchema):
+        self._title_changed(book.id, book.title, added=True)
+
+        if self._years is not None:
+            self._years.add(book.year, book.id)
+
+        self._year_counts[book.year] = self._year_counts.get(book.year, 0) + 1
 
-            for book in self.books.values()
-        }
+        code = self._authors.intern(book.author)
+        # Every book of author shares one string
+        book.author = self._authors.name(code)
+        self._authors.add(code, book.id)
+
+        if self._vector is not None:
+            self._vector.add(book.id, book.year, code)
+
+    def _track_order(self, book_id: int):
+        """
+        Called for new book only: updated book keeps its place in books dict.
+        """
+        if book_id <= self._max_id:
+            self._ordered = False
+        else:
+            self._max_id = book_id
+
+    def _unindex_book(self, book: BookSchema):
+        self._title_changed(book.id, book.title, added=False)
+
+        if self._years is not None:
+            self._years.remove(book.year, book.id)
+
+        count = self._year_counts[book.year] - 1
+        if count:
+            self._year_counts[book.year] = count
+        else:
+            del self._year_counts[book.year]
+
+        self._authors.remove(self._authors.intern(book.author), book.id)
+
+        if self._vector is not None:
+            self._vector.remove(book.id)
+            if self._vector.dead * 2 > len(self.books):
+                # Rebuilt without deleted books on next search
+                self._vector = None
+
+    def _title_changed(self, book_id: int, title: str, added: bool):
+        if self._titles is None:
+            if self._title_changes is None:
+                return
+
+            with self._title_lock:
+                if self._titles is None:
+                    # Index is being built, change is applied when it is ready
+                    self._title_changes.append((book_id, title.lower(), added))
+                    return
+
+        if added:
+            self._titles.add(book_id, title.lower())
+        else:
+            self._titles.remove(book_id, title.lower())
+
+    def _start_title_index(self):
+        """
+        Starts build of trigram index in background thread, so it doesn't hold out writers.
+        """
+        with self._title_lock:
+            if self._titles is not None or self._title_build is not None:
+                return
+
+            self._title_changes = []
+            self._title_build = threading.Thread(target=self._build_title_index, name="title-index", daemon=True)
+
+        self._title_build.start()
+
+    def _build_title_index(self):
+        # Books are copied at once, changes after it are in log of changes.
+        # Changes before it may be there too, they are applied twice.
+        books = list(self.books.values())
+        index = TrigramIndex.build((book.id, book.title.lower()) for book in books)
+        with self._title_lock:
+            for book_id, title, added in self._title_changes:
+                if added:
+                    index.add(book_id, title)
+                else:
+                    index.remove(book_id, title)
+
+            self._title_changes = None
+            self._titles = index
+
+    @property
+    def year_index(self) -> YearIndex:
+        if self._years is None:
+            self._years = YearIndex.build((book.year, book.id) for book in self.books.values())
+
+        return self._years
+
+    @property
+    def vector_index(self) -> VectorIndex:
+        if self._vector is None:
+            self._vector = VectorIndex.build(
+                ((book.id, book.year, self._authors.intern(book.author)) for book in self.books.values()),
+                size_hint=len(self.books),
+            )
+
+        return self._vector
+
+    def _vectorized(self, filters: dto.BookFilter) -> bool:
+        """
+        Reports whether filters by year and author are evaluated by VectorIndex.
+        """
+        if not is_available() or len(self.books) < VECTORIZED_MIN_BOOKS:
+            return False
+
+        if not filters.author:
+            # Years alone are found faster by bisect of year index
+            return False
+
+        self._vector_searches += 1
+        return self._vector is not None or self._vector_searches >= VECTORIZED_AFTER_SEARCHES
+
+    @property
+    def id_order(self) -> array:
+        """
+        Sorted ids of books.
+        """
+        if self._ids is None:
+            ids = array("q", self.books)
+            self._ids = ids if self._ordered else array("q", sorted(ids))
+
+        return self._ids
+
+    @property
+    def dedup_index(self) -> DedupIndex:
+        if self._hashes is None:
+            self._hashes = DedupIndex.build(
+                ((book.digest, book.id) for book in self.books.values()),
+                size_hint=len(self.books),
+            )
+
+        return self._hashes
+
+    def attach_dedup_index(self, index: DedupIndex):
+        """
+        Uses saved index instead of hashing all books.
+        Index must be built for the same books.
+        """
+        self._hashes = index
+
+    def attach_scanner(self, scanner: ParallelScanner):
+        """
+        Uses scanner for full scans by title, if library is big enough for it.
+        """
+        self._scanner = scanner
+
+    def _parallel(self, filters: dto.BookFilter, plan: QueryPlan) -> bool:
+        # Only substring search over all books is worth of processes
+        return (
+            plan.ids is None
+            and bool(filters.title)
+            and self._scanner is not None
+            and self._scanner.accepts(len(self.books))
+        )
 
     def next_id(self) -> int:
         self.last_id += 1
         return self.last_id
 
-    def insert(self, book: BookSchema):
+    def find_duplicate(self, book: BookSchema) -> int | None:
+        """
+        Returns id of other book with same title+author+year.
+        """
+        existing_book_id = self.dedup_index.get(book.digest)
+        if existing_book_id == book.id:
+            return None
+
+        return existing_book_id
 
-        book_hash = book.hash
-        existing_book = self._hashes.get(book_hash)
-        if existing_book:
+    def insert(self, book: BookSchema):
+        hashes = self.dedup_index
+        existing_book = hashes.get(book.digest)
+        if existing_book is not None:
             raise BookAlreadyExists(existing_book)
 
         self.books[book.id] = book
-        self._hashes[book_hash] = book.id
+        hashes.put(book.digest, book.id)
+        self._index_book(book)
+        self._track_order(book.id)
+
+        if self._ids is not None:
+            if not self._ids or self._ids[-1] < book.id:
+                self._ids.append(book.id)
+            else:
+                bisect.insort(self._ids, book.id)
+
+        self.generation += 1
 
     def update(self, book: BookSchema):
         # Lookup book from schema
@@ -117,22 +390,214 @@ class Schema:
             raise BookNotFound()
 
         # Lookup book with same hash
-        existing_book_id = self._hashes.get(book.hash)
-        if existing_book_id and existing_book_id != book_prev.id:
+        hashes = self.dedup_index
+        existing_book_id = hashes.get(book.digest)
+        if existing_book_id is not None and existing_book_id != book_prev.id:
             # Book with same hash can already exist but with different id
             raise BookAlreadyExists(existing_book_id)
 
         self.books[book.id] = book
+        self._unindex_book(book_prev)
+        self._index_book(book)
+
+        if book_prev.digest != book.digest:
+            hashes.remove(book_prev.digest)
+            hashes.put(book.digest, book.id)
 
-        del self._hashes[book_prev.hash]
-        self._hashes[book.hash] = book.id
+        self.generation += 1
 
     def delete(self, book_id: int):
         book = self.books.pop(book_id, None)
         if book is None:
             raise BookNotFound()
 
-        del self._hashes[book.hash]
+        self.dedup_index.remove(book.digest)
+        self._unindex_book(book)
+
+        if self._ids is not None:
+            del self._ids[bisect.bisect_left(self._ids, book_id)]
+
+        self.generation += 1
+
+    def _year_count(self, year_from: int | None, year_to: int | None) -> int:
+        if self._years is not None:
+            return self._years.count(year_from, year_to)
+
+        return sum(
+            count for year, count in self._year_counts.items()
+            if (year_from is None or year >= year_from) and (year_to is None or year <= year_to)
+        )
+
+    def _add_index_paths(self, filters: dto.BookFilter, total: int, paths: list[AccessPath]):
+        """
+        Adds paths of author postings and year index.
+        """
+        if filters.author:
+            codes = self._authors.match(filters.author)
+            count = self._authors.count(codes)
+            # Authors of books are interned, so matched authors are known by value
+            names = frozenset(self._authors.name(code) for code in codes)
+            paths.append(AccessPath(
+                name="author",
+                estimate=count,
+                ids=lambda: list(self._authors.keys(codes)),
+                predicate=Predicate(lambda book: book.author in names, COST_AUTHOR, count / total),
+            ))
+
+        years = year_bounds(filters)
+        if years is not None:
+            count = self._year_count(*years)
+            paths.append(AccessPath(
+                name="year",
+                estimate=count,
+                ids=lambda: self.year_index.ids(*years),
+                predicate=Predicate(FilterFactory.year_range(*years), COST_YEAR, count / total),
+            ))
+
+    def _vector_path(self, filters: dto.BookFilter, total: int) -> AccessPath:
+        """
+        One access path for both year and author, ids are taken by mask.
+        """
+        codes = self._authors.match(filters.author) if filters.author else None
+        years = year_bounds(filters)
+        index = self.vector_index
+        mask = index.mask(years, codes)
+        count = int(mask.sum())
+
+        checks = []
+        if codes is not None:
+            names = frozenset(self._authors.name(code) for code in codes)
+            checks.append(lambda book: book.author in names)
+
+        if years is not None:
+            checks.append(FilterFactory.year_range(*years))
+
+        check = checks[0] if len(checks) == 1 else FilterFactory.and_(checks)
+        return AccessPath(
+            name="vectorized",
+            estimate=count,
+            ids=lambda: index.take(mask),
+            predicate=Predicate(check, COST_AUTHOR * len(checks), count / total),
+        )
+
+    def plan(self, filters: dto.BookFilter) -> QueryPlan:
+        """
+        Plans search of books accepted by non-empty filters.
+        """
+        total = max(len(self.books), 1)
+        paths = []
+        predicates = []
+
+        if self._vectorized(filters):
+            paths.append(self._vector_path(filters, total))
+        else:
+            self._add_index_paths(filters, total, paths)
+
+        if filters.title:
+            found = None
+            needle = filters.title.lower()
+            if len(needle) >= MIN_NEEDLE:
+                self._title_searches += 1
+                if self._titles is None and self._title_searches >= TITLE_INDEX_AFTER_SEARCHES:
+                    self._start_title_index()
+
+                titles = self._titles
+                if titles is not None:
+                    found = titles.candidates(needle)
+
+            selectivity = TITLE_SELECTIVITY
+            if found is not None:
+                selectivity = len(found) / total
+                # Candidates of trigram index must be verified by predicate
+                paths.append(AccessPath(name="title", estimate=len(found), ids=lambda: found))
+
+            predicates.append(Predicate(FilterFactory.title(filters.title), COST_TITLE, selectivity))
+
+        return make_plan(total, paths, predicates)
+
+    def select(self, filters: dto.BookFilter) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books accepted by filters in storage order.
+        """
+        if filters.is_empty:
+            return iter(self.books.values())
+
+        plan = self.plan(filters)
+        if self._parallel(filters, plan):
+            return self._scanner.scan(self, filters)
+
+        if plan.ids is None:
+            books_iter = iter(self.books.values())
+        elif self._ordered:
+            books_iter = map(self.books.__getitem__, plan.ids)
+        else:
+            # Ids must be taken in storage order
+            candidate_set = set(plan.ids)
+            books_iter = (book for book in self.books.values() if book.id in candidate_set)
+
+        return plan.apply(books_iter)
+
+    def select_keyset(
+        self,
+        filters: dto.BookFilter,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        reverse: bool = False,
+    ) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books accepted by filters with ids between cursors (exclusive)
+        in ascending order of ids, or in descending if reverse.
+        Cursor is found by bisect, books before it aren't touched.
+        """
+        plan = None if filters.is_empty else self.plan(filters)
+        ids = self.id_order if plan is None or plan.ids is None else plan.ids
+
+        lo = 0 if after_id is None else bisect.bisect_right(ids, after_id)
+        hi = len(ids) if before_id is None else bisect.bisect_left(ids, before_id)
+        positions = range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)
+        books_iter = (self.books[ids[i]] for i in positions)
+
+        if plan is not None:
+            books_iter = plan.apply(books_iter)
+
+        return books_iter
+
+    def count(self, filters: dto.BookFilter) -> int:
+        """
+        Counts books accepted by filters.
+        """
+        if filters.is_empty:
+            return len(self.books)
+
+        if not filters.title:
+            years = year_bounds(filters)
+            if not filters.author:
+                # Empty strings and year 0 don't filter, like in FilterFactory
+                return len(self.books) if years is None else self.year_index.count(*years)
+
+            if years is None:
+                return self._authors.count(self._authors.match(filters.author))
+
+            if self._vectorized(filters):
+                return self.vector_index.count(years, self._authors.match(filters.author))
+
+        plan = self.plan(filters)
+        if self._parallel(filters, plan):
+            return self._scanner.count(self, filters)
+
+        if plan.ids is None:
+            books_iter = self.books.values()
+        elif not plan.predicates:
+            return len(plan.ids)
+        else:
+            # Order doesn't matter for count
+            books_iter = map(self.books.__getitem__, plan.ids)
+
+        count = 0
+        for _ in plan.apply(books_iter):
+            count += 1
+
+        return count
 
     def to_json(self) -> _SchemaJson:
         return _SchemaJson(
@@ -143,6 +608,13 @@ class Schema:
             ]
         )
 
+    @classmethod
+    def read(cls, provider: typing.Any) -> "Schema":
+        """
+        Reads schema from IOProvider.
+        """
+        return cls.from_json(provider.read_json())
+
     @classmethod
     def from_json(cls, data: typing.Any):
         if data is None:
@@ -165,20 +637,15 @@ class Schema:
 
         books = {}
         for i, book_raw in enumerate(books_raw):
-            if not isinstance(book_raw, dict):
-                raise MappingError(f"The object `book` must be a dict for book with index {i}")
-            try:
-                book = BookSchema(
-                    id=int(book_raw["id"]),
-                    title=str(book_raw["title"]),
-                    author=str(book_raw["author"]),
-                    year=int(book_raw["year"]),
-                    status=bool(book_raw["status"]),
-                )
-            except KeyError as err:
-                key = err.args[0]
-                raise MappingError(f"Missing field {key!r} for book with index {i}")
-
+            book = BookSchema.from_json(book_raw, index=i)
             books[book.id] = book
 
-        return cls(last_id=last_id, books=books)
+        return cls(last_id=last_id, books=books, journal_seq=_parse_journal_seq(data))
+
+
+def _parse_journal_seq(data: dict) -> int:
+    journal_seq = data.get("journal_seq", 0)
+    if not isinstance(journal_seq, int):
+        raise MappingError("The field `journal_seq` must be an integer")
+
+    return journal_seq
@@ -0,0 +1,601 @@
+import contextlib
+import heapq
+import operator
+import threading
+import typing
+from pathlib import Path
+from typing import TypedDict, NotRequired
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.book.interfaces.repository import BookRepository
+from src.application.common.exceptions import MappingError
+from src.application.common.pagination import Page, Pagination
+from src.domain.book.entity import Book
+from src.infrastructure.db.files import MISSING_VERSION
+from .filter import FilterFactory
+from .provider import FileJsonProvider
+from .schema import BookSchema, Schema
+from .storage import convert_book_status_to_bool
+from .utils import paginate_page
+
+PARTITION_ID = "id"
+PARTITION_HASH = "hash"
+
+# Location of book is stored in one byte, 0 means no book.
+MAX_HASH_SHARDS = 255
+
+
+class _ShardJson(TypedDict):
+    """
+    _ShardJson is representation how shard will in manifest.
+    """
+    file: str
+    count: int
+
+
+class _ManifestJson(TypedDict):
+    """
+    _ManifestJson is representation how manifest of shards will in JSON.
+    """
+    last_id: int
+    partition: str
+    shard_size: NotRequired[int]
+    shards: list[_ShardJson]
+
+
+class _LocationMap:
+    """
+    Maps book id to shard of hash partition.
+    File has one byte per id: shard index + 1. So lookup and update
+    read/write only one byte of file.
+    """
+
+    def __init__(self, path: Path):
+        path.touch(exist_ok=True)
+        self._file = open(path, mode="r+b")
+
+    def close(self):
+        self._file.close()
+
+    def get(self, book_id: int) -> int | None:
+        if book_id < 0:
+            return None
+
+        self._file.seek(book_id)
+        data = self._file.read(1)
+        if not data or data[0] == 0:
+            return None
+
+        return data[0] - 1
+
+    def set(self, book_id: int, shard: int | None):
+        self.set_many([(book_id, shard)])
+
+    def set_many(self, locations: typing.Iterable[tuple[int, int | None]]):
+        """
+        Writes locations of books (id, shard) with one flush.
+        """
+        for book_id, shard in locations:
+            value = 0 if shard is None else shard + 1
+            # Write after end of file fills gap with zeros
+            self._file.seek(book_id)
+            self._file.write(bytes((value,)))
+
+        self._file.flush()
+
+
+class ShardedJsonStorage(BookRepository):
+    """
+    ShardedJsonStorage splits library across several JSON files (shards).
+    Manifest holds last_id and shard map, shards are loaded on demand.
+    Manifest is kept in its own file next to path, so not sharded library
+    at path is left as is after it was split.
+
+    Partitions:
+        id   - shard contains fixed range of ids. Search in id order loads shards
+               one by one and stops when page is filled. Dedup check must load all shards.
+        hash - shard is picked by dedup hash of book. Dedup check loads only one shard,
+               location of id is stored in separate byte map. Search loads all shards.
+
+    Lookup, update and delete by id load and rewrite only one shard
+    (update in hash partition can move book to other shard).
+
+    Several processes can share storage: changes are made under lock
+    of manifest, shards and manifest changed by other process are reloaded first.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        partition: str = PARTITION_HASH,
+        shards: int = 16,
+        shard_size: int = 10_000,
+    ):
+        """
+        :param path: Path to library. Manifest, shards and location map are kept next to it.
+        :param partition: Partition of new storage. Existing manifest keeps its own.
+        :param shards: Count of shards for hash partition.
+        :param shard_size: Count of ids in one shard for id partition.
+        """
+        self._path = Path(path)
+        self._manifest = FileJsonProvider(self._path.with_name(self._path.name + ".manifest"))
+        # Serializes threads of this process
+        self._lock = threading.RLock()
+        # Depth of writes holding lock of manifest between processes
+        self._write_depth = 0
+        self._loaded: dict[int, Schema] = {}
+        # Versions of files that loaded shards and manifest were read from
+        self._shard_versions: dict[int, typing.Hashable] = {}
+        self._manifest_version: typing.Hashable = None
+        self._locations: _LocationMap | None = None
+
+        self._partition = partition
+        self._shard_size = shard_size
+        self._counts: list[int] = [0] * shards if partition == PARTITION_HASH else []
+        self.last_id = 0
+
+        with self._lock:
+            self._refresh()
+            if self._manifest_version == MISSING_VERSION and self._path.exists():
+                with self._writing():
+                    # Other process could split library while lock was awaited
+                    if self._manifest_version == MISSING_VERSION:
+                        self._split(Schema.from_json(FileJsonProvider(self._path).read_json()))
+
+    def close(self):
+        if self._locations is not None:
+            self._locations.close()
+
+    @contextlib.contextmanager
+    def _writing(self) -> typing.Iterator[None]:
+        """
+        Holds lock of manifest between processes during read-modify-write
+        of shards, location map and manifest. Changes of other processes are loaded first.
+        """
+        with self._lock:
+            lock = self._manifest.lock() if not self._write_depth else contextlib.nullcontext()
+            with lock:
+                if not self._write_depth:
+                    self._refresh()
+
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+
+    def _refresh(self):
+        """
+        Reloads manifest and drops loaded shards if their files were changed by other process.
+        Unchanged files are checked only with stat.
+        """
+        if self._write_depth:
+            # Nobody else can write now
+            return
+
+        if self._manifest.version() != self._manifest_version:
+            self._load_manifest()
+
+        for index, version in list(self._shard_versions.items()):
+            if FileJsonProvider(self._shard_path(index)).version() != version:
+                del self._loaded[index]
+                del self._shard_versions[index]
+
+    def _load_manifest(self):
+        # Version is taken before reading, so concurrent change will be noticed on next refresh
+        self._manifest_version = self._manifest.version()
+        data = self._manifest.read_json()
+        if data is None:
+            self._open_locations()
+            return
+
+        if not isinstance(data, dict):
+            raise MappingError("Invalid type of manifest")
+
+        try:
+            self.last_id = int(data["last_id"])
+            self._partition = str(data["partition"])
+            self._shard_size = int(data.get("shard_size", self._shard_size))
+            self._counts = [int(shard["count"]) for shard in data["shards"]]
+        except (KeyError, TypeError, ValueError) as err:
+            raise MappingError(f"Invalid manifest: {err}")
+
+        if self._partition not in (PARTITION_ID, PARTITION_HASH):
+            raise MappingError(f"Unknown partition {self._partition!r}")
+
+        self._open_locations()
+
+    def _open_locations(self):
+        if self._partition == PARTITION_HASH:
+            if not 0 < len(self._counts) <= MAX_HASH_SHARDS:
+                raise MappingError(f"Count of hash shards must be in range 1..{MAX_HASH_SHARDS}")
+
+            if self._locations is not None:
+                # Buffer of file could keep locations written by other process
+                self._locations.close()
+
+            self._locations = _LocationMap(self._path.with_name(self._path.name + ".loc"))
+
+    def _split(self, schema: Schema):
+        self.last_id = schema.last_id
+        touched = set()
+        locations = []
+        for book in schema.books.values():
+            index = self._shard_for_new(book)
+            self._shard(index).insert(book)
+            self._counts[index] += 1
+            touched.add(index)
+            locations.append((book.id, index))
+
+        self._persist(touched, locations, manifest=True)
+
+    def _shard_path(self, index: int) -> Path:
+        return self._path.with_name(f"{self._path.stem}.{index:04d}{self._path.suffix}")
+
+    def _shard(self, index: int) -> Schema:
+        shard = self._loaded.get(index)
+        if shard is None:
+            if index >= len(self._counts):
+                self._counts.extend([0] * (index + 1 - len(self._counts)))
+
+            provider = FileJsonProvider(self._shard_path(index))
+            version = provider.version()
+            shard = Schema.from_json(provider.read_json())
+            self._loaded[index] = shard
+            self._shard_versions[index] = version
+
+        return shard
+
+    def _save_shard(self, index: int):
+        shard = self._loaded[index]
+        shard.last_id = self.last_id
+        provider = FileJsonProvider(self._shard_path(index))
+        provider.write_json(shard.to_json())
+        self._shard_versions[index] = provider.version()
+
+    def _save_manifest(self):
+        data = _ManifestJson(
+            last_id=self.last_id,
+            partition=self._partition,
+            shards=[
+                _ShardJson(file=self._shard_path(index).name, count=count)
+                for index, count in enumerate(self._counts)
+            ],
+        )
+        if self._partition == PARTITION_ID:
+            data["shard_size"] = self._shard_size
+
+        self._manifest.write_json(data)
+        self._manifest_version = self._manifest.version()
+
+    def _shard_for_new(self, book: BookSchema) -> int:
+        if self._partition == PARTITION_HASH:
+            return int.from_bytes(book.digest[:4], "big") % len(self._counts)
+
+        return (book.id - 1) // self._shard_size
+
+    def _locate(self, book_id: int) -> int | None:
+        if self._partition == PARTITION_HASH:
+            return self._locations.get(book_id)
+
+        if book_id < 1:
+            return None
+
+        index = (book_id - 1) // self._shard_size
+        if index >= len(self._counts) or self._counts[index] == 0:
+            return None
+
+        return index
+
+    def _find_duplicate(self, book: BookSchema, index: int) -> int | None:
+        """
+        Finds same book. Hash partition checks only shard of book.
+        """
+        if self._partition == PARTITION_HASH:
+            return self._shard(index).find_duplicate(book)
+
+        for i in range(len(self._counts)):
+            if self._counts[i] == 0 and i != index:
+                continue
+
+            existing_book_id = self._shard(i).find_duplicate(book)
+            if existing_book_id is not None:
+                return existing_book_id
+
+        return None
+
+    def acquire_new_id(self) -> int:
+        with self._writing():
+            self.last_id += 1
+            return self.last_id
+
+    def save_book(self, book: dto.NewBook) -> int:
+        """
+        Save book to storage.
+        Duplicates of books will raise error.
+
+        :param book: Object of new book
+        :return: ID of saved book
+        :raise BookAlreadyExists: If book with same title+author+year already exists:
+        """
+        with self._writing():
+            book_id = self.acquire_new_id()
+            book_model = BookSchema(
+                id=book_id,
+                title=book.title,
+                author=book.author,
+                year=book.year,
+                status=convert_book_status_to_bool(book.status)
+            )
+
+            index = self._shard_for_new(book_model)
+            existing_book_id = self._find_duplicate(book_model, index)
+            if existing_book_id is not None:
+                raise BookAlreadyExists(existing_book_id)
+
+            self._shard(index).insert(book_model)
+            self._counts[index] += 1
+            self._save_shard(index)
+            if self._locations is not None:
+                self._locations.set(book_id, index)
+
+            self._save_manifest()
+
+        return book_id
+
+    def _persist(self, touched: set[int], locations: list[tuple[int, int | None]], manifest: bool):
+        """
+        Writes touched shards once, then location map and manifest.
+        :param locations: Changed locations of books (id, shard) for hash partition.
+        :param manifest: Counts of shards or last_id changed.
+        """
+        for index in sorted(touched):
+            self._save_shard(index)
+
+        if self._locations is not None and locations:
+            self._locations.set_many(locations)
+
+        if manifest:
+            self._save_manifest()
+
+    def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        """
+        Saves books with one write of every touched shard and of manifest.
+        Duplicates are skipped.
+
+        :return: For every book ID of saved book or error with ID of existing duplicate.
+        """
+        results = []
+        touched: set[int] = set()
+        locations = []
+        with self._writing():
+            for book in books:
+                book_model = BookSchema(
+                    id=self.last_id + 1,
+                    title=book.title,
+                    author=book.author,
+                    year=book.year,
+                    status=convert_book_status_to_bool(book.status)
+                )
+
+                index = self._shard_for_new(book_model)
+                existing_book_id = self._find_duplicate(book_model, index)
+                if existing_book_id is not None:
+                    results.append(BookAlreadyExists(existing_book_id))
+                    continue
+
+                self.last_id += 1
+                self._shard(index).insert(book_model)
+                self._counts[index] += 1
+                touched.add(index)
+                locations.append((book_model.id, index))
+                results.append(book_model.id)
+
+            if touched:
+                self._persist(touched, locations, manifest=True)
+
+        return results
+
+    def _update(self, book: Book, touched: set[int], locations: list[tuple[int, int | None]]) -> bool:
+        """
+        Updates book in loaded shards, shards to write are added to touched.
+        :return: True if book moved to other shard.
+        """
+        index = self._locate(book.id)
+        book_prev = self._shard(index).books.get(book.id) if index is not None else None
+        if book_prev is None:
+            raise BookNotFound()
+
+        book_obj = BookSchema(
+            id=book.id,
+            title=book.title,
+            author=book.author,
+            year=book.year,
+            status=convert_book_status_to_bool(book.status),
+        )
+
+        if book_prev.digest == book_obj.digest:
+            # Only status changed, other shards aren't loaded for dedup check
+            self._shard(index).update(book_obj)
+            touched.add(index)
+            return False
+
+        new_index = index
+        if self._partition == PARTITION_HASH:
+            new_index = self._shard_for_new(book_obj)
+
+        existing_book_id = self._find_duplicate(book_obj, new_index)
+        if existing_book_id is not None:
+            raise BookAlreadyExists(existing_book_id)
+
+        touched.add(index)
+        if new_index == index:
+            self._shard(index).update(book_obj)
+            return False
+
+        # Dedup hash changed, book moves to other shard
+        self._shard(index).delete(book.id)
+        self._shard(new_index).insert(book_obj)
+        self._counts[index] -= 1
+        self._counts[new_index] += 1
+        touched.add(new_index)
+        locations.append((book.id, new_index))
+        return True
+
+    def update_book(self, book: Book):
+        """
+        Full updates book in storage.
+        :param book: Updated book object
+        """
+        touched: set[int] = set()
+        locations = []
+        with self._writing():
+            moved = self._update(book, touched, locations)
+            self._persist(touched, locations, manifest=moved)
+
+    def update_books(self, books: list[Book]):
+        """
+        Full updates books with one write of every touched shard.
+        :raise BookNotFound: If book with given ID not exists, books before it are updated.
+        """
+        touched: set[int] = set()
+        locations = []
+        moved = False
+        with self._writing():
+            try:
+                for book in books:
+                    moved = self._update(book, touched, locations) or moved
+            finally:
+                self._persist(touched, locations, manifest=moved)
+
+    def _delete(self, book_id: int, touched: set[int], locations: list[tuple[int, int | None]]) -> bool:
+        index = self._locate(book_id)
+        if index is None or book_id not in self._shard(index).books:
+            return False
+
+        self._shard(index).delete(book_id)
+        self._counts[index] -= 1
+        touched.add(index)
+        locations.append((book_id, None))
+        return True
+
+    def delete_book(self, book_id: int):
+        touched: set[int] = set()
+        locations = []
+        with self._writing():
+            if not self._delete(book_id, touched, locations):
+                raise BookNotFound()
+
+            self._persist(touched, locations, manifest=True)
+
+    def delete_books(self, book_ids: list[int]) -> list[int]:
+        """
+        Deletes books with one write of every touched shard and of manifest.
+        Missing books are skipped.
+        :return: IDs of deleted books.
+        """
+        touched: set[int] = set()
+        locations = []
+        with self._writing():
+            deleted = [book_id for book_id in book_ids if self._delete(book_id, touched, locations)]
+            if deleted:
+                self._persist(touched, locations, manifest=True)
+
+        return deleted
+
+    def get_book_by_id(self, book_id: int) -> Book:
+        with self._lock:
+            self._refresh()
+            index = self._locate(book_id)
+            book = self._shard(index).books.get(book_id) if index is not None else None
+
+        if book is None:
+            raise BookNotFound()
+
+        return book.to_entity()
+
+    def _iter_books(self, after_id: int | None = None) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books in id order. Shards are loaded on demand.
+        With id partition shards before after_id are skipped,
+        books before it in the first shard must be skipped by caller.
+        """
+        if self._partition == PARTITION_ID:
+            first = after_id // self._shard_size if after_id is not None and after_id > 0 else 0
+            for index in range(first, len(self._counts)):
+                if self._counts[index]:
+                    yield from self._shard(index).books.values()
+
+            return
+
+        shards = [
+            sorted(self._shard(index).books.values(), key=operator.attrgetter("id"))
+            for index, count in enumerate(self._counts)
+            if count
+        ]
+        yield from heapq.merge(*shards, key=operator.attrgetter("id"))
+
+    def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
+        """
+        Find book by filters. Filters field will union (logical AND).
+        And paginate result.
+        """
+        return self.find_books_page(filters, pagination, count_total=False).items
+
+    def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        """
+        Finds page of books and counts total in the same pass over shards.
+        Keyset page skips shards before cursor, so total is counted separately.
+        """
+        with self._lock:
+            self._refresh()
+            books_iter = self._iter_books(pagination.after_id)
+            if not filters.is_empty:
+                books_iter = filter(FilterFactory.from_dto(filters), books_iter)
+
+            if pagination.is_keyset:
+                return paginate_page(
+                    pagination,
+                    books_iter,
+                    BookSchema.to_entity,
+                    total=self.get_book_count(filters) if count_total else None,
+                    count_total=False,
+                )
+
+            return paginate_page(
+                pagination,
+                books_iter,
+                BookSchema.to_entity,
+                total=sum(self._counts) if filters.is_empty else None,
+                count_total=count_total,
+            )
+
+    def get_book_count(self, filters: dto.BookFilter) -> int:
+        """
+        Count books by filters. Filters field will union (logical AND).
+        Count without filters is taken from manifest.
+        """
+        with self._lock:
+            self._refresh()
+            if filters.is_empty:
+                return sum(self._counts)
+
+            filter_func = FilterFactory.from_dto(filters)
+            count = 0
+            for _ in filter(filter_func, self._iter_books()):
+                count += 1
+
+        return count
+
+    def compact(self):
+        """
+        Sharded storage writes changes immediately, just rewrites manifest.
+        """
+        with self._writing():
+            self._save_manifest()
@@ -1,16 +1,34 @@
+import atexit
+import contextlib
+from array import array
 import threading
 import typing
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 
 from src.application.book import dto
-from src.application.book.exceptions import BookNotFound
-from src.application.book.interfaces.repository import BookRepository
-from src.application.common.pagination import Pagination
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.book.interfaces.repository import ITER_BATCH_SIZE, BookRepository
+from src.application.common.exceptions import MappingError
+from src.application.common.pagination import Page, Pagination
 from src.domain.book.entity import Book
 from src.domain.book.vo import BookStatus
-from .filter import FilterFactory
-from .schema import BookSchema, Schema
-from .utils import paginate_items
+from src.infrastructure.db.dedup import DedupIndex
+from src.infrastructure.db.rwlock import ReadWriteLock
+from .journal import (
+    CompactionPolicy,
+    _RecordJson,
+    apply_record,
+    delete_record,
+    insert_record,
+    parse_record,
+    update_record,
+)
+from .columnar import ColumnarSchema
+from .schema import BookSchema, Schema, _SchemaJson
+from .cache import MatchCache
+from .parallel import ParallelPolicy, ParallelScanner
+from .utils import paginate_keyset, paginate_page
 
 
 class IOProvider(ABC):
@@ -38,26 +56,353 @@ class IOProvider(ABC):
         """
         raise NotImplementedError
 
+    def lock(self) -> typing.ContextManager:
+        """
+        Exclusive lock of storage between processes for read-modify-write.
+        By default, storage isn't shared.
+        """
+        return contextlib.nullcontext()
+
+    def version(self) -> typing.Hashable:
+        """
+        Returns token that changes when data is changed by anyone.
+        None means that changes aren't tracked.
+        """
+        return None
+
+    def read_dedup_index(self, version: typing.Hashable) -> bytes | None:
+        """
+        Returns saved dedup index if it was saved for data of given version.
+        By default, index isn't saved.
+        """
+        return None
+
+    def write_dedup_index(self, data: bytes):
+        """
+        Saves dedup index for current data.
+        """
+        pass
+
+
+class Journal(ABC):
+    """
+    Journal represents append-only log of storage mutations.
+    Each record is JSON-serializable object that describes one mutation.
+
+    With journal single-book change costs one appended record
+    instead of rewriting the whole snapshot.
+    """
+
+    @abstractmethod
+    def read_records(self) -> typing.Iterable[typing.Any]:
+        """
+        Reads records in order they were appended.
+        Incomplete tail record (e.g. after crash) must be skipped.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def append(self, records: list[typing.Any]):
+        """
+        Appends records to the end of journal.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def truncate(self):
+        """
+        Removes all records from journal.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def size(self) -> int:
+        """
+        Returns size of journal in bytes.
+        """
+        raise NotImplementedError
+
+    def version(self) -> typing.Hashable:
+        """
+        Returns token that changes when journal is changed by anyone.
+        None means that changes aren't tracked.
+        """
+        return None
+
+
+@dataclass(frozen=True)
+class FlushPolicy:
+    """
+    FlushPolicy describes when pending mutations must be persisted.
+    Default policy persists every mutation immediately.
+    """
+    max_pending: int = 1
+    max_delay: float | None = None  # seconds
+
+    @property
+    def is_buffered(self) -> bool:
+        return self.max_pending > 1 or self.max_delay is not None
+
 
 class JsonStorage(BookRepository):
-    _data: Schema
+    """
+    JsonStorage keeps the whole library in memory and persists it to JSON.
+
+    Storage is safe to use from several threads. Searches run concurrently,
+    mutation of books in memory holds them out only for a moment,
+    and writes to disk don't block searches.
+    """
+    _data: Schema | ColumnarSchema
 
-    def __init__(self, provider: IOProvider):
+    def __init__(
+        self,
+        provider: IOProvider,
+        journal: Journal | None = None,
+        compaction: CompactionPolicy | None = None,
+        flush: FlushPolicy | None = None,
+        columnar: bool = False,
+        parallel: ParallelPolicy | None = None,
+    ):
+        """
+        :param provider: Provider of snapshot.
+        :param journal: If set, mutations are appended to journal
+            and snapshot is rewritten only on compaction.
+        :param compaction: Thresholds for automatic compaction of journal.
+        :param flush: Write-behind policy. Pending mutations are coalesced
+            into one write of snapshot (or one append to journal).
+        :param columnar: Keep books in columns (see ColumnarSchema)
+            instead of objects. Needs much less memory for big libraries.
+        :param parallel: Split substring search of big libraries between processes.
+            Not used by columnar storage, it searches in buffer of all titles at once.
+        """
         self._provider = provider
-        self._lock = threading.Lock()
+        self._schema_type = ColumnarSchema if columnar else Schema
+        self._journal = journal
+        self._compaction = compaction or CompactionPolicy()
+        self._flush_policy = flush or FlushPolicy()
+        self._journal_seq = 0
+        self._journal_records = 0
+        self._pending: list[_RecordJson] = []
+        self._flush_timer: threading.Timer | None = None
+        # Serializes writers and disk I/O
+        self._lock = threading.RLock()
+        # Shared by searches, exclusive while books in memory are changed
+        self._rw = ReadWriteLock()
+        # Lock of provider, held while this instance writes.
+        self._write_lock: typing.ContextManager | None = None
+        self._write_depth = 0
+        self._loaded_version: typing.Hashable = None
+        # Ids found by recent searches, next pages are sliced from them.
+        self._matches = MatchCache()
+        self._scanner = ParallelScanner(parallel) if parallel is not None else None
         self._read_data()
 
+        if self._flush_policy.is_buffered:
+            atexit.register(self.flush)
+
+    def __enter__(self) -> "JsonStorage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Persists pending mutations.
+        """
+        self.flush()
+        if self._flush_policy.is_buffered:
+            atexit.unregister(self.flush)
+
+        if self._scanner is not None:
+            self._scanner.close()
+
     def acquire_new_id(self) -> int:
-        with self._lock:
+        with self._lock, self._writing():
             return self._data.next_id()
 
+    def _version(self) -> typing.Hashable:
+        journal_version = self._journal.version() if self._journal is not None else None
+        return self._provider.version(), journal_version
+
     def _read_data(self):
-        data = self._provider.read_json()
-        self._data = Schema.from_json(data)
+        with self._rw.write():
+            # Version is taken before reading, so concurrent change
+            # will be noticed on next refresh.
+            self._loaded_version = self._version()
+            self._data = self._schema_type.read(self._provider)
+            self._matches.clear()
+            if self._scanner is not None and isinstance(self._data, Schema):
+                self._data.attach_scanner(self._scanner)
 
-    def _save_data(self):
-        data = self._data.to_json()
+            self._load_dedup_index(self._loaded_version[0])
+
+            if self._journal is not None:
+                self._replay_journal()
+
+    def _load_dedup_index(self, version: typing.Hashable):
+        if version is None:
+            return
+
+        raw_index = self._provider.read_dedup_index(version)
+        if raw_index is None:
+            return
+
+        try:
+            self._data.attach_dedup_index(DedupIndex.from_bytes(raw_index))
+        except MappingError:
+            # Broken index will be rebuilt from books
+            pass
+
+    def _write_snapshot(self, data: _SchemaJson, dedup_index: bytes):
+        """
+        Writes snapshot with dedup index of the same books.
+        """
         self._provider.write_json(data)
+        self._provider.write_dedup_index(dedup_index)
+
+    def _dump(self) -> tuple[_SchemaJson, bytes]:
+        """
+        Serializes books and dedup index. Only this part of write holds out mutations.
+        """
+        with self._rw.read():
+            return self._data.to_json(), self._data.dedup_index.to_bytes()
+
+    def _refresh(self):
+        """
+        Reloads data if storage was changed by other process.
+        Unchanged storage is checked only with stat, parsed data is reused.
+        """
+        if self._write_lock is not None:
+            # Nobody else can write now, lock isn't taken
+            # so search doesn't wait for write to disk.
+            return
+
+        with self._lock:
+            if self._write_lock is None and self._version() != self._loaded_version:
+                self._read_data()
+
+    @contextlib.contextmanager
+    def _writing(self) -> typing.Iterator[None]:
+        """
+        Holds lock of provider during read-modify-write.
+        With pending mutations lock is kept until flush,
+        so other processes don't overwrite them.
+        """
+        with self._lock:
+            if self._write_lock is None:
+                lock = self._provider.lock()
+                lock.__enter__()
+                self._write_lock = lock
+                if self._version() != self._loaded_version:
+                    self._read_data()
+
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if not self._write_depth and not self._pending:
+                    self._release_write_lock()
+
+    def _release_write_lock(self):
+        if self._write_lock is None:
+            return
+
+        # Own writes are already in memory
+        self._loaded_version = self._version()
+        lock, self._write_lock = self._write_lock, None
+        lock.__exit__(None, None, None)
+
+    def _replay_journal(self):
+        snapshot_seq = self._data.journal_seq
+        self._journal_seq = snapshot_seq
+        self._journal_records = 0
+        for raw_record in self._journal.read_records():
+            record = parse_record(raw_record)
+            if record.seq <= snapshot_seq:
+                # Record already folded into snapshot,
+                # but journal wasn't truncated (crash during compaction).
+                continue
+
+            apply_record(self._data, record)
+            self._journal_seq = record.seq
+            self._journal_records += 1
+
+    def _save_data(self):
+        self._write_snapshot(*self._dump())
+
+    def _commit(self, *records: _RecordJson):
+        """
+        Marks mutations as pending and flushes them according to flush policy.
+        """
+        with self._lock:
+            self._pending.extend(records)
+            if len(self._pending) >= self._flush_policy.max_pending:
+                self.flush()
+                return
+
+            if self._flush_policy.max_delay is not None and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._flush_policy.max_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _clear_pending(self):
+        self._pending.clear()
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def flush(self):
+        """
+        Persists pending mutations with one write.
+        Without journal rewrites the whole snapshot,
+        with journal appends all pending records at once.
+        """
+        with self._lock, self._writing():
+            if not self._pending:
+                return
+
+            if self._journal is None:
+                self._save_data()
+                self._clear_pending()
+                return
+
+            for record in self._pending:
+                self._journal_seq += 1
+                record["seq"] = self._journal_seq
+
+            self._journal.append(self._pending)
+            self._journal_records += len(self._pending)
+            self._clear_pending()
+
+            if self._compaction.should_compact(self._journal_records, self._journal.size()):
+                self.compact()
+
+    def compact(self):
+        """
+        Folds journal into fresh snapshot and truncates journal.
+        Without journal just rewrites snapshot.
+        Pending mutations are folded too.
+        """
+        with self._lock, self._writing():
+            data, dedup_index = self._dump()
+            if self._journal is None:
+                self._write_snapshot(data, dedup_index)
+                self._clear_pending()
+                return
+
+            # journal_seq goes before books,
+            # so streaming reader knows it before the first book.
+            data = _SchemaJson(
+                last_id=data["last_id"],
+                journal_seq=self._journal_seq,
+                books=data["books"],
+            )
+            self._write_snapshot(data, dedup_index)
+            self._journal.truncate()
+            self._journal_records = 0
+            self._clear_pending()
 
     def save_book(self, book: dto.NewBook) -> int:
         """
@@ -68,56 +413,172 @@ class JsonStorage(BookRepository):
         :return: ID of saved book
         :raise BookAlreadyExists: If book with same title+author+year already exists:
         """
-        book_id = self.acquire_new_id()
-        book_model = BookSchema(
-            id=book_id,
-            title=book.title,
-            author=book.author,
-            year=book.year,
-            status=convert_book_status_to_bool(book.status)
-        )
+        with self._lock, self._writing():
+            book_id = self.acquire_new_id()
+            book_model = BookSchema(
+                id=book_id,
+                title=book.title,
+                author=book.author,
+                year=book.year,
+                status=convert_book_status_to_bool(book.status)
+            )
+
+            with self._rw.write():
+                self._data.insert(book_model)
+
+            self._commit(insert_record(book_model, self._data.last_id))
 
-        self._data.insert(book_model)
-        self._save_data()
         return book_id
 
+    def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        """
+        Saves books with one persist (one write of snapshot or one append to journal).
+        Ids are allocated only for saved books, duplicates are skipped.
+
+        :return: For every book ID of saved book or error with ID of existing duplicate.
+        """
+        results = []
+        records = []
+        with self._lock, self._writing():
+            with self._rw.write():
+                for book in books:
+                    book_model = BookSchema(
+                        id=self._data.last_id + 1,
+                        title=book.title,
+                        author=book.author,
+                        year=book.year,
+                        status=convert_book_status_to_bool(book.status)
+                    )
+
+                    try:
+                        self._data.insert(book_model)
+                    except BookAlreadyExists as err:
+                        results.append(err)
+                        continue
+
+                    self._data.next_id()
+                    records.append(insert_record(book_model, self._data.last_id))
+                    results.append(book_model.id)
+
+            if records:
+                self._commit(*records)
+
+        return results
+
     def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
         """
         Find book by filters. Filters field will union (logical AND).
         And paginate result.
         """
-        books_iter = self._data.books.values()
+        return self.find_books_page(filters, pagination, count_total=False).items
 
+    def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        """
+        Finds page of books and counts total in the same pass over library.
+        Keyset page is found by bisect of sorted ids, total is counted by indexes.
+        Ids found by filters are cached, so next pages of search are sliced from them.
+        """
+        self._refresh()
+        with self._rw.read():
+            return self._find_books_page(filters, pagination, count_total)
+
+    def _find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool,
+    ) -> Page[Book]:
         if not filters.is_empty:
-            books_iter = filter(FilterFactory.from_dto(filters), books_iter)
+            page = self._find_cached_page(filters, pagination, count_total)
+            if page is not None:
+                return page
 
-        # noinspection PyTypeChecker
-        books = paginate_items(
+        if pagination.is_keyset:
+            books_iter = self._data.select_keyset(
+                filters,
+                after_id=pagination.after_id,
+                before_id=pagination.before_id,
+                reverse=pagination.before_id is not None,
+            )
+            total = self._data.count(filters) if count_total else None
+            return paginate_keyset(pagination, books_iter, BookSchema.to_entity, total=total)
+
+        return paginate_page(
             pagination,
-            len(self._data.books),
-            map(BookSchema.to_entity, books_iter),
+            self._data.select(filters),
+            BookSchema.to_entity,
+            total=len(self._data.books) if filters.is_empty else None,
+            count_total=count_total,
         )
 
-        return books
+    def _find_cached_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool,
+    ) -> Page[Book] | None:
+        """
+        Returns page sliced from cached ids of search.
+        Ids are collected when total is counted, it needs the whole pass anyway.
+        None means that page must be found without cache.
+        """
+        generation = self._data.generation
+        matches = self._matches.get(generation, filters)
+        if matches is None:
+            if not count_total:
+                return None
+
+            matches = self._matches.put(generation, filters, (book.id for book in self._data.select(filters)))
+
+        sliced = matches.page(pagination)
+        if sliced is None:
+            return None
+
+        ids, has_more = sliced
+        books = self._data.books
+        return Page(
+            items=[books[book_id].to_entity() for book_id in ids],
+            total=len(matches.ids),
+            has_more=has_more,
+        )
 
     def get_book_count(self, filters: dto.BookFilter) -> int:
         """
         Count books by filters. Filters field will union (logical AND).
         :return: Count of accepted books.
         """
-        if filters.is_empty:
-            return len(self._data.books)
+        self._refresh()
+        with self._rw.read():
+            return self._data.count(filters)
 
-        filter_func = FilterFactory.from_dto(filters)
-        count = 0
-        for _ in filter(filter_func, self._data.books.values()):
-            count += 1
+    def iter_books(self, filters: dto.BookFilter) -> typing.Iterator[Book]:
+        """
+        Iterates books in storage order. Ids of accepted books are collected first,
+        books are taken by them in batches, so storage may be changed during iteration.
+        Books deleted meanwhile are skipped.
+        """
+        self._refresh()
+        with self._rw.read():
+            ids = array("q", (book.id for book in self._data.select(filters)))
 
-        return count
+        for start in range(0, len(ids), ITER_BATCH_SIZE):
+            with self._rw.read():
+                books = self._data.books
+                batch = [books[book_id] for book_id in ids[start:start + ITER_BATCH_SIZE] if book_id in books]
+
+            yield from map(BookSchema.to_entity, batch)
 
     def delete_book(self, book_id: int):
-        self._data.delete(book_id)
-        self._save_data()
+        with self._lock, self._writing():
+            with self._rw.write():
+                self._data.delete(book_id)
+
+            self._commit(delete_record(book_id))
 
     def update_book(self, book: Book):
         """
@@ -132,11 +593,66 @@ class JsonStorage(BookRepository):
             status=convert_book_status_to_bool(book.status),
         )
 
-        self._data.update(book_obj)
-        self._save_data()
+        with self._lock, self._writing():
+            with self._rw.write():
+                self._data.update(book_obj)
+
+            self._commit(update_record(book_obj))
+
+    def update_books(self, books: list[Book]):
+        """
+        Full updates books with one persist.
+        :raise BookNotFound: If book with given ID not exists, books before it are updated.
+        """
+        records = []
+        with self._lock, self._writing():
+            try:
+                with self._rw.write():
+                    for book in books:
+                        book_obj = BookSchema(
+                            id=book.id,
+                            title=book.title,
+                            author=book.author,
+                            year=book.year,
+                            status=convert_book_status_to_bool(book.status),
+                        )
+                        self._data.update(book_obj)
+                        records.append(update_record(book_obj))
+            finally:
+                if records:
+                    self._commit(*records)
+
+    def delete_books(self, book_ids: list[int]) -> list[int]:
+        """
+        Deletes books with one persist. Missing books are skipped.
+        :return: IDs of deleted books.
+        """
+        deleted = []
+        with self._lock, self._writing():
+            with self._rw.write():
+                for book_id in book_ids:
+                    if book_id not in self._data.books:
+                        continue
+
+                    self._data.delete(book_id)
+                    deleted.append(book_id)
+
+            if deleted:
+                self._commit(*map(delete_record, deleted))
+
+        return deleted
+
+    def get_books(self, book_ids: list[int]) -> list[Book]:
+        self._refresh()
+        with self._rw.read():
+            books = self._data.books
+            return [books[book_id].to_entity() for book_id in book_ids if book_id in books]
 
     def get_book_by_id(self, book_id: int) -> Book:
-        book = self._data.books.get(book_id)
+        self._refresh()
+        with self._rw.read():
+            book = self._data.books.get(book_id)
+
         if book is None:
             raise BookNotFound()
 
@@ -0,0 +1,261 @@
+import itertools
+import json
+import re
+import typing
+from abc import ABC, abstractmethod
+from json import JSONDecodeError
+
+from src.application.book import dto
+from src.application.book.exceptions import BookNotFound
+from src.application.book.interfaces.repository import BookRepository
+from src.application.common.exceptions import MappingError, ReadOnlyRepoError
+from src.application.common.pagination import Page, Pagination
+from src.domain.book.entity import Book
+from .filter import FilterFactory
+from .journal import Overlay, parse_record
+from .schema import BookSchema
+from .storage import Journal
+from .utils import paginate_page
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class StreamProvider(ABC):
+    """
+    StreamProvider gives access to raw JSON text of storage
+    for incremental parsing.
+    """
+
+    @abstractmethod
+    def open_stream(self) -> typing.TextIO:
+        """
+        Opens JSON text for reading. Result is used as context manager.
+        If storage doesn't exist must return empty stream.
+        """
+        raise NotImplementedError
+
+
+class _Reader:
+    """
+    Buffered reader of JSON text that decodes one value at time.
+    """
+
+    def __init__(self, fp: typing.TextIO, chunk_size: int):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespaces and returns next char. Empty string means end of stream.
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill():
+                break
+
+        return self._buf[self._pos:self._pos + 1]
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise MappingError(f"Expected one of {chars!r} in JSON, got {char!r}")
+
+        self._pos += 1
+        return char
+
+    def value(self) -> typing.Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except JSONDecodeError as err:
+                if self._fill():
+                    continue
+
+                raise MappingError(f"Invalid JSON: {err.msg}")
+
+            if end == len(self._buf) and self._fill():
+                # Number can be cut by chunk border, decode it again
+                continue
+
+            self._pos = end
+            return value
+
+
+def iter_schema_json(
+    fp: typing.TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Iterator[tuple[str, typing.Any]]:
+    """
+    Incrementally parses schema JSON.
+    Yields pairs (key, value) for top-level fields and ("book", raw book)
+    for every element of `books` list, so whole list is never held in memory.
+    """
+    reader = _Reader(fp, chunk_size)
+    char = reader.peek()
+    if not char:
+        # Common case for empty file
+        return
+
+    if char != "{":
+        if reader.value() is None:
+            return
+
+        raise MappingError("Invalid type of schema ")
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise MappingError("Invalid key of schema")
+
+        reader.expect(":")
+        if key != "books":
+            yield key, reader.value()
+        else:
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield "book", reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+
+        if reader.expect(",}") == "}":
+            return
+
+
+class JsonStreamStorage(BookRepository):
+    """
+    JsonStreamStorage is read-only storage that streams books from JSON file
+    on every query. Library is never loaded to memory completely,
+    dedup index isn't built and search stops when page is filled.
+    """
+
+    def __init__(
+        self,
+        provider: StreamProvider,
+        journal: Journal | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self._provider = provider
+        self._chunk_size = chunk_size
+        self._records = []
+        if journal is not None:
+            self._records = [parse_record(record) for record in journal.read_records()]
+
+    def _iter_books(self) -> typing.Iterator[BookSchema]:
+        """
+        Iterates books in storage order with journal applied.
+        """
+        with self._provider.open_stream() as fp:
+            header = {}
+
+            def snapshot_books() -> typing.Iterator[BookSchema]:
+                index = 0
+                for key, value in iter_schema_json(fp, self._chunk_size):
+                    if key != "book":
+                        header[key] = value
+                        continue
+
+                    yield BookSchema.from_json(value, index=index)
+                    index += 1
+
+            books = snapshot_books()
+            # Fields that precede list of books are known after first book
+            first = list(itertools.islice(books, 1))
+
+            overlay = Overlay.from_records(self._records, header.get("journal_seq", 0))
+            yield from overlay.merge(itertools.chain(first, books))
+
+    def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
+        """
+        Find book by filters. Filters field will union (logical AND).
+        Stops reading as soon as page is filled.
+        """
+        return self.find_books_page(filters, pagination, count_total=False).items
+
+    def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        """
+        Finds page and counts total with one read of file.
+        Without total reading stops right after page.
+        Cursor of keyset pagination is found by reading file from start.
+        """
+        books = self._iter_books()
+        books_iter = books
+        if not filters.is_empty:
+            books_iter = filter(FilterFactory.from_dto(filters), books_iter)
+
+        page = paginate_page(pagination, books_iter, BookSchema.to_entity, count_total=count_total)
+        # Rest of file isn't needed
+        books.close()
+        return page
+
+    def get_book_count(self, filters: dto.BookFilter) -> int:
+        """
+        Count books by filters. Filters field will union (logical AND).
+        :return: Count of accepted books.
+        """
+        books_iter = self._iter_books()
+        if not filters.is_empty:
+            books_iter = filter(FilterFactory.from_dto(filters), books_iter)
+
+        count = 0
+        for _ in books_iter:
+            count += 1
+
+        return count
+
+    def iter_books(self, filters: dto.BookFilter) -> typing.Iterator[Book]:
+        """
+        Iterates books in storage order with one read of file.
+        """
+        books_iter = self._iter_books()
+        if not filters.is_empty:
+            books_iter = filter(FilterFactory.from_dto(filters), books_iter)
+
+        return map(BookSchema.to_entity, books_iter)
+
+    def get_book_by_id(self, book_id: int) -> Book:
+        for book in self._iter_books():
+            if book.id == book_id:
+                return book.to_entity()
+
+        raise BookNotFound()
+
+    def save_book(self, book: dto.NewBook) -> int:
+        raise ReadOnlyRepoError()
+
+    def update_book(self, book: Book):
+        raise ReadOnlyRepoError()
+
+    def delete_book(self, book_id: int):
+        raise ReadOnlyRepoError()
@@ -0,0 +1,105 @@
+import bisect
+import typing
+from array import array
+
+# Needles shorter than trigram can't be searched by index.
+MIN_NEEDLE = 3
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index of trigrams of lowercase text to sorted keys (book ids).
+    Index gives candidates, they must be verified with substring check:
+    book has every trigram of needle, but not necessary in the same order.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, array] = {}
+
+    @classmethod
+    def build(cls, items: typing.Iterable[tuple[int, str]]) -> "TrigramIndex":
+        """
+        Builds index from pairs (key, lowercase text).
+        """
+        postings: dict[str, list[int]] = {}
+        ordered = True
+        last_key = None
+        for key, text in items:
+            if last_key is not None and key <= last_key:
+                ordered = False
+
+            last_key = key
+            for trigram in trigrams(text):
+                found = postings.get(trigram)
+                if found is None:
+                    postings[trigram] = [key]
+                else:
+                    found.append(key)
+
+        index = cls()
+        for trigram, keys in postings.items():
+            if not ordered:
+                keys.sort()
+
+            index._postings[trigram] = array("q", keys)
+
+        return index
+
+    def add(self, key: int, text: str):
+        """
+        Adds key for trigrams of text. Key that is already there isn't duplicated.
+        """
+        for trigram in trigrams(text):
+            postings = self._postings.get(trigram)
+            if postings is None:
+                self._postings[trigram] = array("q", (key,))
+            elif postings[-1] < key:
+                # Common case: keys are added in ascending order
+                postings.append(key)
+            else:
+                i = bisect.bisect_left(postings, key)
+                if i == len(postings) or postings[i] != key:
+                    postings.insert(i, key)
+
+    def remove(self, key: int, text: str):
+        for trigram in trigrams(text):
+            postings = self._postings.get(trigram)
+            if postings is None:
+                continue
+
+            i = bisect.bisect_left(postings, key)
+            if i < len(postings) and postings[i] == key:
+                del postings[i]
+
+            if not postings:
+                del self._postings[trigram]
+
+    def candidates(self, needle: str) -> list[int] | None:
+        """
+        Returns sorted keys which text can contain lowercase needle.
+        None means needle is too short for index, all keys are candidates.
+        """
+        if len(needle) < MIN_NEEDLE:
+            return None
+
+        postings = []
+        for trigram in trigrams(needle):
+            found = self._postings.get(trigram)
+            if found is None:
+                return []
+
+            postings.append(found)
+
+        # Intersection starts from the rarest trigram
+        postings.sort(key=len)
+        keys = set(postings[0])
+        for found in postings[1:]:
+            keys.intersection_update(found)
+            if not keys:
+                break
+
+        return sorted(keys)
@@ -1,32 +1,121 @@
-from typing import Iterable, TypeVar
+import collections
+import itertools
+import operator
+from typing import Callable, Iterable, Iterator, TypeVar
 
-from src.application.common.pagination import Pagination
+from src.application.common.pagination import Page, Pagination
 
 
 T = TypeVar("T")
+R = TypeVar("R")
 
-def paginate_items(
+_item_id = operator.attrgetter("id")
+
+def paginate_page(
     pagination: Pagination,
-    total_count: int,
-    filtered_items: Iterable[T]
-) -> list[T]:
+    filtered_items: Iterable[T],
+    convert: Callable[[T], R],
+    total: int | None = None,
+    count_total: bool = True,
+    key: Callable[[T], int] = _item_id,
+) -> Page[R]:
     """
-    Optimized pagination of items stream.
+    Collects page and counts total in one pass of items stream.
 
     :param pagination: Pagination rules object
-    :param total_count: Total count of items in source container.
     :param filtered_items: Filtered iterator of items.
-    :return: A paginated list of items.
+    :param convert: Converts items of page. Items after page aren't converted.
+    :param total: Total count if it is already known, then stream is read only to end of page.
+    :param count_total: If false, stream is read only to one item after page.
+    :param key: Id of item for keyset pagination, stream must be ordered by it.
     """
+    if pagination.is_keyset:
+        counter = itertools.count()
+        counting = total is None and count_total
+        if counting:
+            # zip takes item first, so counter isn't advanced after end of stream
+            filtered_items = map(operator.itemgetter(0), zip(filtered_items, counter))
+
+        page = paginate_keyset(pagination, seek_items(pagination, filtered_items, key), convert, total)
+        if counting:
+            collections.deque(filtered_items, maxlen=0)
+            page = Page(items=page.items, total=next(counter), has_more=page.has_more)
+
+        return page
+
     offset = pagination.offset or 0
-    limit = pagination.limit if pagination.limit else total_count
+    end = offset + pagination.limit if pagination.limit else None
 
     items = []
-    for i, item in enumerate(filtered_items):
-        if i >= offset:
-            items.append(item)
+    seen = 0
+    has_more = False
+    iterator = iter(filtered_items)
+    for item in iterator:
+        if end is not None and seen >= end:
+            has_more = True
+            if total is None and count_total:
+                seen += 1 + sum(1 for _ in iterator)
 
-        if len(items) >= limit:
             break
 
-    return items
+        if seen >= offset:
+            items.append(convert(item))
+
+        seen += 1
+
+    if total is None and (count_total or not has_more):
+        # Stream was read to the end
+        total = seen
+
+    return Page(items=items, total=total, has_more=has_more)
+
+
+def seek_items(
+    pagination: Pagination,
+    ordered_items: Iterable[T],
+    key: Callable[[T], int] = _item_id,
+) -> Iterator[T]:
+    """
+    Seeks stream of items ordered by id to cursor of pagination.
+    Used by storages which can't seek by index.
+
+    :return: Items after cursor in ascending order
+        or items before cursor in descending order.
+    """
+    if pagination.before_id is not None:
+        before_id = pagination.before_id
+        preceding = itertools.takewhile(lambda item: key(item) < before_id, ordered_items)
+        # Only tail of preceding items can get into page
+        window = collections.deque(preceding, maxlen=pagination.limit + 1 if pagination.limit else None)
+        return reversed(window)
+
+    if pagination.after_id is not None:
+        after_id = pagination.after_id
+        return itertools.dropwhile(lambda item: key(item) <= after_id, ordered_items)
+
+    return iter(ordered_items)
+
+
+def paginate_keyset(
+    pagination: Pagination,
+    seeked_items: Iterable[T],
+    convert: Callable[[T], R],
+    total: int | None = None,
+) -> Page[R]:
+    """
+    Collects page of keyset pagination. Reads only one item after page.
+
+    :param seeked_items: Items from cursor in order of traversal,
+        see seek_items. Page before cursor is returned in ascending order.
+    :param total: Total count if it is known.
+    """
+    limit = pagination.limit
+    items = list(itertools.islice(seeked_items, limit + 1 if limit else None))
+    has_more = bool(limit) and len(items) > limit
+    if has_more:
+        items = items[:limit]
+
+    if pagination.before_id is not None:
+        items.reverse()
+
+    return Page(items=[convert(item) for item in items], total=total, has_more=has_more)
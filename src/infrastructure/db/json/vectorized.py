@@ -0,0 +1,168 @@
+"""
+Optional NumPy engine for filters by year and author.
+
+Filters are evaluated as boolean masks over arrays of all books at once.
+Without NumPy storages use indexes and FilterFactory, results are the same.
+"""
+import typing
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Engine is used only for libraries with at least this count of books,
+# smaller libraries are searched fast enough by indexes.
+VECTORIZED_MIN_BOOKS = 50_000
+
+# Arrays of Schema cost a pass over library to build,
+# so they are built only when searches by author repeat.
+VECTORIZED_AFTER_SEARCHES = 2
+
+
+def is_available() -> bool:
+    return numpy is not None
+
+
+def _year_mask(years: "numpy.ndarray", year_from: int | None, year_to: int | None) -> "numpy.ndarray":
+    if year_from is not None and year_from == year_to:
+        return years == year_from
+
+    mask = numpy.ones(len(years), dtype=bool)
+    if year_from is not None:
+        mask &= years >= year_from
+
+    if year_to is not None:
+        mask &= years <= year_to
+
+    return mask
+
+
+class VectorIndex:
+    """
+    VectorIndex mirrors books of Schema into NumPy arrays ordered by id:
+    id, year and code of author in AuthorDictionary.
+
+    Arrays have spare capacity, so books with new ids are appended in O(1).
+    Deleted books are marked in alive mask and dropped by rebuild.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._ids = numpy.zeros(capacity, dtype=numpy.int64)
+        self._years = numpy.zeros(capacity, dtype=numpy.int64)
+        self._codes = numpy.zeros(capacity, dtype=numpy.int32)
+        self._alive = numpy.zeros(capacity, dtype=bool)
+        self._size = 0
+        self.dead = 0
+
+    @classmethod
+    def build(cls, items: typing.Iterable[tuple[int, int, int]], size_hint: int = 0) -> "VectorIndex":
+        """
+        Builds index from triples (id, year, author code).
+        """
+        ids, years, codes = array("q"), array("q"), array("i")
+        for book_id, year, code in items:
+            ids.append(book_id)
+            years.append(year)
+            codes.append(code)
+
+        index = cls(max(len(ids) * 2, size_hint, 1024))
+        size = len(ids)
+        order = numpy.argsort(numpy.frombuffer(ids, dtype=numpy.int64), kind="stable")
+        index._ids[:size] = numpy.frombuffer(ids, dtype=numpy.int64)[order]
+        index._years[:size] = numpy.frombuffer(years, dtype=numpy.int64)[order]
+        index._codes[:size] = numpy.frombuffer(codes, dtype=numpy.int32)[order]
+        index._alive[:size] = True
+        index._size = size
+        return index
+
+    def __len__(self) -> int:
+        return self._size - self.dead
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        for name in ("_ids", "_years", "_codes", "_alive"):
+            old = getattr(self, name)
+            new = numpy.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _position(self, book_id: int) -> int:
+        return int(numpy.searchsorted(self._ids[:self._size], book_id))
+
+    def add(self, book_id: int, year: int, code: int):
+        size = self._size
+        pos = size if not size or self._ids[size - 1] < book_id else self._position(book_id)
+        if pos < size and self._ids[pos] == book_id:
+            # Update of book or insert after delete
+            if not self._alive[pos]:
+                self.dead -= 1
+
+            self._years[pos] = year
+            self._codes[pos] = code
+            self._alive[pos] = True
+            return
+
+        if size == len(self._ids):
+            self._grow()
+
+        if pos < size:
+            # Rare case: id isn't greater than ids of index
+            for column in (self._ids, self._years, self._codes, self._alive):
+                column[pos + 1:size + 1] = column[pos:size]
+
+        self._ids[pos] = book_id
+        self._years[pos] = year
+        self._codes[pos] = code
+        self._alive[pos] = True
+        self._size += 1
+
+    def remove(self, book_id: int):
+        pos = self._position(book_id)
+        if pos < self._size and self._ids[pos] == book_id and self._alive[pos]:
+            self._alive[pos] = False
+            self.dead += 1
+
+    def mask(self, years: tuple[int | None, int | None] | None, codes: list[int] | None) -> "numpy.ndarray":
+        """
+        Evaluates filters by inclusive range of years and codes of authors.
+        None means that field isn't filtered.
+        """
+        size = self._size
+        mask = self._alive[:size].copy()
+        if years is not None:
+            mask &= _year_mask(self._years[:size], *years)
+
+        if codes is not None:
+            if len(codes) == 1:
+                mask &= self._codes[:size] == codes[0]
+            else:
+                mask &= numpy.isin(self._codes[:size], numpy.asarray(codes, dtype=numpy.int32))
+
+        return mask
+
+    def take(self, mask: "numpy.ndarray") -> list[int]:
+        """
+        Returns sorted ids of books selected by mask.
+        """
+        return self._ids[:self._size][numpy.flatnonzero(mask)].tolist()
+
+    def ids(self, years: tuple[int | None, int | None] | None, codes: list[int] | None) -> list[int]:
+        """
+        Returns sorted ids of books accepted by filters.
+        """
+        return self.take(self.mask(years, codes))
+
+    def count(self, years: tuple[int | None, int | None] | None, codes: list[int] | None) -> int:
+        return int(self.mask(years, codes).sum())
+
+
+def year_rows(years: array, lo: int, hi: int, year_from: int | None, year_to: int | None) -> list[int]:
+    """
+    Returns rows in [lo, hi) which year is in inclusive range.
+    Column of years is viewed without copy. View is dropped on return,
+    array can't grow while view exists.
+    """
+    column = numpy.frombuffer(years, dtype=numpy.int64)[lo:hi]
+    return (numpy.flatnonzero(_year_mask(column, year_from, year_to)) + lo).tolist()
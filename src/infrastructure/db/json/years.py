@@ -0,0 +1,87 @@
+import bisect
+import typing
+from array import array
+
+from src.application.book import dto
+
+
+class YearIndex:
+    """
+    YearIndex keeps pairs (year, id) sorted in two parallel arrays.
+    Exact year and range of years are found with bisect: O(log N + k).
+    """
+
+    def __init__(self):
+        self._years = array("q")
+        self._ids = array("q")
+
+    @classmethod
+    def build(cls, items: typing.Iterable[tuple[int, int]]) -> "YearIndex":
+        """
+        Builds index from pairs (year, id).
+        """
+        index = cls()
+        for year, book_id in sorted(items):
+            index._years.append(year)
+            index._ids.append(book_id)
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _position(self, year: int, book_id: int) -> int:
+        lo = bisect.bisect_left(self._years, year)
+        hi = bisect.bisect_right(self._years, year, lo)
+        return bisect.bisect_left(self._ids, book_id, lo, hi)
+
+    def add(self, year: int, book_id: int):
+        i = self._position(year, book_id)
+        self._years.insert(i, year)
+        self._ids.insert(i, book_id)
+
+    def remove(self, year: int, book_id: int):
+        i = self._position(year, book_id)
+        if i < len(self._ids) and self._years[i] == year and self._ids[i] == book_id:
+            del self._years[i]
+            del self._ids[i]
+
+    def bounds(self, year_from: int | None, year_to: int | None) -> tuple[int, int]:
+        """
+        Returns slice of positions for inclusive range of years.
+        """
+        lo = 0 if year_from is None else bisect.bisect_left(self._years, year_from)
+        hi = len(self._years) if year_to is None else bisect.bisect_right(self._years, year_to)
+        return lo, max(lo, hi)
+
+    def count(self, year_from: int | None, year_to: int | None) -> int:
+        lo, hi = self.bounds(year_from, year_to)
+        return hi - lo
+
+    def ids(self, year_from: int | None, year_to: int | None) -> list[int]:
+        """
+        Returns sorted ids of books in inclusive range of years.
+        """
+        lo, hi = self.bounds(year_from, year_to)
+        if year_from is not None and year_from == year_to:
+            # Ids of one year are already sorted
+            return self._ids[lo:hi].tolist()
+
+        return sorted(self._ids[lo:hi])
+
+
+def year_bounds(filters: dto.BookFilter) -> tuple[int | None, int | None] | None:
+    """
+    Merges exact year and range of filters into one inclusive range.
+    None means that filters don't restrict year.
+    """
+    year_from, year_to = filters.year_from, filters.year_to
+    if filters.year:
+        # Same semantic as FilterFactory: year 0 doesn't filter
+        year_from = filters.year if year_from is None else max(year_from, filters.year)
+        year_to = filters.year if year_to is None else min(year_to, filters.year)
+
+    if year_from is None and year_to is None:
+        return None
+
+    return year_from, year_to
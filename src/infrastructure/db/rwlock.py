@@ -0,0 +1,53 @@
+import contextlib
+import threading
+import typing
+
+
+class ReadWriteLock:
+    """
+    ReadWriteLock lets many readers in at once, writer waits until readers leave.
+    New readers wait while writer is waiting, so writers aren't starved.
+
+    Lock isn't reentrant: reader must not take it again while writer may wait.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextlib.contextmanager
+    def read(self) -> typing.Iterator[None]:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+
+            self._readers += 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def write(self) -> typing.Iterator[None]:
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+
+            self._writer = True
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
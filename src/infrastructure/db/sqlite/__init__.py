@@ -0,0 +1,5 @@
+from .storage import SqliteStorage
+
+__all__ = (
+    'SqliteStorage',
+)
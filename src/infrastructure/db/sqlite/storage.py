@@ -0,0 +1,386 @@
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.book.interfaces.repository import BookRepository
+from src.application.common.pagination import Page, Pagination
+from src.domain.book.entity import Book
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.dedup import book_hash
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    title       TEXT    NOT NULL,
+    author      TEXT    NOT NULL,
+    year        INTEGER NOT NULL,
+    status      INTEGER NOT NULL,
+    title_norm  TEXT    NOT NULL,
+    author_norm TEXT    NOT NULL,
+    dedup_key   TEXT    NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS books_dedup_key ON books (dedup_key);
+CREATE INDEX IF NOT EXISTS books_year ON books (year);
+"""
+
+# Full text index over lowercase title and author.
+# Trigram tokenizer gives substring search, same as in JsonStorage.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    title_norm,
+    author_norm,
+    content='books',
+    content_rowid='id',
+    tokenize='trigram case_sensitive 1'
+);
+
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title_norm, author_norm)
+    VALUES (new.id, new.title_norm, new.author_norm);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title_norm, author_norm)
+    VALUES ('delete', old.id, old.title_norm, old.author_norm);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title_norm, author_norm ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title_norm, author_norm)
+    VALUES ('delete', old.id, old.title_norm, old.author_norm);
+    INSERT INTO books_fts (rowid, title_norm, author_norm)
+    VALUES (new.id, new.title_norm, new.author_norm);
+END;
+"""
+
+# Trigram index can't match needles shorter than trigram.
+_FTS_MIN_NEEDLE = 3
+
+
+class SqliteStorage(BookRepository):
+    """
+    SqliteStorage keeps books in SQLite database.
+
+    Filters and pagination are executed by SQLite with indexes,
+    so startup and one-book writes don't depend on library size.
+    """
+
+    def __init__(self, path: str | Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._fts = self._init_fts()
+
+    def _init_fts(self) -> bool:
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or trigram tokenizer.
+            # Search falls back to scan of normalized columns.
+            return False
+
+        return True
+
+    def close(self):
+        self._conn.close()
+
+    def compact(self):
+        """
+        Rebuilds database file and refreshes planner statistics.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.execute("VACUUM")
+
+    def _find_duplicate(self, key: str) -> int | None:
+        row = self._conn.execute(
+            "SELECT id FROM books WHERE dedup_key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _insert(self, book: dto.NewBook, key: str) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO books (title, author, year, status, title_norm, author_norm, dedup_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                book.title,
+                book.author,
+                book.year,
+                convert_book_status_to_int(book.status),
+                book.title.lower(),
+                book.author.lower(),
+                key,
+            ),
+        )
+        return cursor.lastrowid
+
+    def save_book(self, book: dto.NewBook) -> int:
+        """
+        Save book to storage.
+        Duplicates of books will raise error.
+
+        :param book: Object of new book
+        :return: ID of saved book
+        :raise BookAlreadyExists: If book with same title+author+year already exists:
+        """
+        key = book_hash(book.title, book.author, book.year)
+        with self._lock, self._conn:
+            existing_id = self._find_duplicate(key)
+            if existing_id is not None:
+                raise BookAlreadyExists(existing_id)
+
+            return self._insert(book, key)
+
+    def save_books(self, books: list[dto.NewBook]) -> list[int | BookAlreadyExists]:
+        """
+        Saves books in one transaction. Duplicates are skipped.
+
+        :return: For every book ID of saved book or error with ID of existing duplicate.
+        """
+        results = []
+        with self._lock, self._conn:
+            for book in books:
+                key = book_hash(book.title, book.author, book.year)
+                existing_id = self._find_duplicate(key)
+                if existing_id is not None:
+                    results.append(BookAlreadyExists(existing_id))
+                    continue
+
+                results.append(self._insert(book, key))
+
+        return results
+
+    def find_books(self, filters: dto.BookFilter, pagination: Pagination) -> list[Book]:
+        """
+        Find book by filters. Filters field will union (logical AND).
+        And paginate result.
+        """
+        return self.find_books_page(filters, pagination, count_total=False).items
+
+    def find_books_page(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool = True,
+    ) -> Page[Book]:
+        """
+        Finds page of books and total with one query.
+        Total is taken by window function, without total one more row is read.
+        Keyset page is found by primary key: WHERE id > cursor.
+        """
+        if pagination.is_keyset:
+            return self._find_books_keyset(filters, pagination, count_total)
+
+        where, params = self._build_where(filters)
+        limit = pagination.limit
+        offset = pagination.offset or 0
+        total_column = ", count(*) OVER ()" if count_total else ""
+        query = (
+            f"SELECT id, title, author, year, status{total_column} FROM books {where} "
+            f"ORDER BY id LIMIT ? OFFSET ?"
+        )
+        params.append(limit + 1 if limit else -1)
+        params.append(offset)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            total = None
+            if count_total:
+                if rows:
+                    total = rows[0][-1]
+                else:
+                    # Offset is after last row
+                    (total,) = self._conn.execute(
+                        f"SELECT count(*) FROM books {where}", params[:-2]
+                    ).fetchone()
+
+        has_more = bool(limit) and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+
+        return Page(
+            items=[_row_to_entity(row[:5]) for row in rows],
+            total=total,
+            has_more=has_more,
+        )
+
+    def _find_books_keyset(
+        self,
+        filters: dto.BookFilter,
+        pagination: Pagination,
+        count_total: bool,
+    ) -> Page[Book]:
+        where, params = self._build_where(filters)
+        count_where, count_params = where, list(params)
+        if pagination.before_id is not None:
+            condition, order = "id < ?", "DESC"
+            params.append(pagination.before_id)
+        else:
+            condition, order = "id > ?", "ASC"
+            params.append(pagination.after_id)
+
+        where = f"{where} AND {condition}" if where else f"WHERE {condition}"
+        limit = pagination.limit
+        params.append(limit + 1 if limit else -1)
+        query = (
+            f"SELECT id, title, author, year, status FROM books {where} "
+            f"ORDER BY id {order} LIMIT ?"
+        )
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            total = None
+            if count_total:
+                (total,) = self._conn.execute(
+                    f"SELECT count(*) FROM books {count_where}", count_params
+                ).fetchone()
+
+        has_more = bool(limit) and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+
+        if pagination.before_id is not None:
+            rows.reverse()
+
+        return Page(items=[_row_to_entity(row) for row in rows], total=total, has_more=has_more)
+
+    def get_book_count(self, filters: dto.BookFilter) -> int:
+        """
+        Count books by filters. Filters field will union (logical AND).
+        :return: Count of accepted books.
+        """
+        where, params = self._build_where(filters)
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT count(*) FROM books {where}", params).fetchone()
+
+        return count
+
+    def delete_book(self, book_id: int):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+
+        if cursor.rowcount == 0:
+            raise BookNotFound()
+
+    def delete_books(self, book_ids: list[int]) -> list[int]:
+        """
+        Deletes books in one transaction. Missing books are skipped.
+        :return: IDs of deleted books.
+        """
+        deleted = []
+        with self._lock, self._conn:
+            for book_id in book_ids:
+                cursor = self._conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+                if cursor.rowcount:
+                    deleted.append(book_id)
+
+        return deleted
+
+    def _update(self, book: Book):
+        key = book_hash(book.title, book.author, book.year)
+        existing_id = self._find_duplicate(key)
+        if existing_id is not None and existing_id != book.id:
+            raise BookAlreadyExists(existing_id)
+
+        cursor = self._conn.execute(
+            "UPDATE books SET title = ?, author = ?, year = ?, status = ?, "
+            "title_norm = ?, author_norm = ?, dedup_key = ? WHERE id = ?",
+            (
+                book.title,
+                book.author,
+                book.year,
+                convert_book_status_to_int(book.status),
+                book.title.lower(),
+                book.author.lower(),
+                key,
+                book.id,
+            ),
+        )
+        if cursor.rowcount == 0:
+            raise BookNotFound()
+
+    def update_book(self, book: Book):
+        """
+        Full updates book in storage.
+        :param book: Updated book object
+        """
+        with self._lock, self._conn:
+            self._update(book)
+
+    def update_books(self, books: list[Book]):
+        """
+        Full updates books in one transaction.
+        :raise BookNotFound: If book with given ID not exists, nothing is updated.
+        """
+        with self._lock, self._conn:
+            for book in books:
+                self._update(book)
+
+    def get_book_by_id(self, book_id: int) -> Book:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, title, author, year, status FROM books WHERE id = ?", (book_id,)
+            ).fetchone()
+
+        if row is None:
+            raise BookNotFound()
+
+        return _row_to_entity(row)
+
+    def _build_where(self, filters: dto.BookFilter) -> tuple[str, list[typing.Any]]:
+        """
+        Builds WHERE clause with same semantic as FilterFactory of JsonStorage:
+        case-insensitive substring for title and author, exact year and range of years.
+        """
+        conditions = []
+        params = []
+
+        for column, value in (("title_norm", filters.title), ("author_norm", filters.author)):
+            if not value:
+                continue
+
+            needle = value.lower()
+            if self._fts and len(needle) >= _FTS_MIN_NEEDLE:
+                phrase = needle.replace('"', '""')
+                conditions.append("id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)")
+                params.append(f'{column} : "{phrase}"')
+
+            conditions.append(f"instr({column}, ?) > 0")
+            params.append(needle)
+
+        if filters.year:
+            conditions.append("year = ?")
+            params.append(filters.year)
+
+        if filters.year_from is not None:
+            conditions.append("year >= ?")
+            params.append(filters.year_from)
+
+        if filters.year_to is not None:
+            conditions.append("year <= ?")
+            params.append(filters.year_to)
+
+        if not conditions:
+            return "", params
+
+        return "WHERE " + " AND ".join(conditions), params
+
+
+def convert_book_status_to_int(status: BookStatus) -> int:
+    return 1 if status is BookStatus.AVAILABLE else 0
+
+
+def _row_to_entity(row: tuple) -> Book:
+    book_id, title, author, year, status = row
+    return Book(
+        id=book_id,
+        title=title,
+        author=author,
+        year=year,
+        status=BookStatus.AVAILABLE if status else BookStatus.TAKEN,
+    )
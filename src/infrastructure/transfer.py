@@ -0,0 +1,122 @@
+"""
+Files with books for import and export: CSV with header and JSON Lines.
+Import reads title, author and year, other fields are ignored,
+so exported file can be imported to other library.
+"""
+import csv
+import json
+import typing
+from pathlib import Path
+
+from src.application.book import dto
+from src.domain.book.entity import Book
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+
+FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+# Buffer of exported file, books are written by many small writes.
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+_FIELDS = ("id", "title", "author", "year", "status")
+
+_SUFFIXES = {
+    ".csv": FORMAT_CSV,
+    ".jsonl": FORMAT_JSONL,
+    ".ndjson": FORMAT_JSONL,
+}
+
+
+def detect_format(path: str | Path) -> str | None:
+    """
+    Returns format by file extension, None if it is unknown.
+    """
+    return _SUFFIXES.get(Path(path).suffix.lower())
+
+
+def read_books_csv(stream: typing.TextIO) -> typing.Iterator[dto.RawBook]:
+    """
+    Reads rows of CSV with header. Line of row is the last line of record.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield dto.RawBook(
+            line=reader.line_num,
+            title=row.get("title"),
+            author=row.get("author"),
+            year=row.get("year"),
+        )
+
+
+def read_books_jsonl(stream: typing.TextIO) -> typing.Iterator[dto.RawBook]:
+    """
+    Reads one JSON object per line. Empty lines are skipped.
+    """
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+
+        if not isinstance(data, dict):
+            yield dto.RawBook(line=line)
+            continue
+
+        yield dto.RawBook(
+            line=line,
+            title=data.get("title"),
+            author=data.get("author"),
+            year=data.get("year"),
+        )
+
+
+def read_books(stream: typing.TextIO, fmt: str) -> typing.Iterator[dto.RawBook]:
+    if fmt == FORMAT_CSV:
+        return read_books_csv(stream)
+
+    return read_books_jsonl(stream)
+
+
+def _book_row(book: Book) -> tuple:
+    return book.id, book.title, book.author, book.year, book.status.value
+
+
+def write_books_csv(stream: typing.TextIO, books: typing.Iterable[Book]) -> int:
+    """
+    Writes CSV with header. Stream must be opened with newline="".
+    :return: Count of written books.
+    """
+    writer = csv.writer(stream)
+    writer.writerow(_FIELDS)
+    count = 0
+    for book in books:
+        writer.writerow(_book_row(book))
+        count += 1
+
+    return count
+
+
+def write_books_jsonl(stream: typing.TextIO, books: typing.Iterable[Book]) -> int:
+    """
+    Writes one JSON object per line.
+    :return: Count of written books.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    count = 0
+    for book in books:
+        stream.write(encoder.encode(dict(zip(_FIELDS, _book_row(book)))))
+        stream.write("\n")
+        count += 1
+
+    return count
+
+
+def write_books(stream: typing.TextIO, books: typing.Iterable[Book], fmt: str) -> int:
+    if fmt == FORMAT_CSV:
+        return write_books_csv(stream, books)
+
+    return write_books_jsonl(stream, books)
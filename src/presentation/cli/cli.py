@@ -1,21 +1,33 @@
 import math
 import os
+import sys
 from argparse import Namespace
 
 from src.application.book import dto
 from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.book.interfaces import StorageMaintenance
 from src.application.book.service import Service
+from src.application.common.exceptions import InvalidCursorError
 from src.application.common.pagination import Pagination, PaginationResult
 from src.config.config import Config
 from src.domain.book.entity import Book
 from src.domain.book.exceptions import BookAlreadyInLibrary, BookAlreadyTaken
 from src.domain.book.vo import BookStatus
+from src.infrastructure.transfer import EXPORT_BUFFER_SIZE, FORMAT_JSONL, detect_format, read_books, write_books
 
 COMMAND_ALL = "all"
 COMMAND_STATUS = 'status'
 COMMAND_SEARCH = 'search'
 COMMAND_DELETE = 'delete'
 COMMAND_ADD = 'add'
+COMMAND_COMPACT = 'compact'
+COMMAND_IMPORT = 'import'
+COMMAND_EXPORT = 'export'
+COMMAND_SERVE = 'serve'
+COMMAND_SHELL = 'shell'
+
+# Commands that never change storage
+READ_ONLY_COMMANDS = (COMMAND_ALL, COMMAND_SEARCH, COMMAND_EXPORT)
 
 
 def format_book(book: Book) -> str:
@@ -62,15 +74,53 @@ def _choice_page(pagination: PaginationResult):
                 print("Invalid choice")
 
 
+def _filters_from_args(args: Namespace) -> dto.BookFilter:
+    return dto.BookFilter(
+        title=args.title,
+        author=args.author,
+        year=args.year,
+        year_from=args.year_from,
+        year_to=args.year_to,
+    )
+
+
+def _batch_target(book_ids: list[int], filters: dto.BookFilter) -> list[int] | dto.BookFilter | None:
+    """
+    Returns ids or filters of batch command. None if both or none of them are set.
+    Filters that accept every book (empty strings, year 0) count as not set.
+    """
+    if book_ids and not filters.is_restrictive:
+        return book_ids
+
+    if not book_ids and filters.is_restrictive:
+        return filters
+
+    return None
+
+
+def _print_failed(result: dto.BatchResult):
+    for book_id, err in sorted(result.failed.items()):
+        match err:
+            case BookNotFound():
+                print(f"[ERROR]: Book with id {book_id} not found")
+            case BookAlreadyTaken():
+                print(f"[ERROR]: Book with id {book_id} already taken from library")
+            case BookAlreadyInLibrary():
+                print(f"[ERROR]: Book with id {book_id} already in library")
+            case _:
+                print(f"[ERROR]: Book with id {book_id}: {err.title}")
+
+
 class CLI:
     def __init__(
         self,
         config: Config,
         service: Service,
-
+        maintenance: StorageMaintenance | None = None,
     ):
         self.service = service
         self.config = config
+        self.maintenance = maintenance
         self._handlers = {}
         self._bind_commands()
 
@@ -89,37 +139,70 @@ class CLI:
         print(format_book(book))
 
     def _delete_book(self, args: Namespace):
-        try:
-            self.service.delete_book(args.id)
-        except BookNotFound:
-            print(f"[ERROR]: Book with id {args.book_id} not found")
-        else:
-            print("Book deleted")
+        filters = _filters_from_args(args)
+        if len(args.ids) == 1 and not filters.is_restrictive:
+            book_id = args.ids[0]
+            try:
+                self.service.delete_book(book_id)
+            except BookNotFound:
+                print(f"[ERROR]: Book with id {book_id} not found")
+            else:
+                print("Book deleted")
+
+            return
+
+        target = _batch_target(args.ids, filters)
+        if target is None:
+            print("[ERROR]: Set ids of books or non-empty filters, but not both")
+            return
+
+        result = self.service.delete_books(target)
+        print(f"Books deleted: {len(result.done)}")
+        _print_failed(result)
 
     def _change_status(self, args: Namespace):
         status = BookStatus.AVAILABLE if args.status else BookStatus.TAKEN
-        try:
-            self.service.update_status(args.id, status)
-        except BookAlreadyInLibrary:
-            print("[ERROR]: Book already in library")
-        except BookAlreadyTaken:
-            print("[ERROR]: Book already taken from library")
-        except BookNotFound:
-            print("[ERROR]: Book not found")
-        else:
-            print("Book updated")
+        filters = _filters_from_args(args)
+        if len(args.ids) == 1 and not filters.is_restrictive:
+            try:
+                self.service.update_status(args.ids[0], status)
+            except BookAlreadyInLibrary:
+                print("[ERROR]: Book already in library")
+            except BookAlreadyTaken:
+                print("[ERROR]: Book already taken from library")
+            except BookNotFound:
+                print("[ERROR]: Book not found")
+            else:
+                print("Book updated")
 
-    def _search_books_common(self, filters: dto.BookFilter, page: int):
+            return
+
+        target = _batch_target(args.ids, filters)
+        if target is None:
+            print("[ERROR]: Set ids of books or non-empty filters, but not both")
+            return
+
+        result = self.service.update_statuses(target, status)
+        print(f"Books updated: {len(result.done)}")
+        _print_failed(result)
+
+    def _search_books_common(self, filters: dto.BookFilter, page: int, cursor: str | None = None):
         """
         The 'ALL' command is an alias for the 'SEARCH' command without filters only.
         This function combines their common part
         """
         page_size = self.config.page_size
+        try:
+            start = Pagination.from_cursor(cursor, page_size) if cursor else None
+        except InvalidCursorError as err:
+            print(f"[ERROR]: {err.title}")
+            return
+
         if not page_size:
             # output all books without pagination
             books = self.service.find_books(
                 filters=filters,
-                pagination=Pagination()
+                pagination=start or Pagination()
             )
             print("---------")
             for book in books.data:
@@ -132,47 +215,137 @@ class CLI:
                       "Outputted all books.")
                 return
         else:
-            self._search_paginate(filters, page)
+            self._search_paginate(filters, start or Pagination(offset=page * page_size, limit=page_size))
 
     def _search_books(self, args: Namespace):
-        filters = dto.BookFilter(
-            title=args.title,
-            author=args.author,
-            year=args.year,
-        )
+        filters = _filters_from_args(args)
         page = args.page - 1 if args.page else 0
-        self._search_books_common(filters, page)
+        self._search_books_common(filters, page, args.cursor)
 
     def _search_paginate(
         self,
         filters: dto.BookFilter,
-        start_page: int,
+        pagination: Pagination,
     ):
+        """
+        Shows pages one by one. Pages after the first are found by cursors,
+        so switching costs the same on any page. Total is counted once.
+        """
         page_size: int = self.config.page_size
-        page = start_page
+        # Number of page is unknown if the first page is given by cursor
+        page = None if pagination.is_keyset else (pagination.offset or 0) // page_size
+        total = None
 
         while True:
             print("---------")
 
-            pagination = Pagination(offset=page * page_size, limit=page_size)
-
-            books = self.service.find_books(filters, pagination)
+            books = self.service.find_books(filters, pagination, count_total=total is None)
             for book in books.data:
                 print(format_book(book))
                 print("---------")
 
-            print(f"Page {page + 1} of {math.ceil(books.pagination.total / page_size)}")
+            if total is None:
+                total = books.pagination.total
+
+            if page is not None:
+                print(f"Page {page + 1}" if total is None else f"Page {page + 1} of {math.ceil(total / page_size)}")
+
+            if books.pagination.next_cursor:
+                print(f"Next page cursor: {books.pagination.next_cursor}")
+
             try:
                 page_delta = _choice_page(books.pagination)
             except KeyboardInterrupt:
                 print()
                 return
-            page += page_delta
+
+            if page_delta is None:
+                # Single page, nothing to switch
+                return
+
+            cursor = books.pagination.next_cursor if page_delta > 0 else books.pagination.prev_cursor
+            if page is not None:
+                page += page_delta
+
+            if cursor is not None:
+                pagination = Pagination.from_cursor(cursor, page_size)
+            else:
+                # Empty page after the end has nothing to point cursor to
+                pagination = Pagination(offset=(page or 0) * page_size, limit=page_size)
+
             os.system('cls' if os.name == 'nt' else 'clear')
 
     def _all_books(self, args: Namespace):
         page = args.page - 1 if args.page else 0
-        self._search_books_common(dto.BookFilter(), page)
+        self._search_books_common(dto.BookFilter(), page, args.cursor)
+
+    def _import_books(self, args: Namespace):
+        fmt = args.format or detect_format(args.path)
+        if fmt is None:
+            print("[ERROR]: Unknown format of file, set it with --format")
+            return
+
+        try:
+            if args.path == "-":
+                report = self.service.import_books(read_books(sys.stdin, fmt))
+            else:
+                # utf-8-sig skips BOM written by spreadsheet editors
+                with open(args.path, encoding="utf-8-sig", newline="") as f:
+                    report = self.service.import_books(read_books(f, fmt))
+        except OSError as err:
+            print(f"[ERROR]: Can't read file: {err.strerror}")
+            return
+
+        print(f"Inserted books: {report.inserted}")
+        print(f"Duplicates: {len(report.duplicate_lines)}")
+        if report.duplicate_lines:
+            print("Lines:", ", ".join(map(str, report.duplicate_lines)))
+
+        print(f"Invalid: {len(report.invalid_lines)}")
+        if report.invalid_lines:
+            print("Lines:", ", ".join(map(str, report.invalid_lines)))
+
+    def _export_books(self, args: Namespace):
+        fmt = args.format or detect_format(args.output) or FORMAT_JSONL
+        books = self.service.export_books(_filters_from_args(args))
+        try:
+            if args.output == "-":
+                sys.stdout.flush()
+                with open(sys.stdout.fileno(), "w", encoding="utf-8", newline="",
+                          buffering=EXPORT_BUFFER_SIZE, closefd=False) as f:
+                    count = write_books(f, books, fmt)
+            else:
+                with open(args.output, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER_SIZE) as f:
+                    count = write_books(f, books, fmt)
+        except OSError as err:
+            print(f"[ERROR]: Can't write file: {err.strerror}", file=sys.stderr)
+            return
+
+        # Stdout may be the exported file itself
+        print(f"Exported books: {count}", file=sys.stderr)
+
+    def _serve(self, args: Namespace):
+        # HTTP server is imported only by this command, other commands start without it
+        from src.presentation.http import HTTP_WORKERS, ApiServer
+
+        workers = HTTP_WORKERS if args.workers is None else args.workers
+        server = ApiServer((args.host, args.port), self.service, page_size=self.config.page_size, workers=workers)
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print()
+        finally:
+            server.server_close()
+
+    def _compact(self, _: Namespace):
+        if self.maintenance is None:
+            print("[ERROR]: Storage doesn't support compaction")
+            return
+
+        self.maintenance.compact()
+        print("Storage compacted")
 
     def _bind_commands(self):
         self._handlers.update(
@@ -181,7 +354,11 @@ class CLI:
                 COMMAND_SEARCH: self._search_books,
                 COMMAND_DELETE: self._delete_book,
                 COMMAND_ALL: self._all_books,
-                COMMAND_STATUS: self._change_status
+                COMMAND_STATUS: self._change_status,
+                COMMAND_COMPACT: self._compact,
+                COMMAND_IMPORT: self._import_books,
+                COMMAND_EXPORT: self._export_books,
+                COMMAND_SERVE: self._serve,
             }
         )
 
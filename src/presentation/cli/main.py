@@ -1,9 +1,44 @@
 from argparse import ArgumentParser
 
 from src.application.book.service import Service
-from src.presentation.cli.cli import COMMAND_ALL, COMMAND_STATUS, COMMAND_SEARCH, COMMAND_DELETE, COMMAND_ADD, CLI
+from src.config.config import BACKEND_BINARY, BACKEND_SQLITE, Config
+from src.presentation.cli.cli import (
+    COMMAND_ALL,
+    COMMAND_STATUS,
+    COMMAND_SEARCH,
+    COMMAND_DELETE,
+    COMMAND_ADD,
+    COMMAND_COMPACT,
+    COMMAND_IMPORT,
+    COMMAND_EXPORT,
+    COMMAND_SERVE,
+    COMMAND_SHELL,
+    READ_ONLY_COMMANDS,
+    CLI,
+)
 from src.infrastructure.config_loader import load_config
-from src.infrastructure.db.json import FileJsonProvider, JsonStorage
+from src.infrastructure.db.binary import BinaryStorage
+from src.infrastructure.db.json import (
+    CompactionPolicy,
+    FileJsonJournal,
+    FileJsonProvider,
+    FlushPolicy,
+    JsonStorage,
+    JsonStreamStorage,
+    ParallelPolicy,
+    ShardedJsonStorage,
+)
+from src.infrastructure.db.sqlite import SqliteStorage
+from src.infrastructure.transfer import FORMATS
+from src.presentation.cli.shell import Shell
+
+
+def _add_filter_arguments(parser: ArgumentParser):
+    parser.add_argument('--title', type=str, help='Book title', default=None)
+    parser.add_argument('--author', type=str, help='Author of the book', default=None)
+    parser.add_argument('--year', type=int, help='Year of publication', default=None)
+    parser.add_argument('--year-from', type=int, help='Published in this year or later', default=None)
+    parser.add_argument('--year-to', type=int, help='Published in this year or earlier', default=None)
 
 
 def _build_parser():
@@ -28,9 +63,10 @@ def _build_parser():
     parser_delete = subparsers.add_parser(
         name=COMMAND_DELETE,
         help='Delete book',
-        description="Delete book by id"
+        description="Delete books by ids or by filters. Books are deleted with one write"
     )
-    parser_delete.add_argument('id', type=int, help='Book id')
+    parser_delete.add_argument('ids', type=int, nargs='*', metavar='id', help='Book id')
+    _add_filter_arguments(parser_delete)
 
     parser_search = subparsers.add_parser(
         name=COMMAND_SEARCH,
@@ -38,15 +74,19 @@ def _build_parser():
         description='Search books by title, author or year'
     )
 
-    parser_search.add_argument('--title', type=str, help='Book title', default=None)
-    parser_search.add_argument('--author', type=str, help='Author of the book', default=None)
-    parser_search.add_argument('--year', type=int, help='Year of publication', default=None)
+    _add_filter_arguments(parser_search)
     parser_search.add_argument(
         "--page",
         type=int,
         help="Number of page. Available only in set page_size in config",
         default=1,
     )
+    parser_search.add_argument(
+        "--cursor",
+        type=str,
+        help="Cursor of page from previous output. Used instead of --page",
+        default=None,
+    )
     parser_all = subparsers.add_parser(
         name=COMMAND_ALL,
         help="Output all books",
@@ -57,20 +97,143 @@ def _build_parser():
         type=int,
         help="Number of page. Available only in set page_size in config",
     )
+    parser_all.add_argument(
+        "--cursor",
+        type=str,
+        help="Cursor of page from previous output. Used instead of --page",
+        default=None,
+    )
 
     parser_status = subparsers.add_parser(
         name=COMMAND_STATUS,
         help='Change book status',
-        description="Change book status by id"
+        description="Change status of books by ids or by filters. Books are updated with one write"
     )
-    parser_status.add_argument('id', type=int, help='Book id')
+    parser_status.add_argument('ids', type=int, nargs='*', metavar='id', help='Book id')
+    _add_filter_arguments(parser_status)
     group = parser_status.add_mutually_exclusive_group(required=True)
     group.add_argument("--return", action='store_true', dest="status", help="Set available status")
     group.add_argument("--take", action='store_false', dest="status", help="Set taken status")
 
+    subparsers.add_parser(
+        name=COMMAND_COMPACT,
+        help='Compact storage',
+        description="Fold storage journal into fresh snapshot"
+    )
+
+    parser_import = subparsers.add_parser(
+        name=COMMAND_IMPORT,
+        help='Import books',
+        description="Import books from CSV (with header) or JSONL file. Books are saved with one write"
+    )
+    parser_import.add_argument('path', type=str, help='Path to file, "-" for stdin')
+    parser_import.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Format of file. By default, detected by extension",
+        default=None,
+    )
+
+    parser_export = subparsers.add_parser(
+        name=COMMAND_EXPORT,
+        help='Export books',
+        description="Export books accepted by filters to CSV or JSONL file"
+    )
+    _add_filter_arguments(parser_export)
+    parser_export.add_argument("--output", "-o", type=str, help='Path to file, "-" for stdout', default="-")
+    parser_export.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Format of file. By default, detected by extension, JSONL for stdout",
+        default=None,
+    )
+
+    parser_serve = subparsers.add_parser(
+        name=COMMAND_SERVE,
+        help='Serve HTTP API',
+        description="Serve JSON HTTP API. Storage is loaded once and shared by requests"
+    )
+    parser_serve.add_argument("--host", type=str, help="Address to listen", default="127.0.0.1")
+    parser_serve.add_argument("--port", type=int, help="Port to listen", default=8000)
+    parser_serve.add_argument("--workers", type=int, help="Threads handling connections", default=None)
+
+    subparsers.add_parser(
+        name=COMMAND_SHELL,
+        help='Interactive shell',
+        description="Run commands in loop, storage is loaded once for all of them"
+    )
+
     return parser
 
 
+def _build_journal(config: Config) -> tuple[FileJsonJournal | None, CompactionPolicy | None]:
+    if config.journal is None:
+        return None, None
+
+    journal_path = config.storage_path.with_name(config.storage_path.name + ".journal")
+    compaction = CompactionPolicy(
+        max_records=config.journal.max_records,
+        max_bytes=config.journal.max_size,
+    )
+    return FileJsonJournal(journal_path), compaction
+
+
+def _build_storage(
+    config: Config,
+    read_only: bool = False,
+    parallel_scan: bool = False,
+) -> JsonStorage | JsonStreamStorage | ShardedJsonStorage | SqliteStorage | BinaryStorage:
+    """
+    :param read_only: Storage will be used only for reading.
+        For JSON backend it means streaming of file without full load.
+    :param parallel_scan: Allow parallel scan by storage.parallel config.
+        Pool of processes pays off only in long-lived process.
+    """
+    parallel_config = config.parallel if parallel_scan else None
+    if config.backend == BACKEND_SQLITE:
+        return SqliteStorage(config.storage_path)
+
+    journal, compaction = _build_journal(config)
+    if config.backend == BACKEND_BINARY:
+        return BinaryStorage(config.storage_path, journal=journal, compaction=compaction)
+
+    if config.shards is not None:
+        return ShardedJsonStorage(
+            config.storage_path,
+            partition=config.shards.partition,
+            shards=config.shards.count,
+            shard_size=config.shards.size,
+        )
+
+    provider = FileJsonProvider(config.storage_path)
+    if read_only and parallel_config is None:
+        # Parallel scan needs loaded books, stream is read by one process
+        return JsonStreamStorage(provider, journal=journal)
+
+    flush = None
+    if config.flush is not None:
+        flush = FlushPolicy(
+            max_pending=config.flush.max_pending,
+            max_delay=config.flush.max_delay,
+        )
+
+    parallel = None
+    if parallel_config is not None:
+        parallel = ParallelPolicy(
+            min_books=parallel_config.min_books,
+            workers=parallel_config.workers,
+        )
+
+    return JsonStorage(
+        provider,
+        journal=journal,
+        compaction=compaction,
+        flush=flush,
+        columnar=config.columnar,
+        parallel=parallel,
+    )
+
+
 def main():
     parser = _build_parser()
     args = parser.parse_args()
@@ -80,9 +243,22 @@ def main():
         exit(0)
 
     config = load_config(args.config)
-    provider = FileJsonProvider(config.storage_path)
-    repo = JsonStorage(provider)
+    repo = _build_storage(
+        config,
+        read_only=args.cmd in READ_ONLY_COMMANDS,
+        # One-shot command would start pool for one search
+        parallel_scan=args.cmd in (COMMAND_SHELL, COMMAND_SERVE),
+    )
     service = Service(repo)
 
-    cli = CLI(config, service)
+    cli = CLI(config, service, maintenance=repo)
+    if args.cmd == COMMAND_SHELL:
+        try:
+            Shell(parser, cli).run()
+        finally:
+            # Persists writes left pending by flush policy
+            repo.close()
+
+        return
+
     cli.run(args)
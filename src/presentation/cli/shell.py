@@ -0,0 +1,116 @@
+"""
+Interactive shell: commands of CLI are run in loop against one loaded storage.
+"""
+import shlex
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+try:
+    import readline
+except ImportError:  # Windows
+    readline = None
+
+from src.presentation.cli.cli import CLI, COMMAND_SERVE, COMMAND_SHELL
+
+# History of commands is kept between sessions in this file.
+HISTORY_FILE = Path.home() / ".book_library_history"
+HISTORY_LENGTH = 1000
+
+PROMPT = "library> "
+
+_EXIT_COMMANDS = ("exit", "quit")
+
+# Commands that can't be nested into shell: they run their own loop.
+_DISABLED_COMMANDS = (COMMAND_SHELL, COMMAND_SERVE)
+
+
+class Shell:
+    def __init__(self, parser: ArgumentParser, cli: CLI):
+        """
+        :param parser: Parser of command line, it parses commands of shell too.
+        """
+        self.parser = parser
+        self.cli = cli
+
+    def run(self):
+        self._load_history()
+        print('Type "help" for list of commands, "exit" to quit')
+        try:
+            while True:
+                try:
+                    line = input(PROMPT)
+                except EOFError:
+                    print()
+                    return
+                except KeyboardInterrupt:
+                    # Ctrl+C drops typed line, like in system shell
+                    print()
+                    continue
+
+                if line.strip() in _EXIT_COMMANDS:
+                    return
+
+                self.execute(line)
+        finally:
+            self._save_history()
+
+    def execute(self, line: str):
+        """
+        Runs one command and prints its time.
+        """
+        try:
+            argv = shlex.split(line)
+        except ValueError as err:
+            print(f"[ERROR]: {err}")
+            return
+
+        if not argv:
+            return
+
+        if argv[0] == "help":
+            self.parser.print_help()
+            return
+
+        try:
+            args = self.parser.parse_args(argv)
+        except SystemExit:
+            # argparse has already printed usage or error
+            return
+
+        if args.cmd is None:
+            return
+
+        if args.cmd in _DISABLED_COMMANDS:
+            print(f"[ERROR]: Command {args.cmd} isn't available in shell")
+            return
+
+        start = time.perf_counter()
+        try:
+            self.cli.run(args)
+        except KeyboardInterrupt:
+            print()
+        except SystemExit:
+            pass
+
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    def _load_history(self):
+        if readline is None:
+            return
+
+        readline.set_history_length(HISTORY_LENGTH)
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:
+            # No history yet
+            pass
+
+    def _save_history(self):
+        if readline is None:
+            return
+
+        try:
+            readline.write_history_file(HISTORY_FILE)
+        except OSError as err:
+            print(f"[ERROR]: Can't save history: {err.strerror}")
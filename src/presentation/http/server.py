@@ -0,0 +1,296 @@
+"""
+JSON HTTP API over Service. Storage is loaded once when server starts,
+so request costs only its query.
+
+Routes:
+    GET    /books              search, filters and pagination in query string
+    POST   /books              add book: {"title", "author", "year"}
+    DELETE /books/<id>         delete book
+    PUT    /books/<id>/status  change status: {"status": "available" | "taken"}
+"""
+import json
+import re
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.book.service import Service
+from src.application.common.exceptions import InvalidCursorError
+from src.application.common.pagination import Pagination
+from src.domain.book.entity import Book
+from src.domain.book.exceptions import BookAlreadyInLibrary, BookAlreadyTaken
+from src.domain.book.vo import BookStatus
+from src.domain.common.exceptions import AppError
+
+# Threads handling connections. Kept-alive connection holds its thread until it is closed.
+HTTP_WORKERS = 8
+
+# Idle kept-alive connection is closed after this count of seconds, so it frees its thread.
+KEEP_ALIVE_TIMEOUT = 5.0
+
+# Limit of page if it isn't set by request or by config, and the biggest allowed limit.
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 1000
+
+# Bodies of requests are small: one book or status.
+MAX_BODY_SIZE = 64 * 1024
+
+_FILTER_INT_PARAMS = ("year", "year_from", "year_to")
+
+_BOOK_ROUTE = re.compile(r"/books/(\d+)")
+_STATUS_ROUTE = re.compile(r"/books/(\d+)/status")
+
+
+class HttpError(Exception):
+    """
+    Error that is sent to client as JSON {"error": message}.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str, **extra: typing.Any):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **extra}
+
+
+def book_to_json(book: Book) -> dict:
+    return {
+        "id": book.id,
+        "title": book.title,
+        "author": book.author,
+        "year": book.year,
+        "status": str(book.status),
+    }
+
+
+def _query_int(query: dict[str, list[str]], name: str) -> int | None:
+    values = query.get(name)
+    if not values:
+        return None
+
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Parameter {name!r} must be integer")
+
+
+def _query_str(query: dict[str, list[str]], name: str) -> str | None:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _filters_from_query(query: dict[str, list[str]]) -> dto.BookFilter:
+    years = {name: _query_int(query, name) for name in _FILTER_INT_PARAMS}
+    return dto.BookFilter(
+        title=_query_str(query, "title"),
+        author=_query_str(query, "author"),
+        **years,
+    )
+
+
+def _pagination_from_query(query: dict[str, list[str]], page_size: int) -> Pagination:
+    limit = _query_int(query, "limit")
+    if limit is None:
+        limit = page_size
+
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Parameter 'limit' must be from 1 to {MAX_PAGE_SIZE}")
+
+    cursor = _query_str(query, "cursor")
+    if cursor:
+        try:
+            return Pagination.from_cursor(cursor, limit)
+        except InvalidCursorError as err:
+            raise HttpError(HTTPStatus.BAD_REQUEST, err.title)
+
+    offset = _query_int(query, "offset") or 0
+    if offset < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Parameter 'offset' must not be negative")
+
+    return Pagination(offset=offset, limit=limit)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connection alive between requests, so every response has Content-Length
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    server: "ApiServer"
+
+    def do_GET(self):
+        self._dispatch(self._get)
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def do_PUT(self):
+        self._dispatch(self._put)
+
+    def do_DELETE(self):
+        self._dispatch(self._delete)
+
+    def log_message(self, format: str, *args: typing.Any):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _dispatch(self, handler: typing.Callable[[str, str], tuple[HTTPStatus, typing.Any]]):
+        url = urlsplit(self.path)
+        self._body_read = False
+        try:
+            status, body = handler(url.path.rstrip("/") or "/", url.query)
+        except HttpError as err:
+            status, body = err.status, err.body
+        except AppError as err:
+            self.log_error("%s", err.title)
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": err.title}
+
+        if not self._body_read and self.headers.get("Content-Length", "0") != "0":
+            # Unread body would be taken for the next request
+            self.close_connection = True
+
+        self._send_json(status, body)
+
+    def _send_json(self, status: HTTPStatus, body: typing.Any):
+        payload = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+
+        if length > MAX_BODY_SIZE:
+            # Body is left unread, connection can't be reused
+            self.close_connection = True
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body is too large")
+
+        self._body_read = True
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+
+        if not isinstance(body, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Body must be JSON object")
+
+        return body
+
+    def _get(self, path: str, query: str) -> tuple[HTTPStatus, typing.Any]:
+        if path != "/books":
+            raise HttpError(HTTPStatus.NOT_FOUND, "Not found")
+
+        params = parse_qs(query)
+        filters = _filters_from_query(params)
+        pagination = _pagination_from_query(params, self.server.page_size)
+        count_total = _query_str(params, "count") not in ("0", "false")
+
+        books = self.server.service.find_books(filters, pagination, count_total=count_total)
+        page = books.pagination
+        return HTTPStatus.OK, {
+            "data": [book_to_json(book) for book in books.data],
+            "pagination": {
+                "offset": page.offset,
+                "limit": page.limit,
+                "total": page.total,
+                "has_more": page.has_more,
+                "next_cursor": page.next_cursor,
+                "prev_cursor": page.prev_cursor,
+            },
+        }
+
+    def _post(self, path: str, _: str) -> tuple[HTTPStatus, typing.Any]:
+        if path != "/books":
+            raise HttpError(HTTPStatus.NOT_FOUND, "Not found")
+
+        body = self._read_json()
+        title, author, year = body.get("title"), body.get("author"), body.get("year")
+        if not isinstance(title, str) or not title.strip() or not isinstance(author, str) or not author.strip():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Fields 'title' and 'author' must be non-empty strings")
+
+        if not isinstance(year, int) or isinstance(year, bool):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Field 'year' must be integer")
+
+        try:
+            book = self.server.service.create_book(dto.CreateBook(title=title, author=author, year=year))
+        except BookAlreadyExists as err:
+            raise HttpError(HTTPStatus.CONFLICT, err.title, book_id=err.book_id)
+
+        return HTTPStatus.CREATED, book_to_json(book)
+
+    def _put(self, path: str, _: str) -> tuple[HTTPStatus, typing.Any]:
+        match = _STATUS_ROUTE.fullmatch(path)
+        if match is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Not found")
+
+        body = self._read_json()
+        try:
+            status = BookStatus(body.get("status"))
+        except ValueError:
+            statuses = ", ".join(repr(str(status)) for status in BookStatus)
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Field 'status' must be one of {statuses}")
+
+        try:
+            self.server.service.update_status(int(match[1]), status)
+        except BookNotFound as err:
+            raise HttpError(HTTPStatus.NOT_FOUND, err.title)
+        except (BookAlreadyTaken, BookAlreadyInLibrary) as err:
+            raise HttpError(HTTPStatus.CONFLICT, err.title)
+
+        return HTTPStatus.NO_CONTENT, None
+
+    def _delete(self, path: str, _: str) -> tuple[HTTPStatus, typing.Any]:
+        match = _BOOK_ROUTE.fullmatch(path)
+        if match is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Not found")
+
+        try:
+            self.server.service.delete_book(int(match[1]))
+        except BookNotFound as err:
+            raise HttpError(HTTPStatus.NOT_FOUND, err.title)
+
+        return HTTPStatus.NO_CONTENT, None
+
+
+class ApiServer(HTTPServer):
+    """
+    ApiServer handles connections in fixed pool of threads.
+    Service is shared between threads, so its repository must be thread-safe.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        service: Service,
+        page_size: int | None = None,
+        workers: int = HTTP_WORKERS,
+        quiet: bool = False,
+    ):
+        super().__init__(address, ApiHandler)
+        self.service = service
+        self.page_size = min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        self.quiet = quiet
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True, cancel_futures=True)
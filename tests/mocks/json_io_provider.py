@@ -1,6 +1,8 @@
+import io
+import json
 import typing
 
-from src.infrastructure.db.json import IOProvider
+from src.infrastructure.db.json import IOProvider, Journal, StreamProvider
 
 
 class MockIOProvider(IOProvider):
@@ -15,3 +17,34 @@ class MockIOProvider(IOProvider):
 
     def write_json(self, data: typing.Any):
         self.data = data
+
+
+class MockStreamProvider(StreamProvider):
+    def __init__(self, data: typing.Any):
+        self.text = json.dumps(data, ensure_ascii=False, indent=1) if data is not None else ""
+
+    def __repr__(self):
+        return f'MockStreamProvider(text={self.text!r})'
+
+    def open_stream(self) -> typing.TextIO:
+        return io.StringIO(self.text)
+
+
+class MockJournal(Journal):
+    def __init__(self, records: list[typing.Any] | None = None):
+        self.records = list(records or [])
+
+    def __repr__(self):
+        return f'MockJournal(records={self.records!r})'
+
+    def read_records(self) -> typing.Iterable[typing.Any]:
+        return list(self.records)
+
+    def append(self, records: list[typing.Any]):
+        self.records.extend(records)
+
+    def truncate(self):
+        self.records.clear()
+
+    def size(self) -> int:
+        return len(self.records)
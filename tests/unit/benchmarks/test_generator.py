@@ -0,0 +1,34 @@
+import re
+from collections import Counter
+
+from benchmarks.generator import author_count, generate_books, library_json
+from src.infrastructure.db.json.schema import Schema
+
+
+def test_deterministic():
+    assert list(generate_books(500, seed=1)) == list(generate_books(500, seed=1))
+    assert list(generate_books(500, seed=1)) != list(generate_books(500, seed=2))
+
+
+def test_library_shape():
+    books = list(generate_books(5000))
+    assert len(books) == 5000
+    assert len({(book.title.lower(), book.author.lower(), book.year) for book in books}) == 5000
+
+    authors = Counter(book.author for book in books).most_common()
+    assert len(authors) <= author_count(5000)
+    # Skewed distribution: the most popular author has far more books than average
+    assert authors[0][1] > 10 * 5000 / len(authors)
+
+    assert any(re.search("[а-я]", book.title) for book in books)
+    assert any(re.search("[a-z]", book.title) for book in books)
+
+    years = [book.year for book in books]
+    assert min(years) < 1800 and max(years) > 2000
+    assert sum(year >= 1950 for year in years) > len(years) / 2
+
+
+def test_library_json_is_readable():
+    schema = Schema.from_json(library_json(100))
+    assert schema.last_id == 100
+    assert len(schema.books) == 100
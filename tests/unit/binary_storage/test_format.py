@@ -0,0 +1,47 @@
+import pytest
+
+from src.application.common.exceptions import MappingError
+from src.infrastructure.db.binary import SnapshotReader, write_snapshot
+from src.infrastructure.db.json.schema import BookSchema
+
+
+@pytest.fixture
+def books():
+    return [
+        BookSchema(id=1, title="Война и мир", author="Лев Толстой", year=1869, status=True),
+        BookSchema(id=3, title="Title", author="Author", year=-300, status=False),
+    ]
+
+
+def test_snapshot_roundtrip(tmp_path, books):
+    path = tmp_path / "books.bin"
+    write_snapshot(path, books, last_id=4, journal_seq=7)
+
+    reader = SnapshotReader(path)
+    assert len(reader) == 2
+    assert reader.last_id == 4
+    assert reader.journal_seq == 7
+
+    assert reader.get(1) == books[0]
+    assert reader.get(3) == books[1]
+    assert reader.get(2) is None
+    assert reader.get(100) is None
+    assert 3 in reader and 4 not in reader
+
+    assert list(reader) == books
+    reader.close()
+
+
+def test_snapshot_missing_file(tmp_path):
+    reader = SnapshotReader(tmp_path / "books.bin")
+    assert len(reader) == 0
+    assert reader.get(1) is None
+    assert list(reader) == []
+
+
+def test_snapshot_invalid_file(tmp_path):
+    path = tmp_path / "books.bin"
+    path.write_bytes(b"{}" * 100)
+
+    with pytest.raises(MappingError, match="Invalid type"):
+        SnapshotReader(path)
@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.service import AsyncService
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.async_storage import AsyncStorage
+from src.infrastructure.db.binary import BinaryStorage, write_snapshot
+from src.infrastructure.db.json.schema import BookSchema
+from tests.mocks.json_io_provider import MockJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "books.bin"
+    write_snapshot(
+        path,
+        [
+            BookSchema(
+                id=i,
+                title=f"book-{i}",
+                author="foo" if i % 2 == 0 else "bar" if i % 3 == 0 else "baz",
+                year=0,
+                status=True,
+            )
+            for i in range(1, 11)
+        ],
+        last_id=10,
+    )
+    return path
+
+
+def test_storage_search(path):
+    storage = BinaryStorage(path)
+    f = dto.BookFilter(author="foo")
+    books = storage.find_books(filters=f, pagination=Pagination(offset=2, limit=10))
+
+    assert [book.id for book in books] == [6, 8, 10]
+    assert storage.get_book_count(f) == 5
+    assert len(storage.find_books(dto.BookFilter(), Pagination())) == 10
+
+
+def test_storage_journal_overlay(path):
+    journal = MockJournal()
+    storage = BinaryStorage(path, journal=journal)
+
+    book_id = storage.save_book(dto.NewBook(title="New", author="Baz", year=1, status=BookStatus.AVAILABLE))
+    assert book_id == 11
+
+    with pytest.raises(BookAlreadyExists):
+        storage.save_book(dto.NewBook(title="BOOK-1", author="BAZ", year=0, status=BookStatus.AVAILABLE))
+
+    book = storage.get_book_by_id(2)
+    book.take_from_library()
+    storage.update_book(book)
+    storage.delete_book(3)
+
+    with pytest.raises(BookNotFound):
+        storage.delete_book(3)
+
+    replayed = BinaryStorage(path, journal=journal)
+    ids = [book.id for book in replayed.find_books(dto.BookFilter(), Pagination())]
+    assert ids == [1, 2, 4, 5, 6, 7, 8, 9, 10, 11]
+    assert replayed.get_book_count(dto.BookFilter()) == 10
+    assert replayed.get_book_by_id(2).status is BookStatus.TAKEN
+
+    replayed.compact()
+    assert journal.records == []
+
+    compacted = BinaryStorage(path, journal=journal)
+    assert [book.id for book in compacted.find_books(dto.BookFilter(), Pagination())] == ids
+    assert compacted.get_book_by_id(11).title == "New"
+    assert compacted.acquire_new_id() == 12
+
+
+def test_storage_without_journal(path):
+    storage = BinaryStorage(path)
+    storage.delete_book(1)
+
+    assert BinaryStorage(path).get_book_count(dto.BookFilter()) == 9
+
+
+def test_storage_loads_dedup_index(path, monkeypatch):
+    journal = MockJournal()
+    storage = BinaryStorage(path, journal=journal)
+    storage.save_book(dto.NewBook(title="New", author="foo", year=1, status=BookStatus.AVAILABLE))
+    storage.compact()
+    # Changes after compaction are applied to saved index from journal
+    book = storage.get_book_by_id(2)
+    book.title = "book-1"
+    book.author = "baz"
+    storage.delete_book(1)
+    storage.update_book(book)
+
+    def build(*args, **kwargs):
+        raise AssertionError("Dedup index is rebuilt")
+
+    monkeypatch.setattr("src.infrastructure.db.binary.storage.DedupIndex.build", build)
+    reopened = BinaryStorage(path, journal=journal)
+    with pytest.raises(BookAlreadyExists) as err:
+        reopened.save_book(dto.NewBook(title="NEW", author="FOO", year=1, status=BookStatus.AVAILABLE))
+
+    assert err.value.book_id == 11
+    with pytest.raises(BookAlreadyExists) as err:
+        reopened.save_book(dto.NewBook(title="book-1", author="baz", year=0, status=BookStatus.AVAILABLE))
+
+    assert err.value.book_id == 2
+    assert reopened.save_book(dto.NewBook(title="book-2", author="foo", year=0, status=BookStatus.AVAILABLE)) == 14
+
+
+def test_storage_ignores_stale_dedup_index(path):
+    storage = BinaryStorage(path)
+    storage.delete_book(1)
+    # Snapshot is replaced by other writer, saved index doesn't match it
+    write_snapshot(path, [BookSchema(id=1, title="book-1", author="baz", year=0, status=True)], last_id=10)
+
+    with pytest.raises(BookAlreadyExists):
+        BinaryStorage(path).save_book(dto.NewBook(title="book-1", author="baz", year=0, status=BookStatus.AVAILABLE))
+
+
+def test_storage_keyset_pages(path):
+    journal = MockJournal()
+    storage = BinaryStorage(path, journal=journal)
+    storage.save_book(dto.NewBook(title="New", author="Baz", year=1, status=BookStatus.AVAILABLE))
+    storage.delete_book(3)
+    storage.delete_book(6)
+
+    page = storage.find_books_page(dto.BookFilter(), Pagination(limit=3, after_id=2))
+    assert [book.id for book in page.items] == [4, 5, 7]
+    assert page.total == 9
+    assert page.has_more
+
+    page = storage.find_books_page(dto.BookFilter(author="baz"), Pagination(limit=3, after_id=5))
+    assert [book.id for book in page.items] == [7, 11]
+    assert page.total == 4
+    assert not page.has_more
+
+    page = storage.find_books_page(dto.BookFilter(), Pagination(limit=3, before_id=7), count_total=False)
+    assert [book.id for book in page.items] == [2, 4, 5]
+    assert page.has_more
+
+
+def test_storage_save_books(path):
+    journal = MockJournal()
+    storage = BinaryStorage(path, journal=journal)
+    results = storage.save_books([
+        dto.NewBook(title="new", author="foo", year=1, status=BookStatus.AVAILABLE),
+        dto.NewBook(title="book-3", author="BAR", year=0, status=BookStatus.AVAILABLE),
+        dto.NewBook(title="new", author="foo", year=1, status=BookStatus.AVAILABLE),
+    ])
+
+    assert results[0] == 11
+    assert [err.book_id for err in results[1:]] == [3, 11]
+    assert [record["seq"] for record in journal.records] == [1]
+
+    reopened = BinaryStorage(path, journal=journal)
+    assert reopened.get_book_by_id(11).title == "new"
+
+
+def test_storage_batch(path):
+    journal = MockJournal()
+    storage = BinaryStorage(path, journal=journal)
+    books = storage.get_books([1, 2])
+    for book in books:
+        book.take_from_library()
+
+    storage.update_books(books)
+    assert storage.delete_books([3, 12]) == [3]
+    assert len(journal.records) == 3
+
+    reopened = BinaryStorage(path, journal=journal)
+    assert reopened.get_book_by_id(2).status is BookStatus.TAKEN
+    assert reopened.get_book_count(dto.BookFilter()) == 9
+
+
+@pytest.mark.parametrize("journal", [None, MockJournal()])
+def test_concurrent_coroutines(path, journal):
+    async def run():
+        storage = BinaryStorage(path, journal=journal)
+        repo = AsyncStorage(storage)
+        service = AsyncService(repo)
+
+        async def add(i: int):
+            book = await service.create_book(dto.CreateBook(title=f"new {i}", author=f"author {i % 5}", year=2000))
+            return book.id
+
+        async def search(i: int):
+            books = await service.find_books(dto.BookFilter(author=f"author {i % 5}"), Pagination(limit=5))
+            assert all(book.author == f"author {i % 5}" for book in books.data)
+
+        async def change(book_id: int):
+            await service.update_status(book_id, BookStatus.TAKEN)
+
+        results = await asyncio.gather(
+            *(add(i) for i in range(150)),
+            *(search(i) for i in range(150)),
+            *(change(book_id) for book_id in range(1, 11)),
+        )
+        assert sorted(results[:150]) == list(range(11, 161))
+        assert await repo.get_book_count(dto.BookFilter()) == 160
+        assert len([book async for book in repo.iter_books(dto.BookFilter(author="author"))]) == 150
+        assert all(book.status is BookStatus.TAKEN for book in await repo.get_books(list(range(1, 11))))
+        repo.close()
+        storage.close()
+
+    asyncio.run(run())
+    # Everything is persisted
+    storage = BinaryStorage(path, journal=journal)
+    assert storage.get_book_count(dto.BookFilter()) == 160
+    storage.close()
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.service import Service
+from src.config.config import Config
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import JsonStorage
+from src.presentation.cli.cli import CLI
+from src.presentation.cli.main import _build_parser
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+@pytest.fixture
+def cli():
+    repo = JsonStorage(MockIOProvider({
+        "last_id": 4,
+        "books": [
+            {"id": i, "title": f"book-{i}", "author": "foo", "year": 2000, "status": True}
+            for i in range(1, 5)
+        ],
+    }))
+    cli = CLI(Config(storage_path=Path("books.json"), page_size=None), Service(repo), maintenance=repo)
+    return cli, repo
+
+
+def _run(cli: CLI, *argv: str):
+    cli.run(_build_parser().parse_args(argv))
+
+
+@pytest.mark.parametrize("argv", [
+    ("delete", "--title", ""),
+    ("delete", "--author", " "),
+    ("delete", "--year", "0"),
+    ("status", "--take", "--year", "0"),
+    ("status", "--take", "--title", "", "--author", ""),
+])
+def test_batch_rejects_unrestricted_filters(cli, capsys, argv):
+    cli, repo = cli
+    _run(cli, *argv)
+
+    assert "[ERROR]" in capsys.readouterr().out
+    assert repo.get_book_count(dto.BookFilter()) == 4
+    assert all(book.status is BookStatus.AVAILABLE for book in repo.iter_books(dto.BookFilter()))
+
+
+def test_batch_by_filters(cli, capsys):
+    cli, repo = cli
+    _run(cli, "status", "--take", "--title", "book-2")
+    _run(cli, "delete", "--title", "book-3")
+
+    out = capsys.readouterr().out
+    assert "Books updated: 1" in out
+    assert "Books deleted: 1" in out
+    assert repo.get_book_by_id(2).status is BookStatus.TAKEN
+    assert repo.get_book_count(dto.BookFilter()) == 3
+
+
+def test_http_server_imported_by_serve_only():
+    # Fresh interpreter, modules imported by other tests don't count
+    code = "import sys, src.presentation.cli.main; print('src.presentation.http' in sys.modules)"
+    root = Path(__file__).parents[3]
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.service import Service
+from src.config.config import Config
+from src.infrastructure.db.json import JsonStorage
+from src.presentation.cli.cli import CLI
+from src.presentation.cli.main import _build_parser
+from src.presentation.cli.shell import Shell
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+@pytest.fixture
+def shell():
+    repo = JsonStorage(MockIOProvider(None))
+    cli = CLI(Config(storage_path=Path("books.json"), page_size=None), Service(repo), maintenance=repo)
+    return Shell(_build_parser(), cli), repo
+
+
+def test_commands_share_storage(shell, capsys):
+    shell, repo = shell
+    shell.execute('add "War and Peace" Tolstoy 1869')
+    shell.execute("add Anna Tolstoy 1877")
+    shell.execute("status 1 --take")
+    shell.execute("search --author tolstoy")
+
+    out = capsys.readouterr().out
+    assert "Book updated" in out
+    assert "Total books: 2" in out
+    assert out.count(" ms)") == 4
+    assert repo.get_book_by_id(1).status == "taken"
+    assert repo.get_book_count(dto.BookFilter()) == 2
+
+
+@pytest.mark.parametrize("line", ["", "search --year x", "bogus", 'add "unclosed', "shell", "serve"])
+def test_invalid_lines_keep_shell(shell, line):
+    shell, repo = shell
+    shell.execute(line)
+    shell.execute("add Anna Tolstoy 1877")
+    assert repo.get_book_count(dto.BookFilter()) == 1
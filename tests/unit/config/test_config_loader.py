@@ -0,0 +1,43 @@
+import pytest
+
+from src.config.config import ConfigConflictingFields, ConfigMissingField
+from src.infrastructure.config_loader import load_config
+
+
+def _write_config(tmp_path, *lines: str) -> str:
+    path = tmp_path / "config.ini"
+    path.write_text("\n".join(("[main]", "storage.path = books.json", *lines)), encoding="utf-8")
+    return str(path)
+
+
+def test_shards(tmp_path):
+    config = load_config(_write_config(tmp_path, "storage.shards.partition = id", "storage.shards.size = 100"))
+    assert config.shards.partition == "id"
+    assert config.shards.size == 100
+
+
+@pytest.mark.parametrize("line", [
+    "storage.backend = sqlite",
+    "storage.journal = yes",
+    "storage.flush.max_delay = 1",
+    "storage.columnar = yes",
+    "storage.parallel.min_books = 1000",
+])
+def test_shards_conflicts(tmp_path, line):
+    with pytest.raises(ConfigConflictingFields):
+        load_config(_write_config(tmp_path, "storage.shards.partition = hash", line))
+
+
+def test_flush_needs_delay(tmp_path):
+    with pytest.raises(ConfigMissingField):
+        load_config(_write_config(tmp_path, "storage.flush.max_pending = 10"))
+
+    config = load_config(_write_config(tmp_path, "storage.flush.max_pending = 10", "storage.flush.max_delay = 0.5"))
+    assert config.flush.max_pending == 10
+    assert config.flush.max_delay == 0.5
+
+
+def test_binary_journal_by_default(tmp_path):
+    assert load_config(_write_config(tmp_path, "storage.backend = binary")).journal is not None
+    assert load_config(_write_config(tmp_path, "storage.backend = binary", "storage.journal = no")).journal is None
+    assert load_config(_write_config(tmp_path)).journal is None
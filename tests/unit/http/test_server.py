@@ -0,0 +1,100 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from src.application.book.service import Service
+from src.infrastructure.db.json import JsonStorage
+from src.presentation.http import ApiServer
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+@pytest.fixture
+def server():
+    server = ApiServer(("127.0.0.1", 0), Service(JsonStorage(MockIOProvider(None))), page_size=2, quiet=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _connect(server: ApiServer) -> http.client.HTTPConnection:
+    host, port = server.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=5)
+
+
+def _request(conn: http.client.HTTPConnection, method: str, path: str, body=None) -> tuple[int, dict | None]:
+    conn.request(method, path, body=None if body is None else json.dumps(body))
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, json.loads(data) if data else None
+
+
+def test_books_over_one_connection(server):
+    conn = _connect(server)
+    for i in range(3):
+        status, book = _request(conn, "POST", "/books", {"title": f"Книга {i}", "author": "Author", "year": 2000 + i})
+        assert status == 201
+        assert book["id"] == i + 1
+
+    status, body = _request(conn, "POST", "/books", {"title": "книга 0", "author": "author", "year": 2000})
+    assert (status, body["book_id"]) == (409, 1)
+
+    status, body = _request(conn, "GET", "/books?author=auth")
+    assert status == 200
+    assert [book["id"] for book in body["data"]] == [1, 2]
+    assert body["pagination"]["total"] == 3
+
+    status, body = _request(conn, "GET", f"/books?author=auth&count=0&cursor={body['pagination']['next_cursor']}")
+    assert [book["id"] for book in body["data"]] == [3]
+    assert body["pagination"]["has_more"] is False
+
+    assert _request(conn, "PUT", "/books/1/status", {"status": "taken"}) == (204, None)
+    assert _request(conn, "PUT", "/books/1/status", {"status": "taken"})[0] == 409
+    assert _request(conn, "PUT", "/books/7/status", {"status": "available"})[0] == 404
+
+    assert _request(conn, "DELETE", "/books/2") == (204, None)
+    assert _request(conn, "DELETE", "/books/2")[0] == 404
+
+    status, body = _request(conn, "GET", "/books?limit=10")
+    assert [(book["id"], book["status"]) for book in body["data"]] == [(1, "taken"), (3, "available")]
+    conn.close()
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("GET", "/books?year=abc", None),
+    ("GET", "/books?limit=0", None),
+    ("GET", "/books?cursor=bad", None),
+    ("POST", "/books", {"title": "", "author": "a", "year": 1}),
+    ("POST", "/books", {"title": "t", "author": "a", "year": "1"}),
+    ("POST", "/books", [1]),
+    ("PUT", "/books/1/status", {"status": "lost"}),
+])
+def test_bad_request(server, method, path, body):
+    conn = _connect(server)
+    status, data = _request(conn, method, path, body)
+    assert status == 400
+    assert data["error"]
+    conn.close()
+
+
+def test_concurrent_clients(server):
+    def client(n: int):
+        conn = _connect(server)
+        for i in range(10):
+            _request(conn, "POST", "/books", {"title": f"Book {n}-{i}", "author": f"Author {n}", "year": 2000})
+            assert _request(conn, "GET", f"/books?author=author {n}".replace(" ", "%20"))[0] == 200
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    conn = _connect(server)
+    assert _request(conn, "GET", "/books")[1]["pagination"]["total"] == 50
+    conn.close()
@@ -0,0 +1,57 @@
+import random
+
+from src.application.book import dto
+from src.infrastructure.db.json.authors import AuthorDictionary
+from src.infrastructure.db.json.filter import FilterFactory
+from src.infrastructure.db.json.schema import BookSchema, Schema
+
+
+def test_dictionary():
+    authors = AuthorDictionary()
+    pushkin = authors.intern("Пушкин")
+    assert authors.intern("Пушкин") == pushkin
+    tolstoy = authors.intern("Толстой")
+
+    authors.add(pushkin, 3)
+    authors.add(pushkin, 1)
+    authors.add(tolstoy, 2)
+    assert authors.match("ПУШ") == [pushkin]
+    assert list(authors.keys([pushkin, tolstoy])) == [1, 2, 3]
+
+    authors.remove(pushkin, 1)
+    assert authors.count(authors.match("т")) == 1
+    assert authors.count([pushkin]) == 1
+
+
+def test_authors_are_interned():
+    schema = Schema.from_json({
+        "last_id": 2,
+        "books": [
+            {"id": 1, "title": "a", "author": "Foo", "year": 1, "status": True},
+            {"id": 2, "title": "b", "author": "Foo", "year": 1, "status": True},
+        ],
+    })
+    assert schema.books[1].author is schema.books[2].author
+
+
+def test_select_by_author():
+    rnd = random.Random(1)
+    authors = [f"Author {i}" for i in range(50)]
+    # Ids are not in ascending order, postings can't give storage order
+    ids = list(range(1, 401))
+    rnd.shuffle(ids)
+
+    for book_ids in (sorted(ids), ids):
+        schema = Schema()
+        for book_id in book_ids:
+            schema.insert(BookSchema(id=book_id, title=f"t{book_id}", author=rnd.choice(authors),
+                                     year=rnd.choice([1, 2]), status=True))
+
+        schema.update(BookSchema(id=book_ids[0], title="t", author="Author 7", year=1, status=True))
+        schema.delete(book_ids[1])
+
+        for filters in (dto.BookFilter(author="author 7"), dto.BookFilter(author="4", year=2),
+                        dto.BookFilter(author="author")):
+            expected = list(filter(FilterFactory.from_dto(filters), schema.books.values()))
+            assert list(schema.select(filters)) == expected
+            assert schema.count(filters) == len(expected)
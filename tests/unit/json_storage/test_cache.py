@@ -0,0 +1,63 @@
+from src.application.book import dto
+from src.application.common.pagination import Pagination
+from src.domain.book.entity import Book
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import JsonStorage
+from src.infrastructure.db.json.cache import MatchCache, Matches
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+def _page(matches: Matches, pagination: Pagination):
+    ids, has_more = matches.page(pagination)
+    return ids.tolist(), has_more
+
+
+def test_matches_page():
+    matches = Matches.collect([2, 4, 6, 8, 10])
+    assert matches.ordered
+
+    assert _page(matches, Pagination(offset=1, limit=2)) == ([4, 6], True)
+    assert _page(matches, Pagination(offset=3, limit=2)) == ([8, 10], False)
+    assert _page(matches, Pagination()) == ([2, 4, 6, 8, 10], False)
+    assert _page(matches, Pagination(limit=2, after_id=5)) == ([6, 8], True)
+    assert _page(matches, Pagination(limit=2, before_id=6)) == ([2, 4], False)
+    assert _page(matches, Pagination(limit=2, before_id=9)) == ([6, 8], True)
+
+    unordered = Matches.collect([3, 1, 2])
+    assert not unordered.ordered
+    assert unordered.page(Pagination(limit=2, after_id=1)) is None
+    assert _page(unordered, Pagination(limit=2)) == ([3, 1], True)
+
+
+def test_cache_generation():
+    cache = MatchCache(max_entries=2)
+    filters = [dto.BookFilter(year=year) for year in range(3)]
+    for f in filters:
+        cache.put(0, f, [1])
+
+    # The oldest search is evicted
+    assert cache.get(0, filters[0]) is None
+    assert cache.get(0, filters[2]) is not None
+    assert cache.get(1, filters[2]) is None
+
+
+def test_storage_drops_cache_on_mutation():
+    storage = JsonStorage(MockIOProvider(None))
+    for i in range(5):
+        storage.save_book(dto.NewBook(title=f"Book {i}", author="Foo", year=2000, status=BookStatus.AVAILABLE))
+
+    f = dto.BookFilter(author="foo")
+    page = storage.find_books_page(f, Pagination(limit=2))
+    assert [book.id for book in page.items] == [1, 2]
+    assert page.total == 5
+
+    storage.delete_book(3)
+    page = storage.find_books_page(f, Pagination(limit=2, after_id=2), count_total=False)
+    assert [book.id for book in page.items] == [4, 5]
+    assert not page.has_more
+
+    book = storage.get_book_by_id(4)
+    storage.update_book(Book(id=4, title="Other", author="Bar", year=2000, status=book.status))
+    page = storage.find_books_page(f, Pagination(limit=2))
+    assert [book.id for book in page.items] == [1, 2]
+    assert page.total == 3
@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import FileJsonProvider, JsonStorage
+from src.infrastructure.db.json.columnar import ColumnarSchema
+from src.infrastructure.db.json.schema import BookSchema, Schema
+
+FILTERS = [
+    dto.BookFilter(),
+    dto.BookFilter(title="1"),
+    dto.BookFilter(title="ИТЛ"),
+    dto.BookFilter(author="auth"),
+    dto.BookFilter(author="b", year=2001),
+    dto.BookFilter(title="2", author="a", year=2000),
+    dto.BookFilter(year=2002),
+    dto.BookFilter(title="missing"),
+    dto.BookFilter(year_from=2001),
+    dto.BookFilter(author="a", year_from=2000, year_to=2001),
+    dto.BookFilter(year=2002, year_to=2001),
+]
+
+
+def _random_book(rnd: random.Random, book_id: int) -> BookSchema:
+    return BookSchema(
+        id=book_id,
+        title=rnd.choice(["Title", "титл", "TITLE"]) + str(rnd.randrange(30)),
+        author=rnd.choice(["Author A", "author b", "Автор"]),
+        year=rnd.choice([2000, 2001, 2002]),
+        status=rnd.random() < 0.5,
+    )
+
+
+def test_same_behaviour_as_schema():
+    rnd = random.Random(7)
+    schema = Schema()
+    columnar = ColumnarSchema()
+
+    for _ in range(3000):
+        op = rnd.random()
+        if op < 0.6:
+            book = _random_book(rnd, schema.last_id + 1)
+        elif op < 0.8 and schema.books:
+            book = _random_book(rnd, rnd.choice(list(schema.books)))
+        else:
+            book_id = rnd.randrange(1, schema.last_id + 2)
+            results = []
+            for s in (schema, columnar):
+                try:
+                    s.delete(book_id)
+                    results.append(None)
+                except BookNotFound as err:
+                    results.append(type(err))
+
+            assert results[0] == results[1]
+            continue
+
+        results = []
+        for s in (schema, columnar):
+            try:
+                if book.id in s.books:
+                    s.update(book)
+                else:
+                    s.next_id()
+                    s.insert(book)
+                results.append(None)
+            except BookAlreadyExists as err:
+                results.append(err.book_id)
+
+        assert results[0] == results[1]
+
+    assert columnar.to_json() == schema.to_json()
+    for filters in FILTERS:
+        assert list(columnar.select(filters)) == list(schema.select(filters))
+        assert columnar.count(filters) == schema.count(filters)
+
+        ids = sorted(book.id for book in schema.select(filters))
+        for cursor in (None, 1, schema.last_id // 2, schema.last_id):
+            after = [book_id for book_id in ids if cursor is None or book_id > cursor]
+            before = [book_id for book_id in reversed(ids) if cursor is None or book_id < cursor]
+            for s in (schema, columnar):
+                assert [book.id for book in s.select_keyset(filters, after_id=cursor)] == after
+                assert [book.id for book in s.select_keyset(filters, before_id=cursor, reverse=True)] == before
+
+
+def test_update_and_delete():
+    schema = ColumnarSchema()
+    schema.insert(BookSchema(id=1, title="Foo", author="Bar", year=1, status=True))
+    schema.insert(BookSchema(id=2, title="Baz", author="Bar", year=1, status=False))
+
+    with pytest.raises(BookAlreadyExists):
+        schema.insert(BookSchema(id=3, title="foo", author="bar", year=1, status=False))
+
+    schema.update(BookSchema(id=1, title="New", author="Bar", year=2, status=False))
+    assert schema.books[1] == BookSchema(id=1, title="New", author="Bar", year=2, status=False)
+    assert list(schema.select(dto.BookFilter(title="foo"))) == []
+
+    schema.delete(2)
+    assert 2 not in schema.books
+    assert len(schema.books) == 1
+    with pytest.raises(BookNotFound):
+        schema.update(BookSchema(id=2, title="Baz", author="Bar", year=1, status=False))
+
+
+def test_json_storage(tmp_path):
+    path = tmp_path / "books.json"
+    storage = JsonStorage(FileJsonProvider(path))
+    for i in range(20):
+        storage.save_book(dto.NewBook(title=f"Book {i}", author="Foo", year=2000 + i % 2, status=BookStatus.AVAILABLE))
+
+    storage = JsonStorage(FileJsonProvider(path), columnar=True)
+    books = storage.find_books(dto.BookFilter(title="book 1", year=2001), Pagination(limit=3))
+    assert [book.id for book in books] == [2, 12, 14]
+    assert storage.get_book_count(dto.BookFilter(year=2000)) == 10
+
+    storage.delete_book(1)
+    book_id = storage.save_book(dto.NewBook(title="Book 0", author="Foo", year=2000, status=BookStatus.TAKEN))
+    assert book_id == 21
+    assert JsonStorage(FileJsonProvider(path), columnar=True).get_book_by_id(21).title == "Book 0"
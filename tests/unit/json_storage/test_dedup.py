@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists
+from src.application.common.exceptions import MappingError
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db import dedup
+from src.infrastructure.db.dedup import DedupIndex, book_digest
+from src.infrastructure.db.json import FileJsonProvider, JsonStorage
+from src.infrastructure.db.json import schema as schema_module
+
+
+def test_index_matches_dict():
+    rnd = random.Random(42)
+    index = DedupIndex()
+    expected = {}
+
+    for i in range(2000):
+        digest = book_digest(f"title-{rnd.randrange(500)}", "author", 2000)
+        if digest in expected and rnd.random() < 0.5:
+            index.remove(digest)
+            del expected[digest]
+        else:
+            index.put(digest, i)
+            expected[digest] = i
+
+        assert len(index) == len(expected)
+
+    for i in range(500):
+        digest = book_digest(f"title-{i}", "author", 2000)
+        assert index.get(digest) == expected.get(digest)
+
+
+def test_index_bytes_roundtrip():
+    index = DedupIndex.build(
+        (book_digest(f"title-{i}", "author", 2000), i) for i in range(100)
+    )
+    restored = DedupIndex.from_bytes(index.to_bytes())
+
+    assert len(restored) == 100
+    assert restored.get(book_digest("title-42", "author", 2000)) == 42
+    assert restored.get(book_digest("title-100", "author", 2000)) is None
+
+    with pytest.raises(MappingError):
+        DedupIndex.from_bytes(b"garbage")
+
+
+def test_saved_index_is_loaded_without_hashing(tmp_path, monkeypatch):
+    path = tmp_path / "books.json"
+    storage = JsonStorage(FileJsonProvider(path))
+    for i in range(10):
+        storage.save_book(dto.NewBook(title=f"book-{i}", author="foo", year=2000, status=BookStatus.AVAILABLE))
+
+    calls = []
+
+    def counting_digest(*args):
+        calls.append(args)
+        return dedup.book_digest(*args)
+
+    monkeypatch.setattr(schema_module, "book_digest", counting_digest)
+
+    storage = JsonStorage(FileJsonProvider(path))
+    with pytest.raises(BookAlreadyExists):
+        storage.save_book(dto.NewBook(title="BOOK-3", author="foo", year=2000, status=BookStatus.TAKEN))
+
+    # Only new book was hashed
+    assert len(calls) == 1
+
+    # Index of other version of file is ignored
+    path.write_text('{"last_id": 1, "books": [{"id": 1, "title": "book-3", "author": "foo", '
+                    '"year": 2000, "status": true}]}')
+    storage = JsonStorage(FileJsonProvider(path))
+    storage.save_book(dto.NewBook(title="book-4", author="foo", year=2000, status=BookStatus.TAKEN))
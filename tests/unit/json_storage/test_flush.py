@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from src.application.book import dto
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import FileJsonProvider, FlushPolicy, JsonStorage
+from src.infrastructure.db.json.schema import _SchemaJson
+from tests.mocks.json_io_provider import MockIOProvider, MockJournal
+
+
+class CountingJournal(MockJournal):
+    def __init__(self):
+        super().__init__()
+        self.appends = 0
+
+    def append(self, records):
+        self.appends += 1
+        super().append(records)
+
+
+def _new_book(i: int) -> dto.NewBook:
+    return dto.NewBook(title=f"book-{i}", author="foo", year=2000, status=BookStatus.AVAILABLE)
+
+
+@pytest.fixture
+def provider():
+    return MockIOProvider(_SchemaJson(last_id=0, books=[]))
+
+
+def test_max_pending(provider):
+    storage = JsonStorage(provider, flush=FlushPolicy(max_pending=3))
+
+    storage.save_book(_new_book(1))
+    storage.save_book(_new_book(2))
+    assert provider.data["books"] == []
+
+    storage.save_book(_new_book(3))
+    assert len(provider.data["books"]) == 3
+    storage.close()
+
+
+def test_context_manager(provider):
+    with JsonStorage(provider, flush=FlushPolicy(max_pending=100)) as storage:
+        storage.save_book(_new_book(1))
+        storage.delete_book(1)
+        storage.save_book(_new_book(2))
+        assert provider.data["last_id"] == 0
+
+    assert provider.data["last_id"] == 2
+    assert len(provider.data["books"]) == 1
+
+
+def test_max_delay(provider):
+    storage = JsonStorage(provider, flush=FlushPolicy(max_pending=100, max_delay=0.01))
+    storage.save_book(_new_book(1))
+
+    deadline = time.monotonic() + 5
+    while not provider.data["books"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(provider.data["books"]) == 1
+    storage.close()
+
+
+def test_group_commit_to_journal(provider):
+    journal = CountingJournal()
+    with JsonStorage(provider, journal=journal, flush=FlushPolicy(max_pending=100)) as storage:
+        for i in range(10):
+            storage.save_book(_new_book(i))
+
+    assert journal.appends == 1
+    assert [r["seq"] for r in journal.records] == list(range(1, 11))
+    assert provider.data["books"] == []
+
+
+def test_compact_folds_pending(provider):
+    journal = CountingJournal()
+    with JsonStorage(provider, journal=journal, flush=FlushPolicy(max_pending=100)) as storage:
+        storage.save_book(_new_book(1))
+        storage.compact()
+
+    assert journal.appends == 0
+    assert len(provider.data["books"]) == 1
+
+
+def test_file_provider_atomic_write(tmp_path):
+    path = tmp_path / "books.json"
+    provider = FileJsonProvider(path)
+    provider.write_json({"last_id": 1, "books": []})
+    provider.write_json({"last_id": 2, "books": []})
+
+    assert provider.read_json() == {"last_id": 2, "books": []}
+    assert [p.name for p in tmp_path.iterdir()] == ["books.json"]
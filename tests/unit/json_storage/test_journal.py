@@ -0,0 +1,110 @@
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookNotFound
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import CompactionPolicy, FileJsonJournal, JsonStorage
+from src.infrastructure.db.json.schema import _SchemaJson, _BookJson
+from tests.mocks.json_io_provider import MockIOProvider, MockJournal
+
+
+@pytest.fixture
+def schema_json():
+    return _SchemaJson(
+        last_id=2,
+        books=[
+            _BookJson(id=1, title="First", author="Foo", year=2000, status=True),
+            _BookJson(id=2, title="Second", author="Bar", year=2001, status=True),
+        ]
+    )
+
+
+def _new_book(title: str) -> dto.NewBook:
+    return dto.NewBook(title=title, author="Baz", year=2024, status=BookStatus.AVAILABLE)
+
+
+def test_mutations_go_to_journal(schema_json):
+    provider = MockIOProvider(schema_json)
+    journal = MockJournal()
+    storage = JsonStorage(provider, journal=journal)
+
+    book_id = storage.save_book(_new_book("Third"))
+    book = storage.get_book_by_id(1)
+    book.take_from_library()
+    storage.update_book(book)
+    storage.delete_book(2)
+
+    # Snapshot is untouched, all changes in journal
+    assert provider.data is schema_json
+    assert [r["op"] for r in journal.records] == ["insert", "update", "delete"]
+    assert [r["seq"] for r in journal.records] == [1, 2, 3]
+
+    replayed = JsonStorage(provider, journal=journal)
+    assert replayed.get_book_by_id(book_id).title == "Third"
+    assert replayed.get_book_by_id(1).status is BookStatus.TAKEN
+    with pytest.raises(BookNotFound):
+        replayed.get_book_by_id(2)
+
+    assert replayed.acquire_new_id() == book_id + 1
+
+
+def test_compact(schema_json):
+    provider = MockIOProvider(schema_json)
+    journal = MockJournal()
+    storage = JsonStorage(provider, journal=journal)
+
+    storage.save_book(_new_book("Third"))
+    storage.compact()
+
+    assert journal.records == []
+    assert provider.data["journal_seq"] == 1
+    assert len(provider.data["books"]) == 3
+
+    storage.delete_book(1)
+    assert journal.records[0]["seq"] == 2
+
+
+def test_compaction_threshold(schema_json):
+    provider = MockIOProvider(schema_json)
+    journal = MockJournal()
+    storage = JsonStorage(provider, journal=journal, compaction=CompactionPolicy(max_records=2))
+
+    storage.save_book(_new_book("Third"))
+    assert len(journal.records) == 1
+
+    storage.save_book(_new_book("Fourth"))
+    assert journal.records == []
+    assert len(provider.data["books"]) == 4
+
+
+def test_replay_skips_compacted_records(schema_json):
+    provider = MockIOProvider(schema_json)
+    journal = MockJournal()
+    storage = JsonStorage(provider, journal=journal)
+    storage.save_book(_new_book("Third"))
+
+    # Emulate crash between snapshot write and journal truncate
+    records = list(journal.records)
+    storage.compact()
+    journal.records = records
+
+    replayed = JsonStorage(provider, journal=journal)
+    assert replayed.get_book_count(dto.BookFilter()) == 3
+
+
+def test_file_journal_torn_tail(tmp_path):
+    path = tmp_path / "books.json.journal"
+    journal = FileJsonJournal(path)
+    journal.append([{"seq": 1}, {"seq": 2}])
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "op": "ins')
+
+    assert journal.read_records() == [{"seq": 1}, {"seq": 2}]
+
+    journal.append([{"seq": 3}])
+    assert journal.read_records() == [{"seq": 1}, {"seq": 2}, {"seq": 3}]
+
+    journal.truncate()
+    assert journal.size() == 0
+    assert journal.read_records() == []
@@ -0,0 +1,88 @@
+import multiprocessing
+
+import pytest
+
+from src.application.book import dto
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import FileJsonJournal, FileJsonProvider, JsonStorage
+
+
+class CountingProvider(FileJsonProvider):
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = 0
+
+    def read_json(self):
+        self.reads += 1
+        return super().read_json()
+
+
+def _new_book(i: int) -> dto.NewBook:
+    return dto.NewBook(title=f"book-{i}", author="foo", year=2000, status=BookStatus.AVAILABLE)
+
+
+@pytest.mark.parametrize("with_journal", [False, True])
+def test_two_instances(tmp_path, with_journal):
+    path = tmp_path / "books.json"
+
+    def open_storage():
+        journal = FileJsonJournal(tmp_path / "books.json.journal") if with_journal else None
+        return JsonStorage(FileJsonProvider(path), journal)
+
+    first = open_storage()
+    second = open_storage()
+
+    first_id = first.save_book(_new_book(1))
+    second_id = second.save_book(_new_book(2))
+    assert first_id != second_id
+
+    # Both writes are persisted, nobody overwrote other
+    assert second.get_book_count(dto.BookFilter()) == 2
+    assert first.get_book_by_id(second_id).title == "book-2"
+
+    second.delete_book(first_id)
+    assert open_storage().get_book_count(dto.BookFilter()) == 1
+
+
+def test_unchanged_file_is_not_reparsed(tmp_path):
+    provider = CountingProvider(tmp_path / "books.json")
+    storage = JsonStorage(provider)
+    storage.save_book(_new_book(1))
+    reads = provider.reads
+
+    storage.get_book_by_id(1)
+    storage.get_book_count(dto.BookFilter())
+    assert provider.reads == reads
+
+    JsonStorage(FileJsonProvider(tmp_path / "books.json")).save_book(_new_book(2))
+    assert storage.get_book_count(dto.BookFilter()) == 2
+    assert provider.reads == reads + 1
+
+
+def _add_books(path: str, start: int, count: int):
+    storage = JsonStorage(FileJsonProvider(path))
+    for i in range(start, start + count):
+        storage.save_book(_new_book(i))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fork start method isn't available",
+)
+def test_concurrent_processes(tmp_path):
+    path = str(tmp_path / "books.json")
+    ctx = multiprocessing.get_context("fork")
+    processes = [
+        ctx.Process(target=_add_books, args=(path, i * 100, 20))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    storage = JsonStorage(FileJsonProvider(path))
+    assert storage.get_book_count(dto.BookFilter()) == 80
+    assert storage.acquire_new_id() == 81
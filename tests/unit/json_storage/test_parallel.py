@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from src.application.book import dto
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import JsonStorage, ParallelPolicy
+from src.infrastructure.db.json.schema import BookSchema
+from tests.mocks.json_io_provider import MockIOProvider
+
+FILTERS = [
+    dto.BookFilter(title="1"),
+    dto.BookFilter(title="title 7"),
+    dto.BookFilter(title="9", year=2001),
+    dto.BookFilter(title="2", author="b", year_from=2001),
+    dto.BookFilter(title="missing"),
+]
+
+
+def _data() -> dict:
+    rnd = random.Random(5)
+    book_ids = list(range(1, 1500))
+    # Unordered storage must keep storage order too
+    book_ids[10], book_ids[900] = book_ids[900], book_ids[10]
+    books = [
+        BookSchema(
+            id=book_id,
+            title=f"Title {book_id}",
+            author=rnd.choice(["Author A", "author b"]),
+            year=rnd.choice([2000, 2001, 2002]),
+            status=True,
+        ).to_json()
+        for book_id in book_ids
+    ]
+    return {"last_id": 1499, "books": books}
+
+
+@pytest.fixture
+def storages():
+    data = _data()
+    serial = JsonStorage(MockIOProvider(data))
+    storage = JsonStorage(MockIOProvider(data), parallel=ParallelPolicy(min_books=100, workers=2))
+    yield serial, storage
+    storage.close()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_parallel_same_as_serial(storages, filters):
+    serial, storage = storages
+    assert storage.get_book_count(filters) == serial.get_book_count(filters)
+
+    for pagination in (Pagination(offset=0, limit=10), Pagination(offset=30, limit=7), Pagination()):
+        assert storage.find_books_page(filters, pagination) == serial.find_books_page(filters, pagination)
+        assert storage.find_books(filters, pagination) == serial.find_books(filters, pagination)
+
+
+def test_parallel_after_mutation(storages):
+    serial, storage = storages
+    filters = dto.BookFilter(title="title 14")
+    before = storage.get_book_count(filters)
+
+    for repo in storages:
+        repo.delete_book(14)
+        repo.save_book(dto.NewBook(title="Title 14 new", author="c", year=2003, status=BookStatus.AVAILABLE))
+
+    assert storage.get_book_count(filters) == before
+    assert storage.find_books(filters, Pagination()) == serial.find_books(filters, Pagination())
+
+
+def test_titles_copied_by_scan_only(storages):
+    _, storage = storages
+    filters = dto.BookFilter(title="title 1")
+    storage.get_book_count(filters)
+    scanner = storage._scanner
+    executor, titles = scanner._executor, scanner._titles
+
+    for i in range(5):
+        storage.save_book(dto.NewBook(title=f"Title 1 new {i}", author="c", year=2003, status=BookStatus.AVAILABLE))
+
+    # Mutations don't touch titles, the next scan copies them once, pool is kept
+    assert scanner._titles is titles
+    storage.get_book_count(filters)
+    assert scanner._titles is not titles
+    assert scanner._executor is executor
+    assert storage.find_books(filters, Pagination(offset=0, limit=1000))[-1].title == "Title 1 new 4"
+
+
+def test_match_doesnt_span_titles():
+    books = [
+        BookSchema(id=i, title=title, author="a", year=2000, status=True).to_json()
+        for i, title in enumerate(["ab", "Cd", "Война и мир", "МИР", "xab"] * 30, start=1)
+    ]
+    storage = JsonStorage(
+        MockIOProvider({"last_id": len(books), "books": books}),
+        parallel=ParallelPolicy(min_books=10, workers=2),
+    )
+
+    assert storage.get_book_count(dto.BookFilter(title="bc")) == 0
+    assert storage.get_book_count(dto.BookFilter(title="ми")) == 60
+    assert storage.get_book_count(dto.BookFilter(title="ab")) == 60
+    storage.close()
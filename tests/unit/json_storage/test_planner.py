@@ -0,0 +1,90 @@
+import pytest
+
+from src.application.book import dto
+from src.infrastructure.db.json.columnar import ColumnarSchema
+from src.infrastructure.db.json.filter import FilterFactory
+from src.infrastructure.db.json.planner import AccessPath, Predicate, make_plan
+from src.infrastructure.db.json.schema import BookSchema, Schema
+
+
+def _books() -> list[BookSchema]:
+    return [
+        BookSchema(
+            id=i,
+            title=f"Title {i}",
+            author="Rare" if i % 100 == 0 else "Common",
+            year=1900 + i % 100,
+            status=True,
+        )
+        for i in range(1, 2001)
+    ]
+
+
+def test_make_plan():
+    def accept(_):
+        return True
+
+    cheap = Predicate(accept, cost=1, selectivity=0.5)
+    strict = Predicate(accept, cost=4, selectivity=0.01)
+    loose = Predicate(accept, cost=1, selectivity=0.99)
+
+    paths = [
+        AccessPath(name="big", estimate=50, ids=lambda: [1], predicate=cheap),
+        AccessPath(name="small", estimate=10, ids=lambda: [2], predicate=loose),
+    ]
+    plan = make_plan(100, paths, [strict])
+    assert plan.access == "small"
+    assert plan.ids == [2]
+    assert plan.predicates == (cheap.check, strict.check)
+
+    # Index isn't selective enough, scan is cheaper
+    plan = make_plan(20, paths, [])
+    assert plan.access is None
+    assert plan.ids is None
+    assert len(plan.predicates) == 2
+
+
+@pytest.mark.parametrize("filters, access", [
+    (dto.BookFilter(year=1999, title="1"), "year"),
+    (dto.BookFilter(author="common", year=1950), "year"),
+    (dto.BookFilter(author="rare", year_from=1950), "author"),
+    (dto.BookFilter(author="common", year_from=1950), None),
+    (dto.BookFilter(title="title"), None),
+])
+def test_schema_plan(filters, access):
+    schema = Schema(books={book.id: book for book in _books()})
+    assert schema.plan(filters).access == access
+
+    expected = list(filter(FilterFactory.from_dto(filters), _books()))
+    assert list(schema.select(filters)) == expected
+    assert schema.count(filters) == len(expected)
+
+
+def test_schema_plan_title_index():
+    schema = Schema(books={book.id: book for book in _books()})
+    filters = dto.BookFilter(author="common", title="title 123")
+    for _ in range(2):
+        plan = schema.plan(filters)
+
+    # Index is built in background, searches scan titles until it is ready
+    assert plan.access != "title"
+    schema._title_build.join()
+    plan = schema.plan(filters)
+
+    assert plan.access == "title"
+    assert [book.id for book in schema.select(filters)] == [123, 1230, 1231, 1232, 1233, 1234, 1235, 1236, 1237, 1238, 1239]
+
+
+@pytest.mark.parametrize("filters", [
+    dto.BookFilter(author="rare", title="00"),
+    dto.BookFilter(author="common", title="00"),
+    dto.BookFilter(author="rare", title="00", year=1900),
+])
+def test_columnar_title_by_rows(filters):
+    schema = ColumnarSchema()
+    for book in _books():
+        schema.insert(book)
+
+    schema.delete(1000)
+    expected = [book for book in _books() if book.id != 1000 and FilterFactory.from_dto(filters)(book)]
+    assert list(schema.select(filters)) == expected
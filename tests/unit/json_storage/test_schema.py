@@ -1,5 +1,7 @@
 import pytest
 
+from src.application.book import dto
+
 from src.application.book.exceptions import BookAlreadyExists, BookNotFound
 from src.application.common.exceptions import MappingError
 from src.infrastructure.db.json.schema import Schema, BookSchema
@@ -169,4 +171,22 @@ def test_from_json():
     )
 
     json_data = schema.to_json()
-    assert Schema.from_json(json_data) == schema
\ No newline at end of file
+    assert Schema.from_json(json_data) == schema
+
+
+class _NoScanBooks(dict):
+    def values(self):
+        raise AssertionError("books are scanned")
+
+
+def test_select_after_update_uses_index():
+    schema = Schema()
+    for i in range(1, 21):
+        schema.insert(BookSchema(id=schema.next_id(), title=f"Book {i}", author=f"Author {i % 5}", year=2000, status=True))
+
+    schema.update(BookSchema(id=6, title="Book 6", author="Author 1", year=2000, status=False))
+    schema.books = _NoScanBooks(schema.books)
+
+    # Postings of author give books in storage order without full scan
+    assert [book.id for book in schema.select(dto.BookFilter(author="author 1"))] == [1, 6, 11, 16]
+    assert not next(book for book in schema.select(dto.BookFilter(author="author 1")) if book.id == 6).status
@@ -0,0 +1,246 @@
+import multiprocessing
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import FileJsonProvider, JsonStorage, ShardedJsonStorage
+from src.infrastructure.db.json.schema import _SchemaJson, _BookJson
+from src.infrastructure.db.json.sharded import PARTITION_HASH, PARTITION_ID
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "books.json"
+    FileJsonProvider(path).write_json(_SchemaJson(
+        last_id=10,
+        books=[
+            _BookJson(
+                id=i,
+                title=f"book-{i}",
+                author="foo" if i % 2 == 0 else "bar" if i % 3 == 0 else "baz",
+                year=0,
+                status=True,
+            )
+
+            for i in range(1, 11)
+        ]
+    ))
+    return path
+
+
+@pytest.fixture(params=[PARTITION_ID, PARTITION_HASH])
+def storage(request, path):
+    storage = ShardedJsonStorage(path, partition=request.param, shards=3, shard_size=4)
+    yield storage
+    storage.close()
+
+
+def _manifest_path(path):
+    return path.with_name(path.name + ".manifest")
+
+
+def test_split(storage, path):
+    assert storage.get_book_count(dto.BookFilter()) == 10
+    manifest = FileJsonProvider(_manifest_path(path)).read_json()
+    assert manifest["last_id"] == 10
+    assert sum(shard["count"] for shard in manifest["shards"]) == 10
+    assert len(manifest["shards"]) == 3
+
+
+def test_split_keeps_library(storage, path):
+    storage.delete_book(1)
+    storage.close()
+
+    # Library is still readable without shards
+    plain = JsonStorage(FileJsonProvider(path))
+    assert plain.get_book_count(dto.BookFilter()) == 10
+    plain.save_book(dto.NewBook(title="New", author="foo", year=1, status=BookStatus.AVAILABLE))
+
+    reopened = ShardedJsonStorage(path)
+    assert reopened.get_book_count(dto.BookFilter()) == 9
+    reopened.close()
+
+
+def test_search(storage):
+    f = dto.BookFilter(author="foo")
+    books = storage.find_books(filters=f, pagination=Pagination(offset=2, limit=10))
+
+    assert [book.id for book in books] == [6, 8, 10]
+    assert storage.get_book_count(f) == 5
+    assert [book.id for book in storage.find_books(dto.BookFilter(), Pagination())] == list(range(1, 11))
+
+
+def test_id_partition_loads_shards_on_demand(path):
+    storage = ShardedJsonStorage(path, partition=PARTITION_ID, shard_size=4)
+    reopened = ShardedJsonStorage(path)
+
+    assert reopened.get_book_by_id(5).title == "book-5"
+    assert list(reopened._loaded) == [1]
+
+    reopened.find_books(dto.BookFilter(), Pagination(limit=2))
+    assert list(reopened._loaded) == [1, 0]
+    storage.close()
+    reopened.close()
+
+
+def test_status_update_loads_one_shard(path):
+    ShardedJsonStorage(path, partition=PARTITION_ID, shard_size=2).close()
+    storage = ShardedJsonStorage(path)
+
+    book = storage.get_book_by_id(5)
+    book.take_from_library()
+    storage.update_book(book)
+    assert list(storage._loaded) == [2]
+    storage.close()
+
+    reopened = ShardedJsonStorage(path)
+    assert reopened.get_book_by_id(5).status is BookStatus.TAKEN
+    reopened.close()
+
+
+def test_mutations(storage, path):
+    book_id = storage.save_book(dto.NewBook(title="New", author="foo", year=1, status=BookStatus.AVAILABLE))
+    assert book_id == 11
+
+    with pytest.raises(BookAlreadyExists):
+        storage.save_book(dto.NewBook(title="NEW", author="FOO", year=1, status=BookStatus.AVAILABLE))
+
+    book = storage.get_book_by_id(3)
+    book.title = "Renamed"
+    book.take_from_library()
+    storage.update_book(book)
+
+    book.title = "book-4"
+    book.author = "foo"
+    with pytest.raises(BookAlreadyExists):
+        storage.update_book(book)
+
+    storage.delete_book(1)
+    with pytest.raises(BookNotFound):
+        storage.delete_book(1)
+
+    storage.close()
+
+    reopened = ShardedJsonStorage(path)
+    assert reopened.get_book_by_id(11).title == "New"
+    assert reopened.get_book_by_id(3).status is BookStatus.TAKEN
+    assert reopened.get_book_by_id(3).title == "Renamed"
+    with pytest.raises(BookNotFound):
+        reopened.get_book_by_id(1)
+
+    assert reopened.get_book_count(dto.BookFilter()) == 10
+    assert reopened.acquire_new_id() == 13
+    reopened.close()
+
+
+class _WriteCounter:
+    def __init__(self, monkeypatch):
+        self.paths = []
+        write_json = FileJsonProvider.write_json
+
+        def counted(provider, data):
+            self.paths.append(provider._path.name)
+            write_json(provider, data)
+
+        monkeypatch.setattr(FileJsonProvider, "write_json", counted)
+
+
+def test_save_books_writes_once(storage, path, monkeypatch):
+    writes = _WriteCounter(monkeypatch)
+    results = storage.save_books([
+        dto.NewBook(title=f"new-{i}", author="foo", year=1, status=BookStatus.AVAILABLE)
+        for i in range(6)
+    ] + [dto.NewBook(title="book-2", author="foo", year=0, status=BookStatus.AVAILABLE)])
+
+    assert results[:6] == list(range(11, 17))
+    assert isinstance(results[6], BookAlreadyExists) and results[6].book_id == 2
+    # Every touched shard and manifest are written once
+    assert len(writes.paths) == len(set(writes.paths))
+    assert writes.paths[-1] == _manifest_path(path).name
+    storage.close()
+
+    reopened = ShardedJsonStorage(path)
+    assert reopened.get_book_count(dto.BookFilter(title="new-")) == 6
+    assert reopened.get_book_by_id(16).title == "new-5"
+    assert reopened.acquire_new_id() == 17
+    reopened.close()
+
+
+def test_batch_writes_once(storage, path, monkeypatch):
+    writes = _WriteCounter(monkeypatch)
+    books = storage.get_books(list(range(1, 9)))
+    for book in books:
+        book.take_from_library()
+
+    storage.update_books(books)
+    # Status changes don't move books, so manifest isn't written
+    assert len(writes.paths) == len(set(writes.paths))
+    assert _manifest_path(path).name not in writes.paths
+
+    writes.paths.clear()
+    assert storage.delete_books([2, 5, 9, 42]) == [2, 5, 9]
+    assert len(writes.paths) == len(set(writes.paths))
+    assert writes.paths[-1] == _manifest_path(path).name
+    storage.close()
+
+    reopened = ShardedJsonStorage(path)
+    assert reopened.get_book_count(dto.BookFilter()) == 7
+    assert [book.status for book in reopened.get_books([1, 3, 10])] == [
+        BookStatus.TAKEN, BookStatus.TAKEN, BookStatus.AVAILABLE,
+    ]
+    with pytest.raises(BookNotFound):
+        reopened.get_book_by_id(5)
+
+    reopened.close()
+
+
+def test_two_instances(storage, path):
+    other = ShardedJsonStorage(path)
+    first_id = storage.save_book(dto.NewBook(title="first", author="foo", year=1, status=BookStatus.AVAILABLE))
+    second_id = other.save_book(dto.NewBook(title="second", author="foo", year=1, status=BookStatus.AVAILABLE))
+    assert first_id != second_id
+
+    # Both writes are persisted and visible to other instance
+    assert storage.get_book_by_id(second_id).title == "second"
+    assert storage.get_book_count(dto.BookFilter()) == 12
+    with pytest.raises(BookAlreadyExists):
+        storage.save_book(dto.NewBook(title="second", author="foo", year=1, status=BookStatus.AVAILABLE))
+
+    other.delete_book(first_id)
+    with pytest.raises(BookNotFound):
+        storage.get_book_by_id(first_id)
+
+    other.close()
+
+
+def _add_books(path: str, start: int, count: int):
+    storage = ShardedJsonStorage(path)
+    for i in range(start, start + count):
+        storage.save_book(dto.NewBook(title=f"new-{i}", author="foo", year=1, status=BookStatus.AVAILABLE))
+
+    storage.close()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fork start method isn't available",
+)
+def test_concurrent_processes(storage, path):
+    ctx = multiprocessing.get_context("fork")
+    processes = [
+        ctx.Process(target=_add_books, args=(str(path), i * 100, 20))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    assert storage.get_book_count(dto.BookFilter()) == 90
+    assert storage.get_book_count(dto.BookFilter(title="new-")) == 80
+    assert storage.acquire_new_id() == 91
@@ -1,7 +1,9 @@
 import pytest
 
-from src.application.book.dto import BookFilter
+from src.application.book.dto import BookFilter, NewBook
+from src.application.book.exceptions import BookAlreadyExists
 from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
 from src.infrastructure.db.json import JsonStorage
 from src.infrastructure.db.json.schema import _SchemaJson, _BookJson
 from tests.mocks.json_io_provider import MockIOProvider
@@ -40,3 +42,79 @@ def test_storage_search(storage):
     assert storage.get_book_count(f) == 5
 
     assert len(storage.find_books(BookFilter(), Pagination())) == 10
+
+
+def test_storage_find_books_page(storage):
+    f = BookFilter(author="foo")
+    page = storage.find_books_page(f, Pagination(offset=1, limit=2))
+    assert [book.id for book in page.items] == [4, 6]
+    assert page.total == 5
+    assert page.has_more
+
+    page = storage.find_books_page(BookFilter(author="FOO"), Pagination(offset=1, limit=2), count_total=False)
+    assert [book.id for book in page.items] == [4, 6]
+    assert page.total is None
+    assert page.has_more
+
+    # Ids of search are cached with total
+    page = storage.find_books_page(f, Pagination(offset=3, limit=2), count_total=False)
+    assert [book.id for book in page.items] == [8, 10]
+    assert page.total == 5
+    assert not page.has_more
+
+    page = storage.find_books_page(BookFilter(), Pagination(offset=8, limit=5))
+    assert [book.id for book in page.items] == [9, 10]
+    assert page.total == 10
+    assert not page.has_more
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("filters", [
+    BookFilter(),
+    BookFilter(author="ba"),
+    BookFilter(title="book-1"),
+])
+def test_storage_keyset_pages(schema_json, columnar, filters):
+    storage = JsonStorage(MockIOProvider(schema_json), columnar=columnar)
+    expected = [book.id for book in storage.find_books(filters, Pagination())]
+
+    pages = []
+    pagination = Pagination(limit=2)
+    while True:
+        page = storage.find_books_page(filters, pagination)
+        assert page.total == len(expected)
+        pages.append([book.id for book in page.items])
+        if not page.has_more:
+            break
+
+        pagination = Pagination(limit=2, after_id=page.items[-1].id)
+
+    assert sum(pages, []) == expected
+
+    # Back from the last page
+    for i in range(len(pages) - 1, 0, -1):
+        page = storage.find_books_page(filters, Pagination(limit=2, before_id=pages[i][0]), count_total=False)
+        assert [book.id for book in page.items] == pages[i - 1]
+        assert page.has_more == (i > 1)
+
+
+def test_storage_save_books(schema_json):
+    writes = []
+
+    class Provider(MockIOProvider):
+        def write_json(self, data):
+            writes.append(data)
+            super().write_json(data)
+
+    storage = JsonStorage(Provider(schema_json))
+    results = storage.save_books([
+        NewBook(title="new-1", author="foo", year=1, status=BookStatus.AVAILABLE),
+        NewBook(title="BOOK-2", author="Foo", year=0, status=BookStatus.AVAILABLE),
+        NewBook(title="new-2", author="foo", year=1, status=BookStatus.TAKEN),
+    ])
+
+    assert results[0] == 11 and results[2] == 12
+    assert isinstance(results[1], BookAlreadyExists) and results[1].book_id == 2
+    assert len(writes) == 1
+    assert writes[0]["last_id"] == 12
+    assert storage.get_book_by_id(12).status is BookStatus.TAKEN
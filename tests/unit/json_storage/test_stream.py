@@ -0,0 +1,101 @@
+import io
+import json
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookNotFound
+from src.application.common.exceptions import MappingError, ReadOnlyRepoError
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import JsonStorage, JsonStreamStorage
+from src.infrastructure.db.json.schema import _SchemaJson, _BookJson
+from src.infrastructure.db.json.stream import iter_schema_json
+from tests.mocks.json_io_provider import MockIOProvider, MockJournal, MockStreamProvider
+
+
+@pytest.fixture
+def schema_json():
+    return _SchemaJson(
+        last_id=10,
+        books=[
+            _BookJson(
+                id=i,
+                title=f"book-{i} \"quoted\" {{}} [],",
+                author="foo" if i % 2 == 0 else "bar" if i % 3 == 0 else "Баз",
+                year=1990 + i,
+                status=i % 4 != 0,
+            )
+
+            for i in range(1, 11)
+        ]
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 4096])
+def test_iter_schema_json(schema_json, chunk_size):
+    text = json.dumps(schema_json, ensure_ascii=False)
+    items = list(iter_schema_json(io.StringIO(text), chunk_size))
+
+    assert items[0] == ("last_id", 10)
+    assert [value for key, value in items if key == "book"] == schema_json["books"]
+
+
+@pytest.mark.parametrize("text", ["", "null", '{}', '{"last_id": 0, "books": []}'])
+def test_iter_schema_json_empty(text):
+    assert [key for key, _ in iter_schema_json(io.StringIO(text))] in ([], ["last_id"])
+
+
+@pytest.mark.parametrize("text", ["[]", '{"books": [1 2]}', '{"last_id": 1'])
+def test_iter_schema_json_invalid(text):
+    with pytest.raises(MappingError):
+        list(iter_schema_json(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("filters", [
+    dto.BookFilter(),
+    dto.BookFilter(author="foo"),
+    dto.BookFilter(title="BOOK-1"),
+    dto.BookFilter(author="баз", year=1991),
+])
+@pytest.mark.parametrize("pagination", [Pagination(), Pagination(offset=1, limit=2)])
+def test_stream_storage_same_as_storage(schema_json, filters, pagination):
+    storage = JsonStorage(MockIOProvider(schema_json))
+    stream = JsonStreamStorage(MockStreamProvider(schema_json), chunk_size=16)
+
+    assert stream.find_books(filters, pagination) == storage.find_books(filters, pagination)
+    assert stream.get_book_count(filters) == storage.get_book_count(filters)
+
+
+def test_stream_storage_journal(schema_json):
+    journal = MockJournal()
+    storage = JsonStorage(MockIOProvider(schema_json), journal=journal)
+    storage.delete_book(2)
+    storage.save_book(dto.NewBook(title="New", author="foo", year=1, status=BookStatus.AVAILABLE))
+    book = storage.get_book_by_id(4)
+    book.return_to_library()
+    storage.update_book(book)
+
+    stream = JsonStreamStorage(MockStreamProvider(schema_json), journal=journal)
+    filters = dto.BookFilter(author="foo")
+    assert stream.find_books(filters, Pagination()) == storage.find_books(filters, Pagination())
+
+    # Emulate crash between snapshot write and journal truncate
+    provider = MockIOProvider(schema_json)
+    records = list(journal.records)
+    JsonStorage(provider, journal=journal).compact()
+    assert list(provider.data) == ["last_id", "journal_seq", "books"]
+
+    stream = JsonStreamStorage(MockStreamProvider(provider.data), journal=MockJournal(records))
+    assert stream.find_books(dto.BookFilter(), Pagination()) == storage.find_books(dto.BookFilter(), Pagination())
+
+
+def test_stream_storage_read_only(schema_json):
+    stream = JsonStreamStorage(MockStreamProvider(schema_json))
+
+    assert stream.get_book_by_id(3).author == "bar"
+    with pytest.raises(BookNotFound):
+        stream.get_book_by_id(11)
+
+    with pytest.raises(ReadOnlyRepoError):
+        stream.delete_book(1)
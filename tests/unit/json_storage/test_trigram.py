@@ -0,0 +1,83 @@
+import random
+import threading
+
+from src.application.book import dto
+from src.infrastructure.db.json.filter import FilterFactory
+from src.infrastructure.db.json.schema import TITLE_INDEX_AFTER_SEARCHES, BookSchema, Schema
+from src.infrastructure.db.json import trigram
+from src.infrastructure.db.json.trigram import TrigramIndex
+
+
+def test_candidates():
+    index = TrigramIndex.build([(1, "война и мир"), (2, "мир"), (3, "миракль")])
+
+    assert index.candidates("мир") == [1, 2, 3]
+    assert index.candidates("ракл") == [3]
+    assert index.candidates("мирный") == []
+    assert index.candidates("ми") is None
+
+    index.remove(3, "миракль")
+    assert index.candidates("мир") == [1, 2]
+
+
+def test_same_results_as_scan():
+    rnd = random.Random(3)
+    words = ["Война", "мир", "Мирный", "АННА", "каренина", "The", "Road", "ёж"]
+    schema = Schema()
+    for _ in range(500):
+        schema.insert(BookSchema(
+            id=schema.next_id(),
+            title=" ".join(rnd.choices(words, k=3)) + f" {schema.last_id}",
+            author=rnd.choice(words),
+            year=1,
+            status=True,
+        ))
+
+    # Index is built on repeated search and kept current after it
+    for _ in range(TITLE_INDEX_AFTER_SEARCHES):
+        list(schema.select(dto.BookFilter(title="мир")))
+    schema._title_build.join()
+    schema.update(BookSchema(id=1, title="Абсолютно новая книга", author="x", year=1, status=True))
+    schema.delete(2)
+
+    needles = ["мир", "МИРН", "a", "ёж ", "road", "война мир", "новая", "ab", "ы", "1", "xyz"]
+    for needle in needles:
+        for filters in (dto.BookFilter(title=needle), dto.BookFilter(title=needle, author="мир"),
+                        dto.BookFilter(author=needle)):
+            expected = list(filter(FilterFactory.from_dto(filters), schema.books.values()))
+            assert list(schema.select(filters)) == expected, filters
+            assert schema.count(filters) == len(expected)
+
+
+def test_changes_during_build(monkeypatch):
+    schema = Schema(books={
+        i: BookSchema(id=i, title=f"Война {i}", author="a", year=1, status=True) for i in range(1, 101)
+    })
+    started, release = threading.Event(), threading.Event()
+    build = TrigramIndex.build.__func__
+
+    def slow_build(cls, items):
+        started.set()
+        release.wait()
+        return build(cls, items)
+
+    monkeypatch.setattr(trigram.TrigramIndex, "build", classmethod(slow_build))
+
+    filters = dto.BookFilter(title="война 1")
+    for _ in range(TITLE_INDEX_AFTER_SEARCHES):
+        assert schema.count(filters) == 12
+    started.wait()
+
+    # Writers and searches don't wait for index
+    schema.insert(BookSchema(id=101, title="Война 1 новая", author="a", year=1, status=True))
+    schema.update(BookSchema(id=10, title="Мир", author="a", year=1, status=True))
+    schema.delete(11)
+    assert schema.count(filters) == 11
+    assert schema.plan(filters).access is None
+
+    release.set()
+    schema._title_build.join()
+    assert schema.plan(filters).access == "title"
+    expected = list(filter(FilterFactory.from_dto(filters), schema.books.values()))
+    assert list(schema.select(filters)) == expected
+    assert len(expected) == 11
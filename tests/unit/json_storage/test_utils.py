@@ -1,11 +1,67 @@
-from src.application.common.pagination import Pagination
-from src.infrastructure.db.json.utils import paginate_items
+from dataclasses import dataclass
 
+import pytest
 
-def test_paginate_items():
+from src.application.common.exceptions import InvalidCursorError
+from src.application.common.pagination import Page, Pagination, PaginationResult, encode_cursor
+from src.infrastructure.db.json.utils import paginate_page
+
+
+@dataclass
+class Book:
+    id: int
+
+
+def _book_id(book: Book) -> int:
+    return book.id
+
+
+def test_paginate_page():
     source_items = range(1, 11)
-    n = len(source_items)
 
-    filtered_items = filter(lambda x: x % 2 == 0, source_items)
+    def page(pagination, **kwargs):
+        return paginate_page(pagination, filter(lambda x: x % 2 == 0, source_items), str, **kwargs)
+
+    assert page(Pagination(offset=1, limit=2)) == Page(items=["4", "6"], total=5, has_more=True)
+    assert page(Pagination(offset=1, limit=2), count_total=False) == Page(items=["4", "6"], total=None, has_more=True)
+    assert page(Pagination(offset=3, limit=2), count_total=False) == Page(items=["8", "10"], total=5, has_more=False)
+    assert page(Pagination(offset=1, limit=2), total=100) == Page(items=["4", "6"], total=100, has_more=True)
+    assert page(Pagination()) == Page(items=["2", "4", "6", "8", "10"], total=5, has_more=False)
+    assert page(Pagination(offset=10, limit=2)) == Page(items=[], total=5, has_more=False)
+
+
+def test_pagination_result_has_more():
+    result = PaginationResult.from_pagination(Pagination(offset=0, limit=2), None, has_more=True)
+    assert result.next_page
+    assert not result.prev_page
+
+    result = PaginationResult.from_pagination(Pagination(offset=2, limit=2), None, has_more=False)
+    assert not result.next_page
+    assert result.prev_page
+
+
+def test_paginate_page_keyset():
+    source_items = [Book(i) for i in range(1, 11)]
+
+    def page(pagination, **kwargs):
+        return paginate_page(pagination, filter(lambda x: x.id % 2 == 0, source_items), _book_id, **kwargs)
+
+    assert page(Pagination(limit=2, after_id=4)) == Page(items=[6, 8], total=5, has_more=True)
+    assert page(Pagination(limit=2, after_id=5), count_total=False) == Page(items=[6, 8], total=None, has_more=True)
+    assert page(Pagination(limit=2, after_id=6)) == Page(items=[8, 10], total=5, has_more=False)
+    assert page(Pagination(limit=2, before_id=8)) == Page(items=[4, 6], total=5, has_more=True)
+    assert page(Pagination(limit=2, before_id=6)) == Page(items=[2, 4], total=5, has_more=False)
+    assert page(Pagination(after_id=10)) == Page(items=[], total=5, has_more=False)
+
+
+def test_cursor():
+    for book_id, backward in ((1, False), (12345, True)):
+        cursor = encode_cursor(book_id, backward=backward)
+        pagination = Pagination.from_cursor(cursor, limit=5)
+        assert pagination.limit == 5
+        assert pagination.is_keyset
+        assert (pagination.before_id if backward else pagination.after_id) == book_id
 
-    assert paginate_items(Pagination(offset=2, limit=5), n, filtered_items) == [6, 8, 10]
+    for cursor in ("", "!!!", encode_cursor(1)[1:], "eDE"):
+        with pytest.raises(InvalidCursorError):
+            Pagination.from_cursor(cursor)
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from src.application.book import dto
+from src.infrastructure.db.json import columnar, schema, vectorized
+from src.infrastructure.db.json.columnar import ColumnarSchema
+from src.infrastructure.db.json.filter import FilterFactory
+from src.infrastructure.db.json.schema import BookSchema, Schema
+
+pytest.importorskip("numpy")
+
+FILTERS = [
+    dto.BookFilter(year=2001),
+    dto.BookFilter(author="a"),
+    dto.BookFilter(author="b", year_from=2001),
+    dto.BookFilter(author="author", year=2000, title="1"),
+    dto.BookFilter(year_from=2000, year_to=2001, title="2"),
+    dto.BookFilter(year=2002, year_to=2001),
+]
+
+
+def _random_book(rnd: random.Random, book_id: int) -> BookSchema:
+    return BookSchema(
+        id=book_id,
+        title=f"Title {book_id}",
+        author=rnd.choice(["Author A", "author b", "Автор"]),
+        year=rnd.choice([2000, 2001, 2002]),
+        status=True,
+    )
+
+
+@pytest.fixture
+def small_threshold(monkeypatch):
+    monkeypatch.setattr(schema, "VECTORIZED_MIN_BOOKS", 10)
+    monkeypatch.setattr(columnar, "VECTORIZED_MIN_BOOKS", 10)
+
+
+def test_vector_index():
+    index = vectorized.VectorIndex.build([(3, 2000, 0), (1, 2001, 1), (2, 2000, 1)], size_hint=2)
+    assert index.ids((2000, 2000), None) == [2, 3]
+
+    for book_id in range(4, 2000):
+        index.add(book_id, 2002, 2)
+
+    index.remove(2)
+    index.add(3, 2001, 1)
+    index.add(0, 2001, 1)
+    assert index.ids((2001, None), [1]) == [0, 1, 3]
+    assert index.count(None, [2]) == 1996
+    assert len(index) == 1999
+
+
+def test_schema_same_as_filter_factory(small_threshold):
+    rnd = random.Random(3)
+    vector_schema = Schema()
+    for i in range(1, 300):
+        vector_schema.insert(_random_book(rnd, i))
+
+    for _ in range(2):
+        plan = vector_schema.plan(dto.BookFilter(author="b", year=2000))
+
+    assert plan.access == "vectorized"
+
+    # Index is maintained by mutations
+    for i in range(300, 400):
+        vector_schema.insert(_random_book(rnd, i))
+
+    for book_id in range(1, 150, 3):
+        vector_schema.delete(book_id)
+
+    vector_schema.update(_random_book(rnd, 2))
+
+    for f in FILTERS:
+        expected = list(filter(FilterFactory.from_dto(f), vector_schema.books.values()))
+        assert list(vector_schema.select(f)) == expected
+        assert vector_schema.count(f) == len(expected)
+
+
+def test_schema_without_numpy(small_threshold, monkeypatch):
+    monkeypatch.setattr(vectorized, "numpy", None)
+    rnd = random.Random(3)
+    plain_schema = Schema(books={i: _random_book(rnd, i) for i in range(1, 300)})
+    for _ in range(2):
+        plan = plain_schema.plan(dto.BookFilter(author="b", year=2000))
+
+    # Every index alone isn't selective, so books are scanned
+    assert plan.access is None
+    assert plain_schema._vector is None
+
+
+def test_columnar_year_scan(small_threshold):
+    rnd = random.Random(5)
+    schema_ = ColumnarSchema()
+    books = []
+    for i in range(1, 200):
+        book = _random_book(rnd, i)
+        schema_.insert(book)
+        books.append(book)
+
+    for f in FILTERS:
+        expected = [book.id for book in books if FilterFactory.from_dto(f)(book)]
+        assert [book.id for book in schema_.select(f)] == expected
@@ -0,0 +1,61 @@
+import random
+
+from src.application.book import dto
+from src.infrastructure.db.json.filter import FilterFactory
+from src.infrastructure.db.json.schema import BookSchema, Schema
+from src.infrastructure.db.json.years import YearIndex
+
+
+def test_year_index():
+    index = YearIndex.build([(2001, 3), (2000, 2), (2001, 1), (1999, 4)])
+
+    assert index.ids(2001, 2001) == [1, 3]
+    assert index.ids(2000, None) == [1, 2, 3]
+    assert index.ids(None, 2000) == [2, 4]
+    assert index.count(2002, 2000) == 0
+
+    index.add(2000, 5)
+    index.remove(2001, 1)
+    assert index.ids(2000, 2001) == [2, 3, 5]
+
+
+def test_same_results_as_scan():
+    rnd = random.Random(5)
+    schema = Schema()
+    for _ in range(300):
+        schema.insert(BookSchema(
+            id=schema.next_id(),
+            title=f"book {schema.last_id}",
+            author=rnd.choice(["foo", "bar"]),
+            year=rnd.randrange(1990, 2010),
+            status=True,
+        ))
+
+    # Index is built on first search and kept current after it
+    schema.count(dto.BookFilter(year=2000))
+    schema.update(BookSchema(id=1, title="new", author="foo", year=1800, status=True))
+    schema.delete(2)
+
+    for filters in (
+        dto.BookFilter(year=2000),
+        dto.BookFilter(year_from=2005),
+        dto.BookFilter(year_to=1995),
+        dto.BookFilter(year_from=1995, year_to=2000, author="fo"),
+        dto.BookFilter(year=2003, year_from=2000, title="1"),
+        dto.BookFilter(year=1800),
+        dto.BookFilter(year_from=2005, year_to=2000),
+    ):
+        expected = list(filter(FilterFactory.from_dto(filters), schema.books.values()))
+        assert list(schema.select(filters)) == expected, filters
+        assert schema.count(filters) == len(expected)
+
+
+def test_count_of_not_restricting_filters():
+    schema = Schema()
+    for year in (1999, 2000, 2001):
+        schema.insert(BookSchema(id=schema.next_id(), title=f"book {year}", author="foo", year=year, status=True))
+
+    # Empty strings and year 0 aren't None, but don't filter
+    for filters in (dto.BookFilter(title=""), dto.BookFilter(year=0), dto.BookFilter(author="")):
+        assert schema.count(filters) == 3, filters
+        assert len(list(schema.select(filters))) == 3, filters
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+from src.application.book import dto
+from src.application.book.service import AsyncService
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.async_storage import AsyncStorage
+from src.infrastructure.db.json import JsonStorage
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+class BlockingProvider(MockIOProvider):
+    """
+    Write of snapshot waits until it is released by test.
+    """
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write_json(self, data):
+        self.writing.set()
+        self.release.wait(5)
+        super().write_json(data)
+
+
+def test_concurrent_coroutines():
+    async def run():
+        repo = AsyncStorage(JsonStorage(MockIOProvider(None)))
+        service = AsyncService(repo)
+
+        async def add(i: int):
+            book = await service.create_book(dto.CreateBook(title=f"Book {i}", author=f"Author {i % 7}", year=2000 + i % 5))
+            return book.id
+
+        async def search(i: int):
+            books = await service.find_books(dto.BookFilter(author=f"author {i % 7}"), Pagination(limit=5))
+            # Every page is consistent, though books are added meanwhile
+            assert books.pagination.total >= len(books.data)
+            assert all(book.author == f"Author {i % 7}" for book in books.data)
+
+        results = await asyncio.gather(*(add(i) for i in range(200)), *(search(i) for i in range(200)))
+        ids = results[:200]
+        assert sorted(ids) == list(range(1, 201))
+        assert await repo.get_book_count(dto.BookFilter()) == 200
+
+        result = await service.update_statuses(dto.BookFilter(author="author 3"), BookStatus.TAKEN)
+        assert len(result.done) == len(range(3, 200, 7))
+        assert [book.id async for book in service.export_books(dto.BookFilter(author="author 3"))] == result.done
+
+        repo.close()
+
+    asyncio.run(run())
+
+
+def test_search_not_blocked_by_write():
+    provider = BlockingProvider({
+        "last_id": 1,
+        "books": [{"id": 1, "title": "Book", "author": "Author", "year": 2000, "status": True}],
+    })
+
+    async def run():
+        repo = AsyncStorage(JsonStorage(provider))
+        service = AsyncService(repo)
+
+        write = asyncio.create_task(service.create_book(dto.CreateBook(title="New", author="Author", year=2001)))
+        assert await asyncio.to_thread(provider.writing.wait, 5)
+
+        # Snapshot is being written, search sees the new book in memory
+        books = await asyncio.wait_for(service.find_books(dto.BookFilter(), Pagination()), 1)
+        assert [book.id for book in books.data] == [1, 2]
+
+        provider.release.set()
+        assert (await write).id == 2
+        repo.close()
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookNotFound, UnrestrictedFilter
+from src.application.book.service import Service
+from src.domain.book.exceptions import BookAlreadyInLibrary, BookAlreadyTaken
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.json import JsonStorage
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+class CountingProvider(MockIOProvider):
+    def __init__(self, data):
+        super().__init__(data)
+        self.writes = 0
+
+    def write_json(self, data):
+        self.writes += 1
+        super().write_json(data)
+
+
+@pytest.fixture
+def provider():
+    return CountingProvider({
+        "last_id": 6,
+        "books": [
+            {"id": i, "title": f"book-{i}", "author": "foo" if i % 2 else "bar", "year": 2000, "status": i != 3}
+            for i in range(1, 7)
+        ],
+    })
+
+
+def test_update_statuses_by_ids(provider):
+    storage = JsonStorage(provider)
+    result = Service(storage).update_statuses([1, 3, 1, 10, 2], BookStatus.TAKEN)
+
+    assert result.done == [1, 2]
+    assert isinstance(result.failed[3], BookAlreadyTaken)
+    assert isinstance(result.failed[10], BookNotFound)
+    assert provider.writes == 1
+    assert storage.get_book_by_id(2).status is BookStatus.TAKEN
+
+
+def test_update_statuses_by_filter(provider):
+    storage = JsonStorage(provider)
+    result = Service(storage).update_statuses(dto.BookFilter(author="foo"), BookStatus.AVAILABLE)
+
+    assert result.done == [3]
+    assert sorted(result.failed) == [1, 5]
+    assert isinstance(result.failed[1], BookAlreadyInLibrary)
+    assert provider.writes == 1
+
+
+def test_delete_books(provider):
+    storage = JsonStorage(provider)
+    service = Service(storage)
+
+    result = service.delete_books([2, 7, 4])
+    assert result.done == [2, 4]
+    assert list(result.failed) == [7]
+
+    result = service.delete_books(dto.BookFilter(author="bar"))
+    assert result.done == [6] and not result.failed
+    assert provider.writes == 2
+    assert storage.get_book_count(dto.BookFilter()) == 3
+
+
+@pytest.mark.parametrize("filters", [
+    dto.BookFilter(),
+    dto.BookFilter(title=""),
+    dto.BookFilter(author="  "),
+    dto.BookFilter(year=0),
+    dto.BookFilter(title="", author="", year=0),
+])
+def test_batch_rejects_unrestricted_filters(provider, filters):
+    storage = JsonStorage(provider)
+    service = Service(storage)
+
+    with pytest.raises(UnrestrictedFilter):
+        service.delete_books(filters)
+
+    with pytest.raises(UnrestrictedFilter):
+        service.update_statuses(filters, BookStatus.TAKEN)
+
+    assert provider.writes == 0
+    assert storage.get_book_count(dto.BookFilter()) == 6
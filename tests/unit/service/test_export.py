@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from src.application.book import dto
+from src.application.book.interfaces import repository
+from src.application.book.service import Service
+from src.infrastructure.db.json import JsonStorage, JsonStreamStorage
+from src.infrastructure.db.json import storage as json_storage
+from src.infrastructure.transfer import FORMAT_CSV, FORMAT_JSONL, read_books, write_books
+from tests.mocks.json_io_provider import MockIOProvider, MockStreamProvider
+
+
+@pytest.fixture
+def schema_json():
+    return {
+        "last_id": 5,
+        "books": [
+            {"id": i, "title": f"Книга, \"{i}\"", "author": "foo" if i % 2 else "bar", "year": 2000 + i, "status": i != 3}
+            for i in range(1, 6)
+        ],
+    }
+
+
+@pytest.mark.parametrize("fmt", [FORMAT_CSV, FORMAT_JSONL])
+def test_export_import_round_trip(schema_json, fmt):
+    service = Service(JsonStorage(MockIOProvider(schema_json)))
+    out = io.StringIO(newline="")
+    assert write_books(out, service.export_books(dto.BookFilter(author="foo")), fmt) == 3
+
+    target = Service(JsonStorage(MockIOProvider(None)))
+    report = target.import_books(read_books(io.StringIO(out.getvalue(), newline=""), fmt))
+    assert report.inserted == 3 and not report.invalid_lines
+    assert [book.title for book in target.export_books(dto.BookFilter())] == ['Книга, "1"', 'Книга, "3"', 'Книга, "5"']
+
+
+def test_export_storages_same(schema_json, monkeypatch):
+    monkeypatch.setattr(repository, "ITER_BATCH_SIZE", 2)
+    filters = dto.BookFilter(year_from=2002)
+    storage = JsonStorage(MockIOProvider(schema_json))
+    expected = storage.find_books(filters, repository.Pagination())
+
+    assert list(JsonStreamStorage(MockStreamProvider(schema_json)).iter_books(filters)) == expected
+    # Default implementation reads keyset pages
+    assert list(repository.BookRepository.iter_books(storage, filters)) == expected
+
+
+def test_export_skips_deleted(schema_json, monkeypatch):
+    monkeypatch.setattr(json_storage, "ITER_BATCH_SIZE", 2)
+    storage = JsonStorage(MockIOProvider(schema_json))
+    books = storage.iter_books(dto.BookFilter())
+    assert next(books).id == 1
+
+    storage.delete_book(4)
+    assert [book.id for book in books] == [2, 3, 5]
@@ -0,0 +1,46 @@
+import io
+
+from src.application.book.service import Service
+from src.infrastructure.db.json import JsonStorage
+from src.infrastructure.transfer import FORMAT_CSV, FORMAT_JSONL, read_books
+from tests.mocks.json_io_provider import MockIOProvider
+
+
+def test_import_csv():
+    storage = JsonStorage(MockIOProvider(None))
+    service = Service(storage)
+    text = (
+        "title,author,year\n"
+        "Book, Author ,2000\n"
+        '"Multi\nline",Author,2001\n'
+        "book,AUTHOR,2000\n"
+        "No year,Author,\n"
+        " ,Author,2000\n"
+    )
+
+    report = service.import_books(read_books(io.StringIO(text), FORMAT_CSV))
+    assert report.inserted == 2
+    assert report.duplicate_lines == [5]
+    assert report.invalid_lines == [6, 7]
+    assert storage.get_book_by_id(1).author == "Author"
+
+
+def test_import_jsonl_duplicates_of_storage():
+    storage = JsonStorage(MockIOProvider(None))
+    service = Service(storage)
+    first = service.import_books(read_books(io.StringIO('{"title": "A", "author": "B", "year": 1}\n'), FORMAT_JSONL))
+    assert first.inserted == 1
+
+    text = (
+        '{"title": "C", "author": "D", "year": "2"}\n'
+        "\n"
+        "[1, 2]\n"
+        '{"title": "a", "author": "b", "year": 1}\n'
+        '{"title": "E", "author": "F", "year": true}\n'
+        "{broken\n"
+    )
+    report = service.import_books(read_books(io.StringIO(text), FORMAT_JSONL))
+    assert report.inserted == 1
+    assert report.duplicate_lines == [4]
+    assert report.invalid_lines == [3, 5, 6]
+    assert storage.get_book_by_id(2).year == 2
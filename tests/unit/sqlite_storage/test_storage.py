@@ -0,0 +1,149 @@
+import pytest
+
+from src.application.book import dto
+from src.application.book.exceptions import BookAlreadyExists, BookNotFound
+from src.application.common.pagination import Pagination
+from src.domain.book.vo import BookStatus
+from src.infrastructure.db.sqlite import SqliteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SqliteStorage(tmp_path / "books.sqlite3")
+    for i in range(1, 11):
+        storage.save_book(dto.NewBook(
+            title=f"book-{i}",
+            author="foo" if i % 2 == 0 else "bar" if i % 3 == 0 else "baz",
+            year=2000 + i % 3,
+            status=BookStatus.AVAILABLE,
+        ))
+
+    yield storage
+    storage.close()
+
+
+def test_storage_search(storage):
+    f = dto.BookFilter(author="FOO")
+    books = storage.find_books(filters=f, pagination=Pagination(offset=2, limit=10))
+
+    assert [book.id for book in books] == [6, 8, 10]
+    assert storage.get_book_count(f) == 5
+    assert len(storage.find_books(dto.BookFilter(), Pagination())) == 10
+
+
+@pytest.mark.parametrize("filters, expected", [
+    (dto.BookFilter(title="book-1"), [1, 10]),
+    (dto.BookFilter(title="-1"), [1, 10]),
+    (dto.BookFilter(title="k"), list(range(1, 11))),
+    (dto.BookFilter(year=2000), [3, 6, 9]),
+    (dto.BookFilter(title="book", author="ba", year=2000), [3, 9]),
+    (dto.BookFilter(title='"'), []),
+    (dto.BookFilter(year_from=2001), [1, 2, 4, 5, 7, 8, 10]),
+    (dto.BookFilter(author="foo", year_to=2001), [4, 6, 10]),
+])
+def test_storage_filters(storage, filters, expected):
+    books = storage.find_books(filters, Pagination())
+    assert [book.id for book in books] == expected
+    assert storage.get_book_count(filters) == len(expected)
+
+
+def test_storage_save_duplicate(storage):
+    with pytest.raises(BookAlreadyExists) as err:
+        storage.save_book(dto.NewBook(title="BOOK-1", author="Baz", year=2001, status=BookStatus.TAKEN))
+
+    assert err.value.book_id == 1
+
+
+def test_storage_update(storage):
+    book = storage.get_book_by_id(1)
+    book.take_from_library()
+    book.title = "Renamed"
+    storage.update_book(book)
+
+    assert storage.get_book_by_id(1) == book
+    assert storage.get_book_count(dto.BookFilter(title="renamed")) == 1
+    assert storage.get_book_count(dto.BookFilter(title="book-1")) == 1
+
+    book.title = "book-2"
+    book.author = "foo"
+    book.year = 2002
+    with pytest.raises(BookAlreadyExists):
+        storage.update_book(book)
+
+    book.id = 100
+    book.title = "Missing"
+    with pytest.raises(BookNotFound):
+        storage.update_book(book)
+
+
+def test_storage_delete(storage):
+    storage.delete_book(1)
+    with pytest.raises(BookNotFound):
+        storage.get_book_by_id(1)
+
+    with pytest.raises(BookNotFound):
+        storage.delete_book(1)
+
+    assert storage.get_book_count(dto.BookFilter(title="book-1")) == 1
+
+
+def test_storage_find_books_page(storage):
+    f = dto.BookFilter(author="foo")
+    page = storage.find_books_page(f, Pagination(offset=1, limit=2))
+    assert [book.id for book in page.items] == [4, 6]
+    assert page.total == 5
+    assert page.has_more
+
+    page = storage.find_books_page(f, Pagination(offset=3, limit=2), count_total=False)
+    assert [book.id for book in page.items] == [8, 10]
+    assert page.total is None
+    assert not page.has_more
+
+    page = storage.find_books_page(f, Pagination(offset=10, limit=2))
+    assert page.items == []
+    assert page.total == 5
+
+
+def test_storage_keyset_pages(storage):
+    f = dto.BookFilter(author="foo")
+    page = storage.find_books_page(f, Pagination(limit=2, after_id=4))
+    assert [book.id for book in page.items] == [6, 8]
+    assert page.total == 5
+    assert page.has_more
+
+    page = storage.find_books_page(f, Pagination(limit=2, after_id=8), count_total=False)
+    assert [book.id for book in page.items] == [10]
+    assert page.total is None
+    assert not page.has_more
+
+    page = storage.find_books_page(f, Pagination(limit=2, before_id=8))
+    assert [book.id for book in page.items] == [4, 6]
+    assert page.has_more
+
+    assert [book.id for book in storage.find_books(f, Pagination(limit=3, before_id=6))] == [2, 4]
+
+
+def test_storage_save_books(storage):
+    results = storage.save_books([
+        dto.NewBook(title="new", author="foo", year=2000, status=BookStatus.AVAILABLE),
+        dto.NewBook(title="BOOK-1", author="Baz", year=2001, status=BookStatus.AVAILABLE),
+    ])
+
+    assert results[0] == 11
+    assert isinstance(results[1], BookAlreadyExists) and results[1].book_id == 1
+    assert storage.get_book_count(dto.BookFilter()) == 11
+
+
+def test_storage_batch(storage):
+    books = storage.get_books([2, 11, 1])
+    assert [book.id for book in books] == [2, 1]
+
+    for book in books:
+        book.take_from_library()
+
+    storage.update_books(books)
+    assert storage.get_book_count(dto.BookFilter()) == 10
+    assert storage.get_book_by_id(1).status is BookStatus.TAKEN
+
+    assert storage.delete_books([3, 11, 4]) == [3, 4]
+    assert storage.get_book_count(dto.BookFilter()) == 8